@@ -0,0 +1,118 @@
+import functools
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Tags, Warning, register
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_STALE_TIMEOUT = 60 * 60
+REFRESH_LOCK_TIMEOUT = 30
+LOCAL_TIMEOUT = 15
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.SHARED_CACHE:
+        return []
+    return [Warning(
+        'The default cache is local to each process, so cache invalidations do not reach other workers.',
+        hint='Set REDIS_URL so every worker shares the cache.',
+        id='project_insight.W001',
+    )]
+
+def shared_timeout(timeout, local_timeout):
+    """timeout with a shared cache, local_timeout when every process has its own."""
+    return timeout if settings.SHARED_CACHE else local_timeout
+
+def resource_name(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+def version_key(resource, scope):
+    return f"cache:version:{resource}:{scope[0]}:{scope[1]}"
+
+def get_versions(resources, scope):
+    """
+    Current version of each resource within a scope, e.g.
+    ('organization', org_id) or ('survey', survey_id). A missing counter
+    starts from the clock, so an evicted counter never repeats a version an
+    older entry was stored under.
+    """
+    keys = [version_key(resource_name(resource), scope) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+def bump_version(resource, scope):
+    key = version_key(resource_name(resource), scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+def bump_version_on_commit(resource, scope):
+    if scope[1] is not None:
+        transaction.on_commit(lambda: bump_version(resource, scope))
+
+def track_model(model, **scopes):
+    """
+    Bump the version of a model in every scope an instance belongs to
+    whenever it is saved or deleted. Each keyword names a scope kind and
+    maps an instance to its id in that scope, e.g.
+    organization=lambda survey: survey.organization_id.
+    """
+    def changed(sender, instance, **kwargs):
+        for kind, scope_id in scopes.items():
+            bump_version_on_commit(sender, (kind, scope_id(instance)))
+
+    uid = f"cache-version:{resource_name(model)}"
+    post_save.connect(changed, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(changed, sender=model, weak=False, dispatch_uid=uid)
+
+def memoize(resource, depends_on, scope, timeout=DEFAULT_TIMEOUT, stale_timeout=DEFAULT_STALE_TIMEOUT):
+    """
+    Cache the result of a read function per resource and scope.
+    scope(*args, **kwargs) returns the (kind, id) pair the result belongs
+    to, and the versions of the depends_on models are read in that scope.
+    An entry is fresh while it is younger than timeout and those versions
+    have not moved. A stale entry is still served for up to stale_timeout
+    while a single caller recomputes it, so an invalidation does not send
+    every request to the database at once. Version bumps only reach other
+    processes through a shared cache, so a process-local cache keeps
+    entries fresh for LOCAL_TIMEOUT at most.
+    """
+    def decorator(func):
+        fresh_timeout = shared_timeout(timeout, min(timeout, LOCAL_TIMEOUT))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            entry_scope = scope(*args, **kwargs)
+            entry_key = f"cache:{resource}:{entry_scope[0]}:{entry_scope[1]}"
+            versions = get_versions(depends_on, entry_scope)
+
+            entry = cache.get(entry_key)
+            if entry is not None:
+                if entry['versions'] == versions and entry['fresh_until'] > time.time():
+                    return entry['value']
+                if not cache.add(f"{entry_key}:refresh", 1, REFRESH_LOCK_TIMEOUT):
+                    return entry['value']
+                try:
+                    return refresh(entry_key, versions, args, kwargs)
+                finally:
+                    cache.delete(f"{entry_key}:refresh")
+            return refresh(entry_key, versions, args, kwargs)
+
+        def refresh(entry_key, versions, args, kwargs):
+            value = func(*args, **kwargs)
+            cache.set(entry_key, {
+                'value': value,
+                'versions': versions,
+                'fresh_until': time.time() + fresh_timeout,
+            }, fresh_timeout + stale_timeout)
+            return value
+
+        return wrapper
+    return decorator
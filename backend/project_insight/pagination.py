@@ -0,0 +1,39 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on an indexed timestamp column. Each page is an index
+    range scan starting at the cursor, so deep pages cost the same as the
+    first one.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-created_at'
+
+class StartedAtPagination(KeysetPagination):
+    ordering = '-started_at'
+
+class SearchRankPagination(LimitOffsetPagination):
+    """
+    Limit/offset pages for search results ordered by rank. Many matches
+    share the same rank, so a cursor on the rank cannot tell them apart;
+    the whole match set is sorted for every page anyway.
+    """
+    default_limit = KeysetPagination.page_size
+    max_limit = KeysetPagination.max_page_size
+    limit_query_param = 'page_size'
+
+def paginated_response_data(request, queryset, serializer_class, pagination_class=KeysetPagination):
+    """
+    Paginate a queryset in a function view and return the usual
+    {'success', 'data'} payload with next/previous cursor links added.
+    """
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, request)
+    return {
+        'success': True,
+        'data': serializer_class(page, many=True).data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link()
+    }
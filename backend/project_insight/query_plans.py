@@ -0,0 +1,67 @@
+import re
+import uuid
+from django.db import connection, transaction
+from django.utils import timezone
+from respondents.models import Contact, SurveyInvitation
+from respondents.search import search_contacts
+from surveys.models import Response, Survey
+from surveys.search import search_surveys
+from users.models import Webhook, WebhookDelivery
+
+SEQ_SCAN_PATTERN = re.compile(r'Seq Scan on (\w+)')
+FILTER_PATTERN = re.compile(r'^\s*Filter: (.+)$', re.MULTILINE)
+
+def query_shapes():
+    """
+    The hot query shapes of the application, as (name, queryset) pairs. The
+    filter values are placeholders; only the plan shape matters.
+    """
+    now = timezone.now()
+    survey_id = uuid.uuid4()
+    organization_id = 0
+    return [
+        ('responses.completed_in_period', Response.objects.filter(
+            survey_id=survey_id, is_completed=True, submitted_at__gte=now
+        )),
+        ('responses.page', Response.objects.filter(survey_id=survey_id).order_by('-started_at')[:51]),
+        ('surveys.by_status', Survey.objects.filter(organization_id=organization_id, status='active')),
+        ('surveys.search', search_surveys(Survey.objects.filter(organization_id=organization_id), 'example')),
+        ('surveys.due_to_publish', Survey.objects.filter(
+            status='draft', published_at__lte=now, published_at__isnull=False
+        )),
+        ('surveys.due_to_close', Survey.objects.filter(
+            status='active', closes_at__lte=now, closes_at__isnull=False
+        )),
+        ('contacts.subscribed', Contact.objects.filter(
+            organization_id=organization_id, is_active=True, status='subscribed'
+        )),
+        ('contacts.page', Contact.objects.filter(organization_id=organization_id).order_by('-created_at')[:51]),
+        ('contacts.search', search_contacts(Contact.objects.filter(organization_id=organization_id), 'example')),
+        ('invitations.by_status', SurveyInvitation.objects.filter(survey_id=survey_id, status='sent')),
+        ('invitations.queued', SurveyInvitation.objects.filter(status='queued').order_by('created_at')[:500]),
+        ('invitations.expired_claims', SurveyInvitation.objects.filter(status='sending', lease_expires_at__lt=now)),
+        ('webhooks.subscribed', Webhook.objects.filter(
+            organization_id=organization_id, is_active=True, events__contains=['response.new']
+        )),
+        ('webhook_deliveries.due', WebhookDelivery.objects.filter(
+            status='pending', next_attempt_at__lte=now
+        ).order_by('next_attempt_at')[:100]),
+    ]
+
+def explain(queryset):
+    """
+    EXPLAIN a queryset with sequential scans disabled, so the plan shows
+    whether an index can serve the query at all, independent of how many
+    rows the tables hold right now.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+def seq_scans(plan):
+    return SEQ_SCAN_PATTERN.findall(plan)
+
+def residual_filters(plan):
+    """Conditions checked row by row after the scan, i.e. not covered by the index used."""
+    return FILTER_PATTERN.findall(plan)
@@ -0,0 +1,269 @@
+import csv
+import io
+import itertools
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Contact, ContactImport
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_LEASE_SECONDS = 300
+CONTACT_COLUMNS = ['email', 'first_name', 'last_name', 'phone', 'company', 'job_title']
+
+def claim_next_import():
+    """
+    Atomically take the oldest queued import and mark it as processing, so
+    several workers can run side by side without picking the same file.
+    An import whose lease ran out is taken again: its worker died mid-file,
+    and processing resumes after the rows it already saved.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        import_record = ContactImport.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            Q(status='queued') | Q(status='processing', lease_expires_at__lt=now)
+        ).order_by('started_at').first()
+
+        if import_record:
+            import_record.status = 'processing'
+            import_record.lease_expires_at = now + timedelta(seconds=IMPORT_LEASE_SECONDS)
+            import_record.save(update_fields=['status', 'lease_expires_at'])
+        return import_record
+
+def count_rows(import_record):
+    """
+    Number of data rows, from a newline count of the raw bytes. Much cheaper
+    than parsing the file, and exact unless a quoted field spans lines.
+    """
+    import_record.csv_file.open('rb')
+    newlines = 0
+    last_byte = b'\n'
+    for chunk in iter(lambda: import_record.csv_file.read(1024 * 1024), b''):
+        newlines += chunk.count(b'\n')
+        last_byte = chunk[-1:]
+    if last_byte != b'\n':
+        newlines += 1
+    return max(newlines - 1, 0)
+
+def delete_csv(import_record):
+    """Remove the stored upload once the import has finished, successfully or not."""
+    if import_record.csv_file:
+        import_record.csv_file.delete(save=False)
+
+def open_csv(import_record):
+    import_record.csv_file.open('rb')
+    return io.TextIOWrapper(import_record.csv_file.file, encoding='utf-8', newline='')
+
+def iter_batches(reader, size=IMPORT_BATCH_SIZE, start=1):
+    batch = []
+    for row_num, row in enumerate(reader, start=start):
+        batch.append((row_num, row))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def build_contact_data(row):
+    contact_data = {
+        'email': (row.get('email') or '').strip().lower(),
+        'first_name': (row.get('first_name') or '').strip(),
+        'last_name': (row.get('last_name') or '').strip(),
+        'phone': (row.get('phone') or '').strip(),
+        'company': (row.get('company') or '').strip(),
+        'job_title': (row.get('job_title') or '').strip(),
+        'source': 'import'
+    }
+    custom_fields = {}
+    for key, value in row.items():
+        if key not in CONTACT_COLUMNS and value and value.strip():
+            custom_fields[key] = value.strip()
+    if custom_fields:
+        contact_data['custom_fields'] = custom_fields
+    return contact_data
+
+def validate_contact_data(contact_data):
+    # Bulk inserts cast values to the column type, which silently truncates
+    # overlong strings instead of failing, so check lengths up front.
+    for field in CONTACT_COLUMNS:
+        max_length = Contact._meta.get_field(field).max_length
+        if len(contact_data[field]) > max_length:
+            return f"Kolom {field} terlalu panjang (maksimal {max_length} karakter)"
+    return None
+
+def import_row(import_record, row_num, contact_data):
+    """Row-by-row import, used when a bulk write for a batch fails."""
+    email = contact_data['email']
+    existing_contact = Contact.objects.filter(
+        organization=import_record.organization,
+        email=email
+    ).first()
+
+    if existing_contact:
+        if not import_record.update_existing:
+            return 'duplicate'
+        for key, value in contact_data.items():
+            if key != 'source':
+                setattr(existing_contact, key, value)
+        existing_contact.save()
+        existing_contact.contact_lists.add(import_record.contact_list)
+    else:
+        contact = Contact.objects.create(
+            organization=import_record.organization,
+            created_by=import_record.imported_by,
+            **contact_data
+        )
+        contact.contact_lists.add(import_record.contact_list)
+    return 'success'
+
+def bulk_upsert(import_record, rows):
+    """
+    Upsert a batch of (row_num, contact_data) pairs with one lookup of the
+    existing contacts, one bulk insert of new contacts, one INSERT ... ON
+    CONFLICT DO UPDATE for existing ones and one bulk insert into the
+    contact_lists through table.
+    """
+    organization = import_record.organization
+    errors = []
+    duplicate_emails = 0
+    existing = {
+        contact.email: contact
+        for contact in Contact.objects.filter(
+            organization=organization,
+            email__in={contact_data['email'] for _, contact_data in rows}
+        )
+    }
+
+    new_contacts = {}
+    updated_contacts = {}
+    for row_num, contact_data in rows:
+        email = contact_data['email']
+        contact = existing.get(email) or new_contacts.get(email)
+        if contact is None:
+            new_contacts[email] = Contact(
+                organization=organization,
+                created_by=import_record.imported_by,
+                **contact_data
+            )
+        elif import_record.update_existing:
+            for key, value in contact_data.items():
+                if key != 'source':
+                    setattr(contact, key, value)
+            if email in existing:
+                updated_contacts[email] = contact
+        else:
+            duplicate_emails += 1
+            errors.append((row_num, f"Email {email} sudah ada"))
+
+    with transaction.atomic():
+        Contact.objects.bulk_create(new_contacts.values())
+        if updated_contacts:
+            now = timezone.now()
+            for contact in updated_contacts.values():
+                contact.updated_at = now
+            Contact.objects.bulk_create(
+                updated_contacts.values(),
+                update_conflicts=True,
+                unique_fields=['organization', 'email'],
+                update_fields=['first_name', 'last_name', 'phone', 'company', 'job_title', 'custom_fields', 'updated_at']
+            )
+        ContactListMembership = Contact.contact_lists.through
+        ContactListMembership.objects.bulk_create([
+            ContactListMembership(contact_id=contact.contact_id, contactlist_id=import_record.contact_list_id)
+            for contact in list(new_contacts.values()) + list(updated_contacts.values())
+        ], ignore_conflicts=True)
+
+    successful_imports = len(rows) - duplicate_emails
+    return successful_imports, duplicate_emails, errors
+
+def import_batch(import_record, batch):
+    """Import one batch of (row_num, row) pairs and return per-batch counters."""
+    successful_imports = 0
+    failed_imports = 0
+    duplicate_emails = 0
+    errors = []
+
+    rows = []
+    for row_num, row in batch:
+        contact_data = build_contact_data(row)
+        if not contact_data['email']:
+            failed_imports += 1
+            errors.append((row_num, "Email kosong"))
+            continue
+        error = validate_contact_data(contact_data)
+        if error:
+            failed_imports += 1
+            errors.append((row_num, error))
+            continue
+        rows.append((row_num, contact_data))
+
+    try:
+        successful, duplicates, row_errors = bulk_upsert(import_record, rows)
+        successful_imports += successful
+        duplicate_emails += duplicates
+        errors.extend(row_errors)
+    except Exception:
+        # Fall back to row-by-row so the offending rows end up in the error log
+        for row_num, contact_data in rows:
+            try:
+                if import_row(import_record, row_num, contact_data) == 'duplicate':
+                    duplicate_emails += 1
+                    errors.append((row_num, f"Email {contact_data['email']} sudah ada"))
+                else:
+                    successful_imports += 1
+            except Exception as e:
+                failed_imports += 1
+                errors.append((row_num, str(e)))
+
+    errors = [f"Baris {row_num}: {message}" for row_num, message in sorted(errors)]
+    return successful_imports, failed_imports, duplicate_emails, errors
+
+def process_contact_import(import_record):
+    """
+    Run a stored CSV import in a single pass over the file, in batches.
+    The counters are saved and the lease renewed after every batch, so
+    clients polling the import can follow its progress and a reclaimed
+    import skips the rows already processed. A batch interrupted before its
+    counters were saved is imported again. total_rows starts as the
+    newline count of the file and is set to the parsed row count at the end.
+    """
+    try:
+        import_record.total_rows = count_rows(import_record)
+        import_record.save(update_fields=['total_rows'])
+        with open_csv(import_record) as csv_content:
+            csv_reader = csv.DictReader(csv_content)
+            if 'email' not in (csv_reader.fieldnames or []):
+                raise ValueError("CSV harus memiliki kolom 'email'")
+
+            rows = itertools.islice(csv_reader, import_record.processed_rows, None)
+            for batch in iter_batches(rows, IMPORT_BATCH_SIZE, start=import_record.processed_rows + 1):
+                successful, failed, duplicates, errors = import_batch(import_record, batch)
+                import_record.processed_rows += len(batch)
+                import_record.successful_imports += successful
+                import_record.failed_imports += failed
+                import_record.duplicate_imports += duplicates
+                import_record.error_log.extend(errors)
+                import_record.lease_expires_at = timezone.now() + timedelta(seconds=IMPORT_LEASE_SECONDS)
+                import_record.save(update_fields=[
+                    'processed_rows', 'successful_imports', 'failed_imports',
+                    'duplicate_imports', 'error_log', 'lease_expires_at'
+                ])
+
+        import_record.total_rows = import_record.processed_rows
+        import_record.status = 'completed' if import_record.failed_imports == 0 else 'partial'
+        import_record.completed_at = timezone.now()
+        import_record.lease_expires_at = None
+        delete_csv(import_record)
+        import_record.save(update_fields=['total_rows', 'status', 'completed_at', 'lease_expires_at', 'csv_file'])
+
+    except Exception as e:
+        import_record.status = 'failed'
+        import_record.error_log.append(f"Gagal memproses file CSV: {str(e)}")
+        import_record.completed_at = timezone.now()
+        import_record.lease_expires_at = None
+        delete_csv(import_record)
+        import_record.save(update_fields=['status', 'error_log', 'completed_at', 'lease_expires_at', 'csv_file'])
+
+    return import_record
@@ -0,0 +1,57 @@
+import secrets
+from django.db.models import Exists, OuterRef
+from .models import InvitationTracking, SurveyInvitation
+
+INVITATION_BATCH_SIZE = 1000
+
+def uninvited_contacts(survey, contacts):
+    """Narrow a contact queryset to contacts without an invitation to the survey."""
+    return contacts.filter(
+        ~Exists(SurveyInvitation.objects.filter(survey=survey, contact=OuterRef('pk')))
+    )
+
+def iter_contact_batches(contacts, size=INVITATION_BATCH_SIZE):
+    batch = []
+    for contact in contacts.only(
+        'contact_id', 'email', 'first_name', 'last_name'
+    ).iterator(chunk_size=size):
+        batch.append(contact)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def create_invitations(survey, contacts, render, sent_by, sender_email='', sender_name='',
+                       status='pending', campaign=None, batch_size=INVITATION_BATCH_SIZE):
+    """
+    Create invitations (and their tracking rows) for every contact in the
+    queryset that has not been invited to the survey yet. New recipients
+    come from a single anti-join, and rows are written with one bulk insert
+    per batch and table. render(contact, invitation) returns the subject and
+    body for one contact. Call inside a transaction. Returns the number of
+    invitations created.
+    """
+    created = 0
+    for batch in iter_contact_batches(uninvited_contacts(survey, contacts), batch_size):
+        invitations = []
+        for contact in batch:
+            invitation = SurveyInvitation(
+                survey=survey,
+                contact=contact,
+                sender_email=sender_email,
+                sender_name=sender_name,
+                sent_by=sent_by,
+                status=status,
+                tracking_token=secrets.token_urlsafe(32)
+            )
+            invitation.subject_line, invitation.message_body = render(contact, invitation)
+            invitations.append(invitation)
+
+        SurveyInvitation.objects.bulk_create(invitations)
+        InvitationTracking.objects.bulk_create([
+            InvitationTracking(invitation=invitation, campaign=campaign)
+            for invitation in invitations
+        ])
+        created += len(invitations)
+    return created
@@ -0,0 +1,237 @@
+import queue
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+from .invitations import create_invitations
+from .models import Contact, EmailCampaign, InvitationTracking, SurveyInvitation
+from .templating import MessageRenderer
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAIL_BATCH_SIZE = 500
+MAIL_CONNECTIONS = 4
+MAIL_LEASE_SECONDS = 600
+
+class ConnectionPool:
+    """
+    A fixed set of mail backend connections shared by the sender threads.
+    Each connection stays open across batches, so the SMTP handshake and
+    login happen once per connection instead of once per email.
+    """
+    def __init__(self, size=MAIL_CONNECTIONS):
+        self.size = size
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(get_connection(fail_silently=False))
+
+    @contextmanager
+    def connection(self):
+        connection = self.connections.get()
+        try:
+            connection.open()
+            yield connection
+        finally:
+            self.connections.put(connection)
+
+    def close(self):
+        while not self.connections.empty():
+            try:
+                self.connections.get_nowait().close()
+            except Exception:
+                pass
+
+def deliver_messages(pool, messages):
+    """
+    Send a list of (invitation_id, EmailMessage) pairs over one pooled
+    connection, handing the whole list to send_messages in one call, and
+    return (invitation_id, error) pairs, error being None on success. A
+    backend sends a batch in order and stops at the first failure, so the
+    messages handed over before it went out. The failed message is recorded
+    and the rest are sent as a new batch on a fresh session.
+    """
+    results = []
+    pending = list(messages)
+    with pool.connection() as connection:
+        while pending:
+            handed_over = []
+            try:
+                connection.send_messages(iter_handed_over(pending, handed_over))
+            except Exception as e:
+                failed = max(len(handed_over) - 1, 0)
+                results.extend((invitation_id, None) for invitation_id, _ in pending[:failed])
+                results.append((pending[failed][0], str(e)))
+                pending = pending[failed + 1:]
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception:
+                    pass
+            else:
+                results.extend((invitation_id, None) for invitation_id, _ in pending)
+                pending = []
+    return results
+
+def iter_handed_over(messages, handed_over):
+    """Yield the messages of (invitation_id, message) pairs, noting each id as it is handed over."""
+    for invitation_id, message in messages:
+        handed_over.append(invitation_id)
+        yield message
+
+def build_message(invitation):
+    return EmailMessage(
+        subject=invitation.subject_line,
+        body=invitation.message_body,
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@projectinsight.com'),
+        to=[invitation.contact.email]
+    )
+
+def prepare_campaign(campaign_id):
+    """
+    Queue an invitation for every subscribed contact of the campaign that
+    has not been invited to the survey yet. The campaign row is locked while
+    this runs, so concurrent workers prepare a campaign only once.
+    """
+    with transaction.atomic():
+        campaign = EmailCampaign.objects.select_for_update().select_related(
+            'survey', 'survey__organization'
+        ).get(campaign_id=campaign_id)
+        if campaign.status != 'sending' or campaign.started_at:
+            return campaign
+
+        contacts = Contact.objects.filter(
+            contact_lists__in=campaign.contact_lists.all(),
+            is_active=True,
+            status='subscribed'
+        ).distinct()
+        campaign.total_recipients = create_invitations(
+            campaign.survey,
+            contacts,
+            MessageRenderer(campaign.subject_line, campaign.message_body, campaign.survey).render,
+            sent_by=campaign.created_by,
+            sender_email=campaign.sender_email,
+            sender_name=campaign.sender_name,
+            status='queued',
+            campaign=campaign
+        )
+        campaign.started_at = timezone.now()
+        campaign.save(update_fields=['total_recipients', 'started_at'])
+        return campaign
+
+def prepare_pending_campaigns():
+    campaign_ids = list(EmailCampaign.objects.filter(
+        status='sending',
+        started_at__isnull=True
+    ).values_list('campaign_id', flat=True))
+    for campaign_id in campaign_ids:
+        prepare_campaign(campaign_id)
+    return len(campaign_ids)
+
+def release_expired_claims(now):
+    """
+    Put invitations back in the queue whose sender claimed them but never
+    recorded a result before the lease ran out, e.g. because it crashed.
+    """
+    return SurveyInvitation.objects.filter(
+        status='sending',
+        lease_expires_at__lt=now
+    ).update(status='queued', lease_expires_at=None)
+
+def claim_invitations(now, limit=MAIL_BATCH_SIZE):
+    """
+    Claim a batch of queued invitations by moving them to 'sending' with a
+    lease, in a short transaction. Invitations of paused campaigns stay in
+    the queue. SKIP LOCKED lets several workers claim from the same queue.
+    """
+    with transaction.atomic():
+        invitations = list(
+            SurveyInvitation.objects.select_for_update(
+                skip_locked=True, of=('self',)
+            ).filter(
+                status='queued'
+            ).filter(
+                Q(tracking__campaign__isnull=True) | Q(tracking__campaign__status='sending')
+            ).select_related('contact', 'tracking').order_by('created_at')[:limit]
+        )
+        SurveyInvitation.objects.filter(
+            invitation_id__in=[invitation.invitation_id for invitation in invitations]
+        ).update(status='sending', lease_expires_at=now + timedelta(seconds=MAIL_LEASE_SECONDS))
+    return invitations
+
+def record_results(invitations, results):
+    """Store the send results of a claimed batch and update the campaign counters."""
+    with transaction.atomic():
+        now = timezone.now()
+        sent_ids = [invitation_id for invitation_id, error in results.items() if error is None]
+        SurveyInvitation.objects.filter(
+            invitation_id__in=sent_ids, status='sending'
+        ).update(status='sent', sent_at=now, lease_expires_at=None)
+        Contact.objects.filter(
+            survey_invitations__invitation_id__in=sent_ids
+        ).update(last_contacted=now)
+
+        campaign_counts = {}
+        for invitation in invitations:
+            error = results[invitation.invitation_id]
+            if error is not None:
+                SurveyInvitation.objects.filter(
+                    invitation_id=invitation.invitation_id, status='sending'
+                ).update(
+                    status='failed',
+                    error_message=error,
+                    retry_count=F('retry_count') + 1,
+                    lease_expires_at=None
+                )
+                logger.error(f"Failed to send to {invitation.contact.email}: {error}")
+
+            tracking = getattr(invitation, 'tracking', None)
+            if tracking and tracking.campaign_id:
+                counts = campaign_counts.setdefault(tracking.campaign_id, [0, 0])
+                counts[0 if error is None else 1] += 1
+
+        for campaign_id, (sent, failed) in campaign_counts.items():
+            EmailCampaign.objects.filter(campaign_id=campaign_id).update(
+                emails_sent=F('emails_sent') + sent,
+                emails_delivered=F('emails_delivered') + sent,
+                emails_failed=F('emails_failed') + failed
+            )
+
+def send_queued_invitations(pool, executor, limit=MAIL_BATCH_SIZE):
+    """
+    Send one batch of queued invitations, split across the pooled
+    connections. The batch is claimed and its results recorded in two
+    short transactions; the SMTP traffic in between runs outside of any
+    transaction and holds no row locks. Returns the number of invitations
+    attempted.
+    """
+    now = timezone.now()
+    release_expired_claims(now)
+    invitations = claim_invitations(now, limit)
+    if not invitations:
+        return 0
+
+    messages = [(invitation.invitation_id, build_message(invitation)) for invitation in invitations]
+    slices = [messages[i::pool.size] for i in range(pool.size)]
+    results = {}
+    for batch_results in executor.map(lambda batch: deliver_messages(pool, batch), slices):
+        results.update(batch_results)
+
+    record_results(invitations, results)
+    return len(invitations)
+
+def finish_sent_campaigns():
+    """Mark sending campaigns without queued or in-flight invitations left as sent."""
+    now = timezone.now()
+    return EmailCampaign.objects.filter(
+        status='sending',
+        started_at__isnull=False
+    ).exclude(
+        Exists(InvitationTracking.objects.filter(
+            campaign=OuterRef('campaign_id'),
+            invitation__status__in=['queued', 'sending']
+        ))
+    ).update(status='sent', sent_at=now, completed_at=now)
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from respondents.importer import claim_next_import, process_contact_import
+
+class Command(BaseCommand):
+    help = 'Process queued contact CSV imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new imports instead of exiting when the queue is empty'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when running with --loop'
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            import_record = claim_next_import()
+            if import_record is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            process_contact_import(import_record)
+            processed += 1
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Import {import_record.filename}: {import_record.status} '
+                    f'({import_record.successful_imports}/{import_record.total_rows} rows)'
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {processed} imports')
+        )
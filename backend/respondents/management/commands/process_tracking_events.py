@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand
+from respondents.tracking import TRACKING_BATCH_SIZE, process_tracking_events
+
+class Command(BaseCommand):
+    help = 'Fold buffered email open/click events into tracking stats and campaign counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new events instead of exiting when the buffer is empty'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when running with --loop'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TRACKING_BATCH_SIZE,
+            help='Number of events to fold per batch'
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            count = process_tracking_events(options['batch_size'])
+            processed += count
+            if count == 0:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {processed} tracking events')
+        )
@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from respondents.mailer import (
+    MAIL_BATCH_SIZE, MAIL_CONNECTIONS, ConnectionPool,
+    finish_sent_campaigns, prepare_pending_campaigns, send_queued_invitations
+)
+
+class Command(BaseCommand):
+    help = 'Send queued survey invitations and email campaigns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for queued emails instead of exiting when the queue is empty'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when running with --loop'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=MAIL_BATCH_SIZE,
+            help='Number of invitations to send per batch'
+        )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=MAIL_CONNECTIONS,
+            help='Number of mail server connections to send over in parallel'
+        )
+
+    def handle(self, *args, **options):
+        pool = ConnectionPool(options['connections'])
+        attempted = 0
+        try:
+            with ThreadPoolExecutor(max_workers=options['connections']) as executor:
+                while True:
+                    prepared = prepare_pending_campaigns()
+                    count = send_queued_invitations(pool, executor, options['batch_size'])
+                    finished = finish_sent_campaigns()
+                    attempted += count
+                    if finished:
+                        self.stdout.write(self.style.SUCCESS(f'Finished {finished} campaigns'))
+                    if count == 0 and prepared == 0:
+                        if not options['loop']:
+                            break
+                        time.sleep(options['interval'])
+        finally:
+            pool.close()
+        self.stdout.write(
+            self.style.SUCCESS(f'Attempted {attempted} emails')
+        )
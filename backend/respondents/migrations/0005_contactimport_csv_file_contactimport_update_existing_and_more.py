@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0004_emailcampaign_sent_at_alter_emailcampaign_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactimport',
+            name='csv_file',
+            field=models.FileField(blank=True, null=True, upload_to='contact_imports/'),
+        ),
+        migrations.AddField(
+            model_name='contactimport',
+            name='update_existing',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='contactimport',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed'), ('partial', 'Partially Completed')], default='processing', max_length=20),
+        ),
+    ]
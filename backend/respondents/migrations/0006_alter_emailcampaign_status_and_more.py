@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0005_contactimport_csv_file_contactimport_update_existing_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailcampaign',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('sending', 'Sending'), ('sent', 'Sent'), ('paused', 'Paused'), ('failed', 'Failed')], default='draft', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='surveyinvitation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('queued', 'Queued'), ('sent', 'Sent'), ('delivered', 'Delivered'), ('opened', 'Opened'), ('clicked', 'Clicked'), ('responded', 'Responded'), ('bounced', 'Bounced'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
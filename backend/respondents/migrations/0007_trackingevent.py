@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0006_alter_emailcampaign_status_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackingEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tracking_token', models.CharField(max_length=64)),
+                ('event_type', models.CharField(choices=[('open', 'Open'), ('click', 'Click')], max_length=10)),
+                ('user_agent', models.TextField(blank=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'tracking_events',
+                'ordering': ['event_id'],
+            },
+        ),
+    ]
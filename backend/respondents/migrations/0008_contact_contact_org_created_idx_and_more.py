@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0007_trackingevent'),
+        ('surveys', '0005_response_response_survey_started_idx_and_more'),
+        ('users', '0007_webhookdelivery_webhook_delivery_history_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['organization', '-created_at'], name='contact_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactimport',
+            index=models.Index(fields=['organization', '-started_at'], name='contact_import_org_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailcampaign',
+            index=models.Index(fields=['organization', '-created_at'], name='campaign_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyinvitation',
+            index=models.Index(fields=['survey', '-created_at'], name='invitation_survey_created_idx'),
+        ),
+    ]
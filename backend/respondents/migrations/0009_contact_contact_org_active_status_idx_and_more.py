@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0008_contact_contact_org_created_idx_and_more'),
+        ('surveys', '0006_response_response_survey_completed_idx_and_more'),
+        ('users', '0008_webhook_webhook_active_org_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['organization', 'is_active', 'status'], name='contact_org_active_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyinvitation',
+            index=models.Index(fields=['survey', 'status'], name='invitation_survey_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyinvitation',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['created_at'], name='invitation_queued_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0010_contact_trigram_search_indexes'),
+        ('surveys', '0007_survey_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyinvitation',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='surveyinvitation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('delivered', 'Delivered'), ('opened', 'Opened'), ('clicked', 'Clicked'), ('responded', 'Responded'), ('bounced', 'Bounced'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='surveyinvitation',
+            index=models.Index(condition=models.Q(('status', 'sending')), fields=['lease_expires_at'], name='invitation_sending_lease_idx'),
+        ),
+    ]
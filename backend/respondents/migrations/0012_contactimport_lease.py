@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('respondents', '0011_surveyinvitation_sending_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactimport',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from users.models import Organization, User
 from surveys.models import Survey
 import uuid, secrets
 from django.conf import settings
+from .templating import MessageRenderer
 
 # Create your models here.
 
@@ -67,6 +70,14 @@ class Contact(models.Model):
         verbose_name_plural = 'Contacts'
         ordering = ['-created_at']
         unique_together = ('organization', 'email')
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='contact_org_created_idx'),
+            models.Index(fields=['organization', 'is_active', 'status'], name='contact_org_active_status_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='contact_email_trgm_idx'),
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='contact_first_name_trgm_idx'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='contact_last_name_trgm_idx'),
+            GinIndex(OpClass(Upper('company'), name='gin_trgm_ops'), name='contact_company_trgm_idx'),
+        ]
     
     def __str__(self):
         name = self.get_full_name()
@@ -88,6 +99,7 @@ class Contact(models.Model):
     
 class ContactImport(models.Model):
     IMPORT_STATUS_CHOICES = [
+        ('queued', 'Queued'),
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
@@ -98,6 +110,8 @@ class ContactImport(models.Model):
     contact_list = models.ForeignKey(ContactList, on_delete=models.CASCADE, related_name='imports')
     imported_by = models.ForeignKey(User, on_delete=models.CASCADE)
     filename = models.CharField(max_length=255)
+    csv_file = models.FileField(upload_to='contact_imports/', blank=True, null=True)
+    update_existing = models.BooleanField(default=False)
     total_rows = models.IntegerField(default=0)
     processed_rows = models.IntegerField(default=0)
     successful_imports = models.IntegerField(default=0)
@@ -107,12 +121,16 @@ class ContactImport(models.Model):
     error_log = models.JSONField(default=list, blank=True)
     started_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(blank=True, null=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = 'contact_imports'
         verbose_name = 'Contact Import'
         verbose_name_plural = 'Contact Imports'
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['organization', '-started_at'], name='contact_import_org_started_idx'),
+        ]
 
     def __str__(self):
         return f"Import {self.filename} to {self.contact_list.name}"
@@ -122,10 +140,20 @@ class ContactImport(models.Model):
         if self.processed_rows == 0:
             return 0
         return round((self.successful_imports / self.processed_rows) * 100, 2)
+
+    @property
+    def progress(self):
+        if self.status in ['completed', 'partial']:
+            return 100
+        if self.total_rows == 0:
+            return 0
+        return min(round((self.processed_rows / self.total_rows) * 100, 2), 100)
     
 class SurveyInvitation(models.Model):
     INVITATION_STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
         ('sent', 'Sent'),
         ('delivered', 'Delivered'),
         ('opened', 'Opened'),
@@ -152,6 +180,7 @@ class SurveyInvitation(models.Model):
     responded_at = models.DateTimeField(blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
     retry_count = models.IntegerField(default=0)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
@@ -160,6 +189,12 @@ class SurveyInvitation(models.Model):
         verbose_name_plural = 'Survey Invitations'
         ordering = ['-created_at']
         unique_together = ('survey', 'contact')
+        indexes = [
+            models.Index(fields=['survey', '-created_at'], name='invitation_survey_created_idx'),
+            models.Index(fields=['survey', 'status'], name='invitation_survey_status_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(status='queued'), name='invitation_queued_idx'),
+            models.Index(fields=['lease_expires_at'], condition=models.Q(status='sending'), name='invitation_sending_lease_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.tracking_token:
@@ -204,31 +239,10 @@ class EmailTemplate(models.Model):
         return f"{self.name} ({self.template_type})"
     
     def render_for_contact(self, contact, survey, invitation=None):
-        context = {
-            'first_name': contact.first_name or '',
-            'last_name': contact.last_name or '',
-            'full_name': contact.get_full_name() or contact.email,
-            'email': contact.email,
-            'survey_title': survey.title,
-            'survey_description': survey.description or '',
-            'organization_name': survey.organization.name,
-        }
-
-        if invitation:
-            context['survey_url'] = invitation.survey_url
-        else:
-            base_url = getattr(settings, 'SITE_URL', 'http://localhost:8000')
-            context['survey_url'] = f"{base_url}/surveys/take/{survey.share_token}"
-
-        rendered_subject = self.subject_line
-        rendered_body = self.message_body
-
-        for key, value in context.items():
-            placeholder = '{' + key + '}'
-            rendered_subject = rendered_subject.replace(placeholder, str(value))
-            rendered_body = rendered_body.replace(placeholder, str(value))
-
-        return rendered_subject, rendered_body
+        return self.renderer(survey).render(contact, invitation)
+
+    def renderer(self, survey):
+        return MessageRenderer(self.subject_line, self.message_body, survey)
     
 def create_default_email_templates(organization, created_by):
     invitation_template = EmailTemplate.objects.create(
@@ -302,11 +316,7 @@ class EmailCampaign(models.Model):
     sender_name = models.CharField(max_length=255)
     sender_email = models.EmailField()
     scheduled_at = models.DateTimeField(null=True, blank=True)
-    status = models.CharField(
-        max_length=20,
-        choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('sent', 'Sent'), ('failed', 'Failed')],
-        default='draft'
-    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     sent_at = models.DateTimeField(null=True, blank=True)
     total_recipients = models.IntegerField(default=0)
     emails_sent = models.IntegerField(default=0)
@@ -322,6 +332,9 @@ class EmailCampaign(models.Model):
     class Meta:
         db_table = 'email_campaigns'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='campaign_org_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.status}"
@@ -372,4 +385,26 @@ class InvitationTracking(models.Model):
             self.first_clicked_at = now
         self.last_clicked_at = now
         self.clicked_count += 1
-        self.save()
\ No newline at end of file
+        self.save()
+
+class TrackingEvent(models.Model):
+    """
+    Append-only buffer of email open/click events. The tracking endpoints
+    only insert here; process_tracking_events folds the events into
+    InvitationTracking, SurveyInvitation and EmailCampaign in batches.
+    """
+    EVENT_TYPE_CHOICES = [
+        ('open', 'Open'),
+        ('click', 'Click'),
+    ]
+
+    event_id = models.BigAutoField(primary_key=True)
+    tracking_token = models.CharField(max_length=64)
+    event_type = models.CharField(max_length=10, choices=EVENT_TYPE_CHOICES)
+    user_agent = models.TextField(blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'tracking_events'
+        ordering = ['event_id']
@@ -1,15 +1,12 @@
 from rest_framework import permissions
-from users.models import UserOrganization
+from users.membership import get_role, is_member
 
 class IsOrganizationMember(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated
     
     def has_object_permission(self, request, view, obj):
-        return UserOrganization.objects.filter(
-            user=request.user,
-            organization=obj.organization
-        ).exists()
+        return is_member(request.user, obj.organization_id)
 
 class IsOrganizationAdminOrOwner(permissions.BasePermission):
     
@@ -17,11 +14,7 @@ class IsOrganizationAdminOrOwner(permissions.BasePermission):
         return request.user and request.user.is_authenticated
     
     def has_object_permission(self, request, view, obj):
-        try:
-            user_org = UserOrganization.objects.get(
-                user=request.user,
-                organization=obj.organization
-            )
-            return user_org.role == 'admin' or obj.organization.owner_user == request.user
-        except UserOrganization.DoesNotExist:
-            return False
\ No newline at end of file
+        role = get_role(request.user, obj.organization_id)
+        if role is None:
+            return False
+        return role == 'admin' or obj.organization.owner_user_id == request.user.pk
\ No newline at end of file
@@ -0,0 +1,45 @@
+from django.db.models import Q
+
+SEARCH_FIELDS = ('email', 'first_name', 'last_name', 'company')
+MIN_SUBSTRING_LENGTH = 3
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 25
+
+def search_filter(term, lookup):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__{lookup}': term})
+    return condition
+
+def search_contacts(queryset, term):
+    """
+    Narrow a contact queryset to contacts whose email, name or company
+    contains the term, case-insensitively. Both lookups compile to
+    UPPER(column) LIKE, which the trigram GIN indexes on UPPER(column)
+    serve. Terms shorter than a trigram cannot be looked up in those
+    indexes as a substring, so they only match as a prefix.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    lookup = 'icontains' if len(term) >= MIN_SUBSTRING_LENGTH else 'istartswith'
+    return queryset.filter(search_filter(term, lookup))
+
+def autocomplete_contacts(queryset, term, limit=AUTOCOMPLETE_LIMIT):
+    """Contacts whose email, name or company starts with the term, as dicts."""
+    term = term.strip()
+    if not term:
+        return []
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+    contacts = queryset.filter(search_filter(term, 'istartswith')).only(
+        'contact_id', 'email', 'first_name', 'last_name', 'company'
+    ).order_by('email')[:limit]
+    return [
+        {
+            'contact_id': str(contact.contact_id),
+            'email': contact.email,
+            'name': contact.get_full_name(),
+            'company': contact.company,
+        }
+        for contact in contacts
+    ]
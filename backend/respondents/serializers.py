@@ -1,12 +1,11 @@
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
-from django.utils import timezone
 from .models import ContactList, Contact, ContactImport, SurveyInvitation, EmailTemplate, EmailCampaign, InvitationTracking
-import csv
-import io
 from users.webhook_sender import send_webhook
 from surveys.models import Survey
 
+MAX_IMPORT_FILE_SIZE = 100 * 1024 * 1024
+
 class ContactListSerializer(serializers.ModelSerializer):
     contact_count = serializers.ReadOnlyField()
     active_contact_count = serializers.ReadOnlyField()
@@ -110,12 +109,12 @@ class ContactImportSerializer(serializers.Serializer):
         if not value.name.endswith('.csv'):
             raise serializers.ValidationError("File harus berformat CSV")
         
-        if value.size > 5 * 1024 * 1024:
-            raise serializers.ValidationError("File terlalu besar (maksimal 5MB)")
+        if value.size > MAX_IMPORT_FILE_SIZE:
+            raise serializers.ValidationError("File terlalu besar (maksimal 100MB)")
         
         return value
     
-    def validated_contact_list_id(self, value):
+    def validate_contact_list_id(self, value):
         organization = self.context.get('organization')
 
         try:
@@ -128,110 +127,21 @@ class ContactImportSerializer(serializers.Serializer):
             raise serializers.ValidationError("Contact list tidak ditemukan")
         
     def create(self, validated_data):
-        contact_list = validated_data['contact_list_id']
         csv_file = validated_data['csv_file']
-        update_existing = validated_data['update_existing']
-        organization = self.context.get('organization')
-        imported_by = self.context.get('imported_by')
-        import_record = ContactImport.objects.create(
-            organization=organization,
-            contact_list=contact_list,
-            imported_by=imported_by,
+        return ContactImport.objects.create(
+            organization=self.context.get('organization'),
+            contact_list=validated_data['contact_list_id'],
+            imported_by=self.context.get('imported_by'),
             filename=csv_file.name,
-            status='processing'
+            csv_file=csv_file,
+            update_existing=validated_data['update_existing'],
+            status='queued'
         )
-
-        try:
-            csv_content = csv_file.read().decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(csv_content))
-            required_columns = ['email']
-            if not all(col in csv_reader.fieldnames for col in required_columns):
-                raise ValidationError("CSV harus memiliki kolom 'email'")
-            
-            total_rows = 0
-            successful_imports = 0
-            failed_imports = 0
-            duplicate_emails = 0
-            errors = []
-
-            for row_num, row in enumerate(csv_reader, start=1):
-                total_rows += 1
-                try:
-                    email = row.get('email', '').strip().lower()
-                    if not email:
-                        failed_imports += 1
-                        errors.append(f"Baris {row_num}: Email kosong")
-                        continue
-
-                    existing_contact = Contact.objects.filter(
-                        organization=organization,
-                        email=email
-                    ).first()
-                    
-                    contact_data = {
-                        'email': email,
-                        'first_name': row.get('first_name', '').strip(),
-                        'last_name': row.get('last_name', '').strip(),
-                        'phone': row.get('phone', '').strip(),
-                        'company': row.get('company', '').strip(),
-                        'job_title': row.get('job_title', '').strip(),
-                        'source': 'import'
-                    }
-                    custom_fields = {}
-                    for key, value in row.items():
-                        if key not in ['email', 'first_name', 'last_name', 'phone', 'company', 'job_title']:
-                            if value.strip():
-                                custom_fields[key] = value.strip()
-                    if custom_fields:
-                        contact_data['custom_fields'] = custom_fields
-                    if existing_contact:
-                        if update_existing:
-                            for key, value in contact_data.items():
-                                if key != 'source':
-                                    setattr(existing_contact, key, value)
-                            existing_contact.save()
-
-                            if not existing_contact.contact_lists.filter(list_id=contact_list.list_id).exists():
-                                existing_contact.contact_lists.add(contact_list)
-                            
-                            successful_imports += 1
-                        else:
-                            duplicate_emails += 1
-                            errors.append(f"Baris {row_num}: Email {email} sudah ada")
-                    else:
-                        contact = Contact.objects.create(
-                            organization=organization,
-                            created_by=imported_by,
-                            **contact_data
-                        )
-                        contact.contact_lists.add(contact_list)
-                        successful_imports += 1
-                
-                except Exception as e:
-                    failed_imports += 1
-                    errors.append(f"Baris {row_num}: {str(e)}")
-
-            import_record.total_rows = total_rows
-            import_record.processed_rows = total_rows
-            import_record.successful_imports = successful_imports
-            import_record.failed_imports = failed_imports
-            import_record.duplicate_imports = duplicate_emails
-            import_record.error_log = errors
-            import_record.status = 'completed' if failed_imports == 0 else 'partial'
-            import_record.completed_at = timezone.now()
-            import_record.save()
-            
-            return import_record
-            
-        except Exception as e:
-            import_record.status = 'failed'
-            import_record.error_log = [str(e)]
-            import_record.completed_at = timezone.now()
-            import_record.save()
-            raise serializers.ValidationError(f"Gagal memproses file CSV: {str(e)}")
         
 class ContactImportResultSerializer(serializers.ModelSerializer):
     success_rate = serializers.ReadOnlyField()
+    progress = serializers.ReadOnlyField()
+    duplicate_emails = serializers.IntegerField(source='duplicate_imports', read_only=True)
     imported_by_name = serializers.CharField(source='imported_by.get_full_name', read_only=True)
     contact_list_name = serializers.CharField(source='contact_list.name', read_only=True)
 
@@ -240,7 +150,7 @@ class ContactImportResultSerializer(serializers.ModelSerializer):
         fields = [
             'import_id', 'filename', 'total_rows', 'processed_rows',
             'successful_imports', 'failed_imports', 'duplicate_emails',
-            'status', 'success_rate', 'error_log', 'imported_by_name',
+            'status', 'progress', 'success_rate', 'error_log', 'imported_by_name',
             'contact_list_name', 'started_at', 'completed_at'
         ]
 
@@ -0,0 +1,56 @@
+import re
+from functools import lru_cache
+from django.conf import settings
+
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+class CompiledTemplate:
+    """
+    An email template split once into literal segments and placeholder
+    slots, so rendering is a single join. Unknown placeholders are kept
+    as they are.
+    """
+    def __init__(self, source):
+        self.segments = PLACEHOLDER_PATTERN.split(source or '')
+        self.slots = [(index, self.segments[index]) for index in range(1, len(self.segments), 2)]
+        for index, name in self.slots:
+            self.segments[index] = '{' + name + '}'
+
+    def render(self, context):
+        parts = self.segments.copy()
+        for index, name in self.slots:
+            if name in context:
+                parts[index] = context[name]
+        return ''.join(parts)
+
+@lru_cache(maxsize=256)
+def compile_template(source):
+    return CompiledTemplate(source)
+
+class MessageRenderer:
+    """
+    Renders the subject and body of one send for many contacts. Templates
+    are compiled and the survey and organization context is built once per
+    send instead of once per contact.
+    """
+    def __init__(self, subject_line, message_body, survey):
+        self.subject = compile_template(subject_line)
+        self.body = compile_template(message_body)
+        base_url = getattr(settings, 'SITE_URL', 'http://localhost:8000')
+        self.survey_url = f"{base_url}/surveys/take/{survey.share_token}"
+        self.static_context = {
+            'survey_title': survey.title,
+            'survey_description': survey.description or '',
+            'organization_name': survey.organization.name,
+            'survey_url': self.survey_url,
+        }
+
+    def render(self, contact, invitation=None):
+        context = self.static_context.copy()
+        context['first_name'] = contact.first_name or ''
+        context['last_name'] = contact.last_name or ''
+        context['full_name'] = contact.get_full_name() or contact.email
+        context['email'] = contact.email
+        if invitation:
+            context['survey_url'] = f"{self.survey_url}?invitation={invitation.tracking_token}"
+        return self.subject.render(context), self.body.render(context)
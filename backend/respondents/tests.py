@@ -1,3 +1,345 @@
-from django.test import TestCase
+import csv
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from surveys.models import Survey
+from users.tests import create_organization
+from .importer import claim_next_import, count_rows, import_batch, process_contact_import
+from .invitations import create_invitations
+from .mailer import ConnectionPool, deliver_messages, send_queued_invitations
+from .models import Contact, ContactImport, ContactList, EmailCampaign, InvitationTracking, SurveyInvitation, TrackingEvent
+from .tracking import TRACKING_UPDATE_CHUNK, process_tracking_events
 
-# Create your tests here.
+def render(contact, invitation):
+    return 'Subject', f'Hello {contact.email}'
+
+class RespondentsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.organization = create_organization()
+        self.survey = Survey.objects.create(
+            title='Survey', organization=self.organization, created_by=self.user, status='active'
+        )
+
+    def create_contacts(self, count, start=0):
+        return Contact.objects.bulk_create([
+            Contact(email=f'contact{i}@example.com', organization=self.organization) for i in range(start, start + count)
+        ])
+
+    def queue_invitations(self, count):
+        self.create_contacts(count)
+        create_invitations(
+            self.survey, Contact.objects.filter(organization=self.organization), render,
+            sent_by=self.user, status='queued'
+        )
+
+class SendBulkInvitationsTests(RespondentsTestCase):
+    def test_already_invited_contacts_are_skipped(self):
+        self.queue_invitations(2)
+        self.create_contacts(3, start=2)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post('/api/v1/respondents/invitations/send-bulk/', {
+            'organization_id': str(self.organization.org_id),
+            'survey_id': str(self.survey.survey_id),
+            'contact_ids': [str(contact_id) for contact_id in Contact.objects.values_list('contact_id', flat=True)],
+            'subject_line': 'Hi {first_name}',
+            'message_body': 'Take {survey_title}',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            {key: response.json()['data'][key] for key in ('total_contacts', 'invitations_created', 'invitations_skipped')},
+            {'total_contacts': 5, 'invitations_created': 3, 'invitations_skipped': 2}
+        )
+        self.assertEqual(SurveyInvitation.objects.count(), 5)
+
+class CursorPaginationTests(RespondentsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fetch_all(self, url, results='results'):
+        items = []
+        while url:
+            self.assertLess(len(items), 100)
+            data = self.client.get(url).json()
+            items += data[results]
+            url = data['next']
+        return items
+
+    def test_contacts_page_through_equal_timestamps(self):
+        self.create_contacts(5)
+        Contact.objects.update(created_at=timezone.now())
+
+        contacts = self.fetch_all('/api/v1/respondents/contacts/?page_size=2')
+
+        self.assertEqual(sorted(contact['email'] for contact in contacts), [f'contact{i}@example.com' for i in range(5)])
+
+    def test_invitations_newest_first(self):
+        self.queue_invitations(3)
+        now = timezone.now()
+        for minutes, invitation in enumerate(SurveyInvitation.objects.order_by('contact__email')):
+            SurveyInvitation.objects.filter(pk=invitation.pk).update(created_at=now - timedelta(minutes=minutes))
+
+        invitations = self.fetch_all(f'/api/v1/respondents/invitations/?survey={self.survey.survey_id}&page_size=2')
+
+        self.assertEqual(
+            [invitation['contact_email'] for invitation in invitations],
+            [f'contact{i}@example.com' for i in range(3)]
+        )
+
+    def test_import_history_keeps_the_envelope(self):
+        contact_list = ContactList.objects.create(name='List', organization=self.organization, created_by=self.user)
+        now = timezone.now()
+        for i in range(3):
+            ContactImport.objects.create(
+                organization=self.organization, contact_list=contact_list, imported_by=self.user,
+                filename=f'{i}.csv', status='completed', started_at=now - timedelta(minutes=i)
+            )
+
+        imports = self.fetch_all('/api/v1/respondents/import-history/?page_size=2', results='data')
+
+        self.assertEqual([item['filename'] for item in imports], ['0.csv', '1.csv', '2.csv'])
+
+class SendQueuedInvitationsTests(RespondentsTestCase):
+    # Sends run inline, so the test transaction sees every query
+    executor = SimpleNamespace(map=map)
+
+    def test_sends_claimed_invitations(self):
+        self.queue_invitations(3)
+
+        sent = send_queued_invitations(ConnectionPool(1), self.executor)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            set(SurveyInvitation.objects.values_list('status', 'lease_expires_at')), {('sent', None)}
+        )
+
+    def test_invitations_are_sending_while_delivered(self):
+        self.queue_invitations(2)
+        seen = []
+
+        def deliver(pool, messages):
+            seen.extend(SurveyInvitation.objects.values_list('status', flat=True))
+            return [(invitation_id, None) for invitation_id, _ in messages]
+
+        with mock.patch('respondents.mailer.deliver_messages', deliver):
+            send_queued_invitations(ConnectionPool(1), self.executor)
+
+        self.assertEqual(seen, ['sending', 'sending'])
+
+    def test_failed_send_is_recorded(self):
+        self.queue_invitations(1)
+
+        def deliver(pool, messages):
+            return [(invitation_id, 'refused') for invitation_id, _ in messages]
+
+        with mock.patch('respondents.mailer.deliver_messages', deliver), self.assertLogs('respondents.mailer'):
+            send_queued_invitations(ConnectionPool(1), self.executor)
+
+        invitation = SurveyInvitation.objects.get()
+        self.assertEqual((invitation.status, invitation.error_message, invitation.retry_count), ('failed', 'refused', 1))
+
+    def test_expired_claim_is_sent_again(self):
+        self.queue_invitations(2)
+        SurveyInvitation.objects.update(status='sending', lease_expires_at=timezone.now() - timedelta(seconds=1))
+        live = SurveyInvitation.objects.first()
+        SurveyInvitation.objects.filter(pk=live.pk).update(lease_expires_at=timezone.now() + timedelta(minutes=5))
+
+        sent = send_queued_invitations(ConnectionPool(1), self.executor)
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(SurveyInvitation.objects.get(pk=live.pk).status, 'sending')
+
+class DeliverMessagesTests(SimpleTestCase):
+    class Connection:
+        def __init__(self, refuse=()):
+            self.refuse = refuse
+            self.batches = []
+
+        def send_messages(self, messages):
+            batch = []
+            self.batches.append(batch)
+            for message in messages:
+                if message.subject in self.refuse:
+                    raise OSError(f'refused {message.subject}')
+                batch.append(message.subject)
+            return len(batch)
+
+        def open(self):
+            pass
+
+        def close(self):
+            pass
+
+    def deliver(self, connection, count):
+        @contextmanager
+        def pooled():
+            yield connection
+
+        messages = [(i, EmailMessage(subject=str(i), to=[f'{i}@example.com'])) for i in range(count)]
+        return deliver_messages(SimpleNamespace(connection=pooled), messages)
+
+    def test_batch_is_sent_in_one_call(self):
+        connection = self.Connection()
+
+        results = self.deliver(connection, 3)
+
+        self.assertEqual(connection.batches, [['0', '1', '2']])
+        self.assertEqual(results, [(0, None), (1, None), (2, None)])
+
+    def test_failure_is_mapped_to_its_invitation_and_the_rest_resent(self):
+        connection = self.Connection(refuse={'1'})
+
+        results = self.deliver(connection, 4)
+
+        self.assertEqual(connection.batches, [['0'], ['2', '3']])
+        self.assertEqual(results, [(0, None), (1, 'refused 1'), (2, None), (3, None)])
+
+class ProcessTrackingEventsTests(RespondentsTestCase):
+    def test_each_invitation_gets_its_own_first_event_time(self):
+        self.queue_invitations(2)
+        SurveyInvitation.objects.update(status='sent')
+        first, second = SurveyInvitation.objects.order_by('contact__email')
+        now = timezone.now()
+        for invitation, event_type, minutes in [
+            (first, 'open', 30), (first, 'open', 20), (second, 'open', 10), (first, 'click', 5), (second, 'open', 1)
+        ]:
+            event = TrackingEvent.objects.create(tracking_token=invitation.tracking_token, event_type=event_type)
+            TrackingEvent.objects.filter(pk=event.pk).update(created_at=now - timedelta(minutes=minutes))
+
+        self.assertEqual(process_tracking_events(), 5)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status), ('clicked', 'opened'))
+        self.assertEqual(first.opened_at, now - timedelta(minutes=30))
+        self.assertEqual(first.clicked_at, now - timedelta(minutes=5))
+        self.assertEqual(second.opened_at, now - timedelta(minutes=10))
+        self.assertEqual(InvitationTracking.objects.get(invitation=second).opened_count, 2)
+        self.assertFalse(TrackingEvent.objects.exists())
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ContactImportTests(RespondentsTestCase):
+    def create_import(self, content='email,first_name\na@example.com,A\n,Empty\nb@example.com,B\nc@example.com,C\n'):
+        contact_list, _ = ContactList.objects.get_or_create(
+            name='List', organization=self.organization, created_by=self.user
+        )
+        import_record = ContactImport(
+            organization=self.organization, contact_list=contact_list, imported_by=self.user,
+            filename='contacts.csv', status='queued'
+        )
+        import_record.csv_file.save('contacts.csv', ContentFile(content))
+        return import_record
+
+    def test_import_parses_the_file_once(self):
+        import_record = self.create_import()
+
+        with mock.patch('respondents.importer.csv.DictReader', wraps=csv.DictReader) as reader:
+            process_contact_import(claim_next_import())
+
+        import_record.refresh_from_db()
+        self.assertEqual(reader.call_count, 1)
+        self.assertEqual(
+            (import_record.status, import_record.total_rows, import_record.processed_rows, import_record.successful_imports),
+            ('partial', 4, 4, 3)
+        )
+        self.assertEqual(import_record.error_log, ['Baris 2: Email kosong'])
+        self.assertIsNone(import_record.lease_expires_at)
+
+    def test_progress_is_reported_while_importing(self):
+        import_record = self.create_import()
+        progress = []
+
+        def record_progress(import_record, batch):
+            progress.append(ContactImport.objects.get(pk=import_record.pk).progress)
+            return import_batch(import_record, batch)
+
+        with mock.patch('respondents.importer.IMPORT_BATCH_SIZE', 2), \
+                mock.patch('respondents.importer.import_batch', record_progress):
+            process_contact_import(claim_next_import())
+
+        self.assertEqual(progress, [0, 50])
+        import_record.refresh_from_db()
+        self.assertEqual((import_record.total_rows, import_record.progress), (4, 100))
+
+    def test_stored_file_is_deleted_when_the_import_finishes(self):
+        for content, status in [('email\na@example.com\n', 'completed'), ('name\nA\n', 'failed')]:
+            import_record = self.create_import(content)
+            storage, name = import_record.csv_file.storage, import_record.csv_file.name
+
+            process_contact_import(claim_next_import())
+
+            import_record.refresh_from_db()
+            self.assertEqual(import_record.status, status)
+            self.assertFalse(import_record.csv_file)
+            self.assertFalse(storage.exists(name))
+
+    def test_row_count_without_trailing_newline(self):
+        import_record = self.create_import('email\na@example.com\nb@example.com')
+
+        self.assertEqual(count_rows(import_record), 2)
+
+    def test_import_with_expired_lease_is_resumed(self):
+        import_record = self.create_import()
+        self.assertEqual(claim_next_import(), import_record)
+        self.assertIsNone(claim_next_import())
+
+        # The worker died after saving the first two rows
+        Contact.objects.create(email='a@example.com', organization=self.organization)
+        ContactImport.objects.filter(pk=import_record.pk).update(
+            processed_rows=2, successful_imports=1, failed_imports=1,
+            error_log=['Baris 2: Email kosong'], lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        process_contact_import(claim_next_import())
+
+        import_record.refresh_from_db()
+        self.assertEqual((import_record.processed_rows, import_record.successful_imports), (4, 3))
+        self.assertEqual(import_record.duplicate_imports, 0)
+        self.assertEqual(import_record.error_log, ['Baris 2: Email kosong'])
+        self.assertEqual(
+            sorted(Contact.objects.values_list('email', flat=True)), ['a@example.com', 'b@example.com', 'c@example.com']
+        )
+
+    def test_statement_count_does_not_grow_with_the_batch(self):
+        campaign = EmailCampaign.objects.create(
+            name='Campaign', survey=self.survey, organization=self.organization, created_by=self.user,
+            subject_line='Subject', message_body='Body', sender_name='Sender', sender_email='sender@example.com'
+        )
+        self.queue_invitations(TRACKING_UPDATE_CHUNK + 1)
+        SurveyInvitation.objects.update(status='sent')
+        InvitationTracking.objects.update(campaign=campaign)
+        TrackingEvent.objects.bulk_create([
+            TrackingEvent(tracking_token=token, event_type=event_type, user_agent='agent', ip_address='10.0.0.1')
+            for token in SurveyInvitation.objects.values_list('tracking_token', flat=True)
+            for event_type in ('open', 'click')
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            process_tracking_events()
+
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 7)
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.emails_opened, campaign.emails_clicked), (TRACKING_UPDATE_CHUNK + 1,) * 2)
+        self.assertEqual(set(SurveyInvitation.objects.values_list('status', flat=True)), {'clicked'})
+        self.assertEqual(
+            set(InvitationTracking.objects.values_list('opened_count', 'clicked_count', 'user_agent', 'ip_address')),
+            {(1, 1, 'agent', '10.0.0.1')}
+        )
@@ -0,0 +1,158 @@
+from django.db import connection, transaction
+from .models import EmailCampaign, InvitationTracking, SurveyInvitation, TrackingEvent
+
+TRACKING_BATCH_SIZE = 5000
+TRACKING_UPDATE_CHUNK = 1000
+
+def record_event(tracking_token, event_type, user_agent='', ip_address=None):
+    if len(tracking_token) > TrackingEvent._meta.get_field('tracking_token').max_length:
+        return
+    TrackingEvent.objects.create(
+        tracking_token=tracking_token,
+        event_type=event_type,
+        user_agent=user_agent,
+        ip_address=ip_address or None
+    )
+
+def fold_events(events):
+    """Collapse a batch of events into per-token open/click summaries."""
+    summaries = {}
+    for event in events:
+        summary = summaries.setdefault(event.tracking_token, {
+            'opens': 0, 'clicks': 0,
+            'first_opened_at': None, 'last_opened_at': None,
+            'first_clicked_at': None, 'last_clicked_at': None,
+            'user_agent': '', 'ip_address': None,
+        })
+        if event.event_type == 'open':
+            summary['opens'] += 1
+            summary['first_opened_at'] = summary['first_opened_at'] or event.created_at
+            summary['last_opened_at'] = event.created_at
+            if event.user_agent:
+                summary['user_agent'] = event.user_agent
+            if event.ip_address:
+                summary['ip_address'] = event.ip_address
+        else:
+            summary['clicks'] += 1
+            summary['first_clicked_at'] = summary['first_clicked_at'] or event.created_at
+            summary['last_clicked_at'] = event.created_at
+    return summaries
+
+def update_from_values(model, columns, assignments, rows, condition=''):
+    """
+    Apply per-row values to a model's table with one UPDATE ... FROM
+    (VALUES ...) per TRACKING_UPDATE_CHUNK rows. columns lists the (name,
+    type) of each value, the first one being the key matched against the
+    table's column of the same name. assignments and condition are SQL
+    written against t (the table) and v (the values).
+    """
+    table = model._meta.db_table
+    key = columns[0][0]
+    row_sql = '(' + ', '.join(f'%s::{column_type}' for _, column_type in columns) + ')'
+    names = ', '.join(f'"{name}"' for name, _ in columns)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), TRACKING_UPDATE_CHUNK):
+            chunk = rows[start:start + TRACKING_UPDATE_CHUNK]
+            cursor.execute(
+                f'UPDATE "{table}" AS t SET {assignments} '
+                f'FROM (VALUES {", ".join([row_sql] * len(chunk))}) AS v({names}) '
+                f'WHERE t."{key}" = v."{key}" {condition}',
+                [value for row in chunk for value in row]
+            )
+
+def process_tracking_events(limit=TRACKING_BATCH_SIZE):
+    """
+    Fold one batch of buffered tracking events into the tracking rows,
+    invitation statuses and campaign counters, then delete the batch. The
+    events are folded once per token, and each table gets a bounded number
+    of UPDATE ... FROM (VALUES ...) statements. Counters are incremented in
+    SQL, so concurrent consumers and other writers never lose counts.
+    Returns the number of events processed.
+    """
+    with transaction.atomic():
+        events = list(
+            TrackingEvent.objects.select_for_update(skip_locked=True).order_by('event_id')[:limit]
+        )
+        if not events:
+            return 0
+
+        summaries = fold_events(events)
+        invitation_ids = dict(SurveyInvitation.objects.filter(
+            tracking_token__in=summaries.keys()
+        ).values_list('tracking_token', 'invitation_id'))
+
+        InvitationTracking.objects.bulk_create([
+            InvitationTracking(invitation_id=invitation_id)
+            for invitation_id in invitation_ids.values()
+        ], ignore_conflicts=True)
+        campaign_ids = dict(InvitationTracking.objects.filter(
+            invitation_id__in=invitation_ids.values()
+        ).values_list('invitation_id', 'campaign_id'))
+
+        tracking_rows = []
+        opened_at = []
+        clicked_at = []
+        campaign_counts = {}
+        for token, summary in summaries.items():
+            invitation_id = invitation_ids.get(token)
+            if invitation_id is None:
+                continue
+
+            tracking_rows.append((
+                invitation_id,
+                summary['opens'], summary['first_opened_at'], summary['last_opened_at'],
+                summary['clicks'], summary['first_clicked_at'], summary['last_clicked_at'],
+                summary['user_agent'], summary['ip_address']
+            ))
+            if summary['opens']:
+                opened_at.append((invitation_id, summary['first_opened_at']))
+            if summary['clicks']:
+                clicked_at.append((invitation_id, summary['first_clicked_at']))
+
+            campaign_id = campaign_ids.get(invitation_id)
+            if campaign_id:
+                counts = campaign_counts.setdefault(campaign_id, [0, 0])
+                counts[0] += summary['opens']
+                counts[1] += summary['clicks']
+
+        update_from_values(
+            InvitationTracking,
+            [
+                ('invitation_id', 'uuid'),
+                ('opens', 'integer'), ('first_opened_at', 'timestamptz'), ('last_opened_at', 'timestamptz'),
+                ('clicks', 'integer'), ('first_clicked_at', 'timestamptz'), ('last_clicked_at', 'timestamptz'),
+                ('user_agent', 'text'), ('ip_address', 'inet'),
+            ],
+            'opened_count = t.opened_count + v.opens, '
+            'first_opened_at = COALESCE(t.first_opened_at, v.first_opened_at), '
+            'last_opened_at = COALESCE(v.last_opened_at, t.last_opened_at), '
+            'clicked_count = t.clicked_count + v.clicks, '
+            'first_clicked_at = COALESCE(t.first_clicked_at, v.first_clicked_at), '
+            'last_clicked_at = COALESCE(v.last_clicked_at, t.last_clicked_at), '
+            "user_agent = COALESCE(NULLIF(v.user_agent, ''), t.user_agent), "
+            'ip_address = COALESCE(v.ip_address, t.ip_address)',
+            tracking_rows
+        )
+        update_from_values(
+            SurveyInvitation,
+            [('invitation_id', 'uuid'), ('opened_at', 'timestamptz')],
+            "status = 'opened', opened_at = v.opened_at",
+            opened_at,
+            "AND t.status = 'sent'"
+        )
+        update_from_values(
+            SurveyInvitation,
+            [('invitation_id', 'uuid'), ('clicked_at', 'timestamptz')],
+            "status = 'clicked', clicked_at = v.clicked_at",
+            clicked_at,
+            "AND t.status IN ('sent', 'opened')"
+        )
+        update_from_values(
+            EmailCampaign,
+            [('campaign_id', 'uuid'), ('opens', 'integer'), ('clicks', 'integer')],
+            'emails_opened = t.emails_opened + v.opens, emails_clicked = t.emails_clicked + v.clicks',
+            [(campaign_id, opens, clicks) for campaign_id, (opens, clicks) in campaign_counts.items()]
+        )
+
+        TrackingEvent.objects.filter(event_id__in=[event.event_id for event in events]).delete()
+    return len(events)
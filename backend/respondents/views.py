@@ -5,17 +5,20 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import ValidationError
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
-from django.db.models import Q, Count, Sum
+from django.db.models import Count, Sum
 from django.db import transaction
-from django.core.mail import send_mail
-from django.conf import settings
 from django.http import HttpResponse
 from django.shortcuts import redirect
 
-from users.models import UserOrganization
+from users.models import Organization
+from project_insight.pagination import KeysetPagination, StartedAtPagination, paginated_response_data
+from users.membership import admin_organization_id, is_member, organization_ids
 from surveys.models import Survey
 from .models import ContactList, Contact, ContactImport, SurveyInvitation, EmailTemplate, EmailCampaign, InvitationTracking
+from .invitations import create_invitations
+from .search import AUTOCOMPLETE_LIMIT, autocomplete_contacts, search_contacts
+from .templating import MessageRenderer
+from .tracking import record_event
 from .serializers import (
     ContactListSerializer, ContactSerializer, ContactImportSerializer,
     ContactImportResultSerializer, EmailTemplateSerializer, 
@@ -29,33 +32,21 @@ from .serializers import (
 
 def get_user_organization(user, org_id=None):
     if org_id:
-        try:
-            user_org = UserOrganization.objects.get(
-                user=user,
-                organization__org_id=org_id
-            )
-            return user_org.organization
-        except UserOrganization.DoesNotExist:
+        if not is_member(user, org_id):
             raise ValidationError("Tidak memiliki akses ke organisasi ini")
     else:
-        user_org = UserOrganization.objects.filter(
-            user=user,
-            role='admin'
-        ).first()
+        org_id = admin_organization_id(user)
 
-        if not user_org:
+        if org_id is None:
             raise ValidationError("User harus menjadi admin minimal satu organisasi")
-        return user_org.organization
+    return Organization.objects.get(org_id=org_id)
 
 class ContactPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated
     
     def has_object_permission(self, request, view, obj):
-        return UserOrganization.objects.filter(
-            user=request.user,
-            organization=obj.organization
-        ).exists()
+        return is_member(request.user, obj.organization_id)
     
 class ContactListView(generics.ListCreateAPIView):
     serializer_class = ContactListSerializer
@@ -64,7 +55,7 @@ class ContactListView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         org_id = self.request.query_params.get('organization')
-        user_orgs = UserOrganization.objects.filter(user=user).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(user)
         queryset = ContactList.objects.filter(organization_id__in=user_orgs)
 
         if org_id:
@@ -90,9 +81,7 @@ class ContactListDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'list_id'
 
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(self.request.user)
         
         return ContactList.objects.filter(
             organization_id__in=user_orgs
@@ -101,12 +90,13 @@ class ContactListDetailView(generics.RetrieveUpdateDestroyAPIView):
 class ContactView(generics.ListCreateAPIView):
     serializer_class = ContactSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
         org_id = self.request.query_params.get('organization')
         list_id = self.request.query_params.get('contact_list')
-        user_orgs = UserOrganization.objects.filter(user=user).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(user)
         queryset = Contact.objects.filter(organization_id__in=user_orgs)
 
         if org_id:
@@ -121,12 +111,7 @@ class ContactView(generics.ListCreateAPIView):
             queryset = queryset.filter(is_active=is_active.lower() == 'true')
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(email__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(company__icontains=search)
-            )
+            queryset = search_contacts(queryset, search)
         return queryset.select_related('organization', 'created_by').prefetch_related('contact_lists')
     
     def get_serializer_context(self):
@@ -142,9 +127,7 @@ class ContactDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'contact_id'
 
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(self.request.user)
 
         return Contact.objects.filter(
             organization_id__in=user_orgs
@@ -169,22 +152,14 @@ def import_contacts(request):
     )
 
     if serializer.is_valid():
-        try:
-            import_result = serializer.save()
-            result_serializer = ContactImportResultSerializer(import_result)
+        import_record = serializer.save()
+        result_serializer = ContactImportResultSerializer(import_record)
 
-            return APIResponse({
-                'success': True,
-                'message': 'Import berhasil diproses',
-                'data': result_serializer.data
-            }, status=status.HTTP_201_CREATED)
-        
-        except Exception as e:
-            return APIResponse({
-                'success': False,
-                'message': 'Import gagal',
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return APIResponse({
+            'success': True,
+            'message': 'Import sedang diproses',
+            'data': result_serializer.data
+        }, status=status.HTTP_202_ACCEPTED)
     return APIResponse({
         'success': False,
         'message': 'Data tidak valid',
@@ -193,19 +168,52 @@ def import_contacts(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def import_history(request):
+def contact_autocomplete(request):
+    term = request.query_params.get('q', '')
+    try:
+        limit = int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        raise ValidationError("Parameter limit harus berupa angka")
+    queryset = Contact.objects.filter(organization_id__in=organization_ids(request.user))
     org_id = request.query_params.get('organization')
-    organization = get_user_organization(request.user, org_id)
-    imports = ContactImport.objects.filter(
-        organization=organization
-    ).select_related('contact_list', 'imported_by').order_by('-started_at')
-    serializer = ContactImportResultSerializer(imports, many=True)
+    if org_id:
+        queryset = queryset.filter(organization_id=org_id)
+
+    return APIResponse({
+        'success': True,
+        'data': autocomplete_contacts(queryset, term, limit)
+    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def import_status(request, import_id):
+    user_orgs = organization_ids(request.user)
+    import_record = get_object_or_404(
+        ContactImport.objects.select_related('contact_list', 'imported_by'),
+        import_id=import_id,
+        organization_id__in=user_orgs
+    )
+    serializer = ContactImportResultSerializer(import_record)
 
     return APIResponse({
         'success': True,
         'data': serializer.data
     }, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def import_history(request):
+    org_id = request.query_params.get('organization')
+    organization = get_user_organization(request.user, org_id)
+    imports = ContactImport.objects.filter(
+        organization=organization
+    ).select_related('contact_list', 'imported_by')
+
+    return APIResponse(
+        paginated_response_data(request, imports, ContactImportResultSerializer, StartedAtPagination),
+        status=status.HTTP_200_OK
+    )
+
 class EmailTemplateView(generics.ListCreateAPIView):
     serializer_class = EmailTemplateSerializer
     permission_classes = [IsAuthenticated]
@@ -213,7 +221,7 @@ class EmailTemplateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         org_id = self.request.query_params.get('organization')
-        user_orgs = UserOrganization.objects.filter(user=user).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(user)
         queryset = EmailTemplate.objects.filter(organization_id__in=user_orgs)
 
         if org_id:
@@ -240,9 +248,7 @@ class EmailTemplateDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'template_id'
 
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(self.request.user)
         
         return EmailTemplate.objects.filter(
             organization_id__in=user_orgs,
@@ -277,78 +283,33 @@ def send_bulk_invitations(request):
                     contacts = contacts.filter(contact_id__in=contact_ids)
                 contacts = contacts.distinct()
                 
-                invitations_created = 0
-                invitations_failed = 0
-                errors = []
-
-                for contact in contacts:
-                    try:
-                        if SurveyInvitation.objects.filter(survey=survey, contact=contact).exists():
-                            continue
-                        if email_template:
-                            subject, message = email_template.render_for_contact(contact, survey)
-                        else:
-                            subject = serializer.validated_data.get('subject_line', '')
-                            message = serializer.validated_data.get('message_body', '')
-                            context = {
-                                'first_name': contact.first_name or '',
-                                'last_name': contact.last_name or '',
-                                'full_name': contact.get_full_name() or contact.email,
-                                'survey_title': survey.title,
-                                'organization_name': survey.organization.name,
-                            }
-
-                            for key, value in context.items():
-                                placeholder = '{' + key + '}'
-                                subject = subject.replace(placeholder, str(value))
-                                message = message.replace(placeholder, str(value))
-                        
-                        invitation = SurveyInvitation.objects.create(
-                            survey=survey,
-                            contact=contact,
-                            subject_line=subject,
-                            message_body=message,
-                            sender_email=serializer.validated_data.get('sender_email', ''),
-                            sender_name=serializer.validated_data.get('sender_name', ''),
-                            sent_by=request.user
-                        )
-                        if serializer.validated_data.get('send_immediately', True):
-                            try:
-                                send_mail(
-                                    subject=subject,
-                                    message=message,
-                                    from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@projectinsight.com'),
-                                    recipient_list=[contact.email],
-                                    fail_silently=False
-                                )
-
-                                invitation.status = 'sent'
-                                invitation.sent_at = timezone.now()
-                                invitation.save()
-                                contact.last_contacted = timezone.now()
-                                contact.save(update_fields=['last_contacted'])
-                                invitations_created += 1
-                            
-                            except Exception as email_error:
-                                invitation.status = 'failed'
-                                invitation.error_message = str(email_error)
-                                invitation.save()
-                                invitation_failed += 1
-                                errors.append(f"Gagal kirim ke {contact.email}: {str(email_error)}")
-                        else:
-                            invitations_created += 1
-                    except Exception as e:
-                        invitations_failed += 1
-                        errors.append(f"Gagal buat invitation untuk {contact.email}: {str(e)}")
+                if email_template:
+                    renderer = email_template.renderer(survey)
+                else:
+                    renderer = MessageRenderer(
+                        serializer.validated_data.get('subject_line', ''),
+                        serializer.validated_data.get('message_body', ''),
+                        survey
+                    )
+
+                invitations_created = create_invitations(
+                    survey,
+                    contacts,
+                    renderer.render,
+                    sent_by=request.user,
+                    sender_email=serializer.validated_data.get('sender_email', ''),
+                    sender_name=serializer.validated_data.get('sender_name', ''),
+                    status='queued' if serializer.validated_data.get('send_immediately', True) else 'pending'
+                )
 
+                total_contacts = contacts.count()
                 return APIResponse({
                     'success': True,
                     'message': 'Bulk invitation berhasil diproses',
                     'data': {
-                        'total_contacts': contacts.count(),
+                        'total_contacts': total_contacts,
                         'invitations_created': invitations_created,
-                        'invitations_failed': invitations_failed,
-                        'errors': errors[:10]
+                        'invitations_skipped': total_contacts - invitations_created
                     }
                 }, status=status.HTTP_201_CREATED)
         
@@ -368,11 +329,12 @@ def send_bulk_invitations(request):
 class SurveyInvitationView(generics.ListAPIView):
     serializer_class = SurveyInvitationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
         survey_id = self.request.query_params.get('survey')
-        user_orgs = UserOrganization.objects.filter(user=user).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(user)
         queryset = SurveyInvitation.objects.filter(survey__organization_id__in=user_orgs)
         
         if survey_id:
@@ -483,6 +445,7 @@ def contact_statistics(request):
 
 class EmailCampaignListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -490,9 +453,7 @@ class EmailCampaignListView(generics.ListCreateAPIView):
         return EmailCampaignSerializer
     
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user = self.request.user
-        ).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(self.request.user)
 
         return EmailCampaign.objects.filter(
             organization_id__in = user_orgs
@@ -501,11 +462,8 @@ class EmailCampaignListView(generics.ListCreateAPIView):
     def get_serializer_context(self):
         context = super().get_serializer_context()
         if self.request.method == 'POST':
-            user_org = UserOrganization.objects.filter(
-                user = self.request.user,
-                role = 'admin'
-            ).first()
-            context['organization'] = user_org.organization if user_org else None
+            org_id = admin_organization_id(self.request.user)
+            context['organization'] = Organization.objects.get(org_id=org_id) if org_id else None
             context['user'] = self.request.user
         return context
 
@@ -515,121 +473,81 @@ class EmailCampaignDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'campaign_id'
 
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
+        user_orgs = organization_ids(self.request.user)
         
         return EmailCampaign.objects.filter(
             organization_id__in=user_orgs
         ).select_related('survey', 'created_by')
 
+def get_user_campaign(user, campaign_id):
+    user_orgs = organization_ids(user)
+    return get_object_or_404(EmailCampaign, campaign_id=campaign_id, organization_id__in=user_orgs)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def send_campaign(request, campaign_id):
-    campaign = get_object_or_404(EmailCampaign, campaign_id=campaign_id)
+    campaign = get_user_campaign(request.user, campaign_id)
 
-    if campaign.status not in ['draft', 'scheduled']:
+    updated = EmailCampaign.objects.filter(
+        campaign_id=campaign.campaign_id,
+        status__in=['draft', 'scheduled']
+    ).update(status='sending')
+    if not updated:
         return APIResponse({
             'success': False,
             'message': 'Campaign sudah terkirim atau sedang proses'
         }, status=status.HTTP_400_BAD_REQUEST)
-    try:
-        with transaction.atomic():
-            campaign.status = 'sending'
-            campaign.started_at = timezone.now()
-            campaign.save()
-
-            contacts = Contact.objects.filter(
-                contact_lists__in=campaign.contact_lists.all(),
-                is_active=True,
-                status='subscribed'
-            ).distinct()
-            send_count = 0
-            failed_count = 0
-
-            for contact in contacts:
-                try:
-                    existing = SurveyInvitation.objects.filter(
-                        survey=campaign.survey,
-                        contact=contact
-                    ).first()
-
-                    if existing:
-                        continue
-
-                    subject = campaign.subject_line
-                    message = campaign.message_body
-                    replacements = {
-                        '{first_name}': contact.first_name or '',
-                        '{last_name}': contact.last_name or '',
-                        '{email}': contact.email,
-                        '{survey_title}': campaign.survey.title,
-                    }
 
-                    for key, value in replacements.items():
-                        subject = subject.replace(key, value)
-                        message = message.replace(key, value)
-                    
-                    invitation = SurveyInvitation.objects.create(
-                        survey=campaign.survey,
-                        contact=contact,
-                        subject_line=subject,
-                        message_body=message,
-                        sender_email=campaign.sender_email,
-                        sender_name=campaign.sender_name,
-                        sent_by=request.user
-                    )
+    campaign.refresh_from_db()
+    return APIResponse({
+        'success': True,
+        'message': 'Campaign sedang dikirim',
+        'data': EmailCampaignSerializer(campaign).data
+    }, status=status.HTTP_202_ACCEPTED)
 
-                    survey_url = f"{getattr(settings, 'SITE_URL', 'http://localhost:8000')}/surveys/take/{campaign.survey.share_token}?invitation={invitation.tracking_token}"
-                    message = message.replace('{survey_url}', survey_url)
-                    
-                    send_mail(
-                        subject=subject,
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[contact.email],
-                        fail_silently=False
-                    )
-                    
-                    invitation.status = 'sent'
-                    invitation.sent_at = timezone.now()
-                    invitation.save()
-                    
-                    InvitationTracking.objects.create(
-                        invitation=invitation,
-                        campaign=campaign
-                    )
-                    
-                    sent_count += 1
-                    
-                except Exception as e:
-                    failed_count += 1
-                    print(f"Failed to send to {contact.email}: {e}")
-            
-            campaign.emails_sent = sent_count
-            campaign.emails_failed = failed_count
-            campaign.emails_delivered = sent_count
-            campaign.status = 'sent'
-            campaign.completed_at = timezone.now()
-            campaign.save()
-            
-            return APIResponse({
-                'success': True,
-                'message': 'Campaign berhasil dikirim',
-                'data': {
-                    'sent': sent_count,
-                    'failed': failed_count
-                }
-            }, status=status.HTTP_200_OK)
-            
-    except Exception as e:
-        campaign.status = 'failed'
-        campaign.save()
-        
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def pause_campaign(request, campaign_id):
+    campaign = get_user_campaign(request.user, campaign_id)
+
+    updated = EmailCampaign.objects.filter(
+        campaign_id=campaign.campaign_id,
+        status='sending'
+    ).update(status='paused')
+    if not updated:
         return APIResponse({
             'success': False,
-            'message': f'Campaign gagal: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            'message': 'Hanya campaign yang sedang dikirim yang bisa dijeda'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    campaign.refresh_from_db()
+    return APIResponse({
+        'success': True,
+        'message': 'Campaign dijeda',
+        'data': EmailCampaignSerializer(campaign).data
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def resume_campaign(request, campaign_id):
+    campaign = get_user_campaign(request.user, campaign_id)
+
+    updated = EmailCampaign.objects.filter(
+        campaign_id=campaign.campaign_id,
+        status='paused'
+    ).update(status='sending')
+    if not updated:
+        return APIResponse({
+            'success': False,
+            'message': 'Hanya campaign yang dijeda yang bisa dilanjutkan'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    campaign.refresh_from_db()
+    return APIResponse({
+        'success': True,
+        'message': 'Campaign dilanjutkan',
+        'data': EmailCampaignSerializer(campaign).data
+    }, status=status.HTTP_202_ACCEPTED)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -658,51 +576,24 @@ def campaign_analytics(request, campaign_id):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def track_email_open(request, tracking_token):
-    try:
-        invitation = SurveyInvitation.objects.get(tracking_token=tracking_token)
-        tracking = InvitationTracking.objects.get_or_create(
-            invitation=invitation
-        )
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        ip_address = request.META.get('REMOTE_ADDR')
-        tracking.record_open(user_agent, ip_address)
-        
-        if invitation.status == 'sent':
-            invitation.status = 'opened'
-            invitation.opened_at = timezone.now()
-            invitation.save()
-        
-        if tracking.campaign:
-            tracking.campaign.emails_opened += 1
-            tracking.campaign.save()
-        
-        pixel = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x44\x01\x00\x3b'
-        return HttpResponse(pixel, content_type='image/gif')
-        
-    except SurveyInvitation.DoesNotExist:
-        return HttpResponse(status=404)
+    record_event(
+        tracking_token,
+        'open',
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        ip_address=request.META.get('REMOTE_ADDR')
+    )
+    pixel = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x44\x01\x00\x3b'
+    return HttpResponse(pixel, content_type='image/gif')
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
-def track_link_click(requset, tracking_token):
-    try:
-        invitation = SurveyInvitation.objects.get(tracking_token=tracking_token)
-        tracking = InvitationTracking.objects.get_or_create(
-            invitation=invitation
-        )     
-        tracking.record_click()
-
-        if invitation.status in ['sent', 'opened']:
-            invitation.status = 'clicked'
-            invitation.clicked_at = timezone.now()
-            invitation.save()
-        
-        if tracking.campaign:
-            tracking.campaign.emails_clicked += 1
-            tracking.campaign.save()
-        
-        survey_url = f"/surveys/take/{invitation.survey.share_token}/"
-        return redirect(survey_url)
-        
-    except SurveyInvitation.DoesNotExist:
-        return HttpResponse("Invalid tracking link", status=404)
\ No newline at end of file
+def track_link_click(request, tracking_token):
+    share_token = SurveyInvitation.objects.filter(
+        tracking_token=tracking_token
+    ).values_list('survey__share_token', flat=True).first()
+    if share_token is None:
+        return HttpResponse("Invalid tracking link", status=404)
+
+    record_event(tracking_token, 'click')
+    survey_url = f"/surveys/take/{share_token}/"
+    return redirect(survey_url)
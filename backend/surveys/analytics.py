@@ -0,0 +1,307 @@
+import re
+from datetime import timedelta
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncHour, TruncWeek
+from django.utils import timezone
+from project_insight.cache import memoize
+from .models import (
+    OrganizationDailyRollup, Question, QuestionOption, Response, ResponseAnswer, Survey,
+    SurveyAnalytics, SurveyDailyRollup, SurveyResponseBucket
+)
+
+CHOICE_QUESTION_TYPES = ['multiple_choice', 'dropdown', 'checkbox']
+TEXT_QUESTION_TYPES = ['text', 'textarea']
+SAMPLE_RESPONSE_LIMIT = 5
+DASHBOARD_CACHE_TIMEOUT = 60
+QUESTION_ANALYTICS_CACHE_TIMEOUT = 300
+DASHBOARD_TREND_DAYS = 7
+TOP_SURVEYS_LIMIT = 5
+RECENT_RESPONSES_LIMIT = 10
+TIMELINE_GRANULARITIES = ['hour', 'day', 'week']
+TIMELINE_WINDOW_PATTERN = re.compile(r'^(\d{1,5})([hdwy])$')
+TIMELINE_WINDOW_UNITS = {
+    'h': timedelta(hours=1),
+    'd': timedelta(days=1),
+    'w': timedelta(weeks=1),
+    'y': timedelta(days=365),
+}
+MAX_TIMELINE_WINDOW = timedelta(days=365 * 5)
+MAX_HOURLY_TIMELINE_WINDOW = timedelta(days=90)
+
+def record_submission(response, organization_id):
+    """Fold a new submission into the incrementally maintained aggregates."""
+    SurveyAnalytics.record_response(response)
+    OrganizationDailyRollup.record_response(response, organization_id)
+    SurveyResponseBucket.record_response(response)
+    SurveyDailyRollup.record_response(response)
+
+@memoize(
+    'question_analytics',
+    depends_on=(Survey, Question, QuestionOption, Response),
+    scope=lambda survey: ('survey', survey.survey_id),
+    timeout=QUESTION_ANALYTICS_CACHE_TIMEOUT
+)
+def build_question_analytics(survey):
+    """
+    Build the per-question breakdown for a survey with a fixed number of
+    grouped queries, independent of how many questions or options it has.
+    """
+    questions = list(survey.questions.all().order_by('order').prefetch_related('options'))
+    if not questions:
+        return []
+
+    answer_counts = dict(
+        ResponseAnswer.objects.filter(
+            question__survey=survey
+        ).values('question_id').annotate(
+            count=Count('answer_id')
+        ).values_list('question_id', 'count')
+    )
+
+    choice_ids = [q.question_id for q in questions if q.question_type in CHOICE_QUESTION_TYPES]
+    rating_ids = [q.question_id for q in questions if q.question_type == 'rating']
+    text_ids = [q.question_id for q in questions if q.question_type in TEXT_QUESTION_TYPES]
+
+    option_counts = {}
+    if choice_ids:
+        SelectedOption = ResponseAnswer.selected_options.through
+        option_counts = dict(
+            SelectedOption.objects.filter(
+                questionoption__question_id__in=choice_ids
+            ).values('questionoption_id').annotate(
+                count=Count('id')
+            ).values_list('questionoption_id', 'count')
+        )
+
+    rating_values = {}
+    if rating_ids:
+        rating_rows = ResponseAnswer.objects.filter(
+            question_id__in=rating_ids,
+            answer_number__isnull=False
+        ).values('question_id', 'answer_number').annotate(
+            count=Count('answer_id')
+        ).values_list('question_id', 'answer_number', 'count')
+        for question_id, value, count in rating_rows:
+            rating_values.setdefault(question_id, []).append((float(value), count))
+
+    sample_responses = {}
+    if text_ids:
+        samples = [
+            ResponseAnswer.objects.filter(
+                question_id=question_id,
+                answer_text__isnull=False
+            ).exclude(answer_text='').values_list('question_id', 'answer_text')[:SAMPLE_RESPONSE_LIMIT]
+            for question_id in text_ids
+        ]
+        for question_id, answer_text in samples[0].union(*samples[1:], all=True):
+            sample_responses.setdefault(question_id, []).append(answer_text)
+
+    question_analytics = []
+    for question in questions:
+        answers_count = answer_counts.get(question.question_id, 0)
+        question_data = {
+            'question_id': str(question.question_id),
+            'question_text': question.question_text,
+            'question_type': question.question_type,
+            'question_count': answers_count
+        }
+
+        if question.question_type in CHOICE_QUESTION_TYPES:
+            options_data = []
+            for option in question.options.all():
+                count = option_counts.get(option.option_id, 0)
+                percentage = round((count / answers_count * 100), 2) if answers_count > 0 else 0
+                options_data.append({
+                    'option_text': option.option_text,
+                    'count': count,
+                    'percentage': percentage
+                })
+            question_data['options_distribution'] = options_data
+
+        elif question.question_type == 'rating':
+            values = rating_values.get(question.question_id)
+            if values:
+                total = sum(count for _, count in values)
+                question_data['average_rating'] = round(
+                    sum(value * count for value, count in values) / total, 2
+                )
+                rating_dist = {}
+                for value, count in values:
+                    rating_int = int(value)
+                    rating_dist[rating_int] = rating_dist.get(rating_int, 0) + count
+
+                question_data['rating_distribution'] = rating_dist
+
+        elif question.question_type in TEXT_QUESTION_TYPES:
+            question_data['sample_responses'] = sample_responses.get(question.question_id, [])
+
+        question_analytics.append(question_data)
+
+    return question_analytics
+
+def format_duration(seconds):
+    minutes = int(seconds) // 60
+    seconds = int(seconds) % 60
+    return f"{minutes}m {seconds}s"
+
+@memoize(
+    'dashboard',
+    depends_on=(Survey,),
+    scope=lambda organization: ('organization', organization.pk),
+    timeout=DASHBOARD_CACHE_TIMEOUT
+)
+def build_dashboard(organization):
+    """
+    Build the organization dashboard from the daily rollups, the per-survey
+    analytics rows and a grouped status count, instead of counting raw
+    responses. Survey changes invalidate the cached dashboard right away;
+    new responses show up once it is DASHBOARD_CACHE_TIMEOUT old, so busy
+    organizations do not recompute it on every submission.
+    """
+    today = timezone.localdate()
+    status_counts = dict(
+        Survey.objects.filter(
+            organization=organization
+        ).order_by().values('status').annotate(
+            count=Count('survey_id')
+        ).values_list('status', 'count')
+    )
+
+    rollups = OrganizationDailyRollup.objects.filter(organization=organization)
+    totals = rollups.aggregate(
+        time_total=Sum('completion_time_total'),
+        time_count=Sum('completion_time_count')
+    )
+    daily_completed = dict(
+        rollups.filter(
+            date__gt=today - timedelta(days=30)
+        ).values_list('date', 'completed_responses')
+    )
+
+    avg_completion_formatted = None
+    if totals['time_count']:
+        avg_completion_formatted = format_duration(totals['time_total'] / totals['time_count'])
+
+    response_trend = []
+    for i in range(DASHBOARD_TREND_DAYS - 1, -1, -1):
+        date = today - timedelta(days=i)
+        response_trend.append({
+            'date': date.strftime('%Y-%m-%d'),
+            'count': daily_completed.get(date, 0)
+        })
+
+    top_surveys = Survey.objects.filter(
+        organization=organization,
+        status__in=['active', 'closed']
+    ).annotate(
+        total=Coalesce('analytics__total_responses', 0),
+        completed=Coalesce('analytics__completed_responses', 0)
+    ).order_by('-completed').values('survey_id', 'title', 'status', 'total', 'completed')[:TOP_SURVEYS_LIMIT]
+
+    top_surveys_data = []
+    for survey in top_surveys:
+        completion_rate = 0
+        if survey['total'] > 0:
+            completion_rate = round((survey['completed'] / survey['total']) * 100, 2)
+        top_surveys_data.append({
+            'survey_id': str(survey['survey_id']),
+            'title': survey['title'],
+            'response_count': survey['completed'],
+            'total_responses': survey['total'],
+            'completion_rate': completion_rate,
+            'status': survey['status']
+        })
+
+    recent_responses = Response.objects.filter(
+        survey__organization=organization,
+        is_completed=True
+    ).order_by('-submitted_at').values(
+        'response_id', 'survey__title', 'respondent_email',
+        'submitted_at', 'completion_time_seconds'
+    )[:RECENT_RESPONSES_LIMIT]
+    recent_responses_data = []
+    for resp in recent_responses:
+        recent_responses_data.append({
+            'response_id': str(resp['response_id']),
+            'survey_title': resp['survey__title'],
+            'respondent_email': resp['respondent_email'] or 'Anonymous',
+            'submitted_at': resp['submitted_at'].isoformat(),
+            'completion_time': f"{resp['completion_time_seconds']}s" if resp['completion_time_seconds'] else None
+        })
+
+    status_distribution = {
+        'draft': status_counts.get('draft', 0),
+        'active': status_counts.get('active', 0),
+        'closed': status_counts.get('closed', 0)
+    }
+
+    return {
+        'summary': {
+            'total_surveys': sum(status_counts.values()),
+            'active_surveys': status_distribution['active'],
+            'draft_surveys': status_distribution['draft'],
+            'closed_surveys': status_distribution['closed'],
+            'total_responses_lat_30d': sum(daily_completed.values()),
+            'avg_completion_time': avg_completion_formatted
+        },
+        'response_trend': response_trend,
+        'top_surveys': top_surveys_data,
+        'recent_responses': recent_responses_data,
+        'statis_distribution': status_distribution,
+        'last_updated': timezone.now().isoformat()
+    }
+
+def parse_timeline_window(value):
+    """
+    Parse a window such as '36h', '7d', '12w' or '1y' into a timedelta.
+    Returns None for anything else, including empty windows and windows
+    longer than MAX_TIMELINE_WINDOW.
+    """
+    match = TIMELINE_WINDOW_PATTERN.match(value or '')
+    if not match or not int(match.group(1)):
+        return None
+    window = int(match.group(1)) * TIMELINE_WINDOW_UNITS[match.group(2)]
+    return window if window <= MAX_TIMELINE_WINDOW else None
+
+def build_response_timeline(survey, window, granularity):
+    """
+    Sum the survey's response buckets over the window into one point per
+    hour, day or week. Hourly points come from the hourly buckets, daily
+    and weekly points from the daily rollups, so the rows read depend on
+    the window and granularity, not on how many responses the survey has.
+    """
+    now = timezone.now()
+    if granularity == 'hour':
+        periods = SurveyResponseBucket.objects.filter(
+            survey=survey,
+            bucket_start__gte=(now - window).replace(minute=0, second=0, microsecond=0)
+        ).annotate(period=TruncHour('bucket_start'))
+    else:
+        periods = SurveyDailyRollup.objects.filter(
+            survey=survey,
+            date__gte=timezone.localdate(now - window)
+        )
+        if granularity == 'week':
+            periods = periods.annotate(period=TruncWeek('date'))
+        else:
+            periods = periods.annotate(period=F('date'))
+    periods = periods.order_by('period').values('period').annotate(
+        total=Sum('total_responses'),
+        time_total=Sum('completion_time_total'),
+        time_count=Sum('completion_time_count')
+    )
+
+    response_timeline = []
+    completion_timeline = []
+    for item in periods:
+        label = item['period'].isoformat()
+        response_timeline.append({
+            'date': label,
+            'count': item['total']
+        })
+        if item['time_count']:
+            completion_timeline.append({
+                'date': label,
+                'avg_time_seconds': round(item['time_total'] / item['time_count'], 2)
+            })
+    return response_timeline, completion_timeline
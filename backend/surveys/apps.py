@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class SurveysConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'surveys'
-    verbose_name = 'Survey Management'
\ No newline at end of file
+    verbose_name = 'Survey Management'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,221 @@
+import csv
+import itertools
+import tempfile
+from django.db.models import Q
+from rest_framework.renderers import BaseRenderer
+from .models import Response, ResponseAnswer
+
+EXPORT_CHUNK_SIZE = 1000
+COLUMNAR_ROW_GROUP_SIZE = 10000
+RESPONSE_EXPORT_FIELDS = [
+    'response_id', 'respondent_email', 'respondent_name',
+    'submitted_at', 'completion_time_seconds'
+]
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets ?format=<export format> pass DRF content negotiation; the export
+    view builds the file response itself.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+class ParquetExportRenderer(ExportRenderer):
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+    charset = None
+    render_style = 'binary'
+
+class ArrowExportRenderer(ExportRenderer):
+    media_type = 'application/vnd.apache.arrow.file'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+class Echo:
+    """File-like object that hands back whatever the csv writer writes."""
+    def write(self, value):
+        return value
+
+def question_header(question):
+    return f"Q{question.order}: {question.question_text}"
+
+def answer_display_value(answer):
+    """Same rules as ResponseAnswer.display_value, on a pivoted answer dict."""
+    if answer['answer_text']:
+        return answer['answer_text']
+    elif answer['answer_number'] is not None:
+        return str(answer['answer_number'])
+    elif answer['answer_date']:
+        return answer['answer_date'].strftime('%Y-%m-%d')
+    elif answer['answer_boolean'] is not None:
+        return 'Yes' if answer['answer_boolean'] else 'No'
+    elif answer['options']:
+        return ', '.join(answer['options'])
+    return ''
+
+def iter_response_pages(queryset, field, chunk_size):
+    """Keyset-paginate a values() queryset on (field, response_id), newest first."""
+    queryset = queryset.order_by(f'-{field}', '-response_id')
+    last = None
+    while True:
+        chunk_queryset = queryset
+        if last:
+            chunk_queryset = chunk_queryset.filter(
+                Q(**{f'{field}__lt': last[field]}) |
+                Q(**{field: last[field], 'response_id__lt': last['response_id']})
+            )
+        responses = list(chunk_queryset[:chunk_size])
+        if responses:
+            yield responses
+        if len(responses) < chunk_size:
+            return
+        last = responses[-1]
+
+def iter_response_chunks(survey, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield completed responses of a survey in keyset-paginated chunks of
+    (response, {question_id: answer}) pairs, newest submission first and
+    responses without a submission time last, by start time. Each chunk
+    costs three queries (responses, answers, selected options) no matter
+    how many questions the survey has.
+    """
+    queryset = Response.objects.filter(
+        survey=survey,
+        is_completed=True
+    ).values(*RESPONSE_EXPORT_FIELDS, 'started_at')
+    SelectedOption = ResponseAnswer.selected_options.through
+
+    pages = itertools.chain(
+        iter_response_pages(queryset.filter(submitted_at__isnull=False), 'submitted_at', chunk_size),
+        iter_response_pages(queryset.filter(submitted_at__isnull=True), 'started_at', chunk_size)
+    )
+    for responses in pages:
+        response_ids = [resp['response_id'] for resp in responses]
+
+        answers = {}
+        answers_by_id = {}
+        answer_rows = ResponseAnswer.objects.filter(
+            response_id__in=response_ids
+        ).values(
+            'answer_id', 'response_id', 'question_id', 'answer_text',
+            'answer_number', 'answer_date', 'answer_boolean'
+        )
+        for answer in answer_rows:
+            answer['options'] = []
+            answers_by_id[answer['answer_id']] = answer
+            answers.setdefault(answer['response_id'], {})[answer['question_id']] = answer
+
+        option_rows = SelectedOption.objects.filter(
+            responseanswer__response_id__in=response_ids
+        ).order_by('questionoption__order').values_list('responseanswer_id', 'questionoption__option_text')
+        for answer_id, option_text in option_rows:
+            answers_by_id[answer_id]['options'].append(option_text)
+
+        yield [(resp, answers.get(resp['response_id'], {})) for resp in responses]
+
+def stream_responses_csv(survey, questions):
+    """Generate the CSV export row by row, one chunk of responses at a time."""
+    writer = csv.writer(Echo())
+    headers = ['Response ID', 'Email', 'Name', 'Submitted At', 'Completion Time (seconds)']
+    headers.extend(question_header(question) for question in questions)
+    yield writer.writerow(headers)
+
+    columns = {question.question_id: index for index, question in enumerate(questions)}
+    for chunk in iter_response_chunks(survey):
+        lines = []
+        for resp, answers in chunk:
+            answer_values = [''] * len(columns)
+            for question_id, answer in answers.items():
+                if question_id in columns:
+                    answer_values[columns[question_id]] = answer_display_value(answer)
+
+            lines.append(writer.writerow([
+                str(resp['response_id']),
+                resp['respondent_email'] or '',
+                resp['respondent_name'] or '',
+                resp['submitted_at'].strftime('%Y-%m-%d %H:%M:%S') if resp['submitted_at'] else '',
+                resp['completion_time_seconds'] or ''
+            ] + answer_values))
+        yield ''.join(lines)
+
+def columnar_value(question, answer):
+    if answer is None:
+        return None
+    question_type = question.question_type
+    if question_type in ['number', 'rating']:
+        return float(answer['answer_number']) if answer['answer_number'] is not None else None
+    elif question_type == 'date':
+        return answer['answer_date']
+    elif question_type == 'yes_no':
+        return answer['answer_boolean']
+    elif question_type == 'checkbox':
+        return answer['options']
+    return answer_display_value(answer) or None
+
+def write_responses_columnar(survey, questions, export_format, fileobj):
+    """
+    Write completed responses as a typed Parquet or Arrow IPC file, one
+    column per question, one row group (record batch) per chunk of
+    responses so the survey never sits in memory as a whole.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    question_types = {
+        'number': pa.float64(),
+        'rating': pa.float64(),
+        'date': pa.date32(),
+        'yes_no': pa.bool_(),
+        'checkbox': pa.list_(pa.string()),
+    }
+    fields = [
+        pa.field('response_id', pa.string()),
+        pa.field('respondent_email', pa.string()),
+        pa.field('respondent_name', pa.string()),
+        pa.field('submitted_at', pa.timestamp('us', tz='UTC')),
+        pa.field('completion_time_seconds', pa.int32()),
+    ]
+    names = set()
+    for question in questions:
+        name = question_header(question)
+        suffix = 2
+        while name in names:
+            name = f"{question_header(question)} ({suffix})"
+            suffix += 1
+        names.add(name)
+        fields.append(pa.field(name, question_types.get(question.question_type, pa.string())))
+    schema = pa.schema(fields)
+
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(fileobj, schema)
+    else:
+        writer = pa.ipc.new_file(fileobj, schema)
+
+    with writer:
+        for chunk in iter_response_chunks(survey, chunk_size=COLUMNAR_ROW_GROUP_SIZE):
+            columns = [
+                [str(resp['response_id']) for resp, _ in chunk],
+                [resp['respondent_email'] for resp, _ in chunk],
+                [resp['respondent_name'] for resp, _ in chunk],
+                [resp['submitted_at'] for resp, _ in chunk],
+                [resp['completion_time_seconds'] for resp, _ in chunk],
+            ]
+            for question in questions:
+                columns.append([
+                    columnar_value(question, answers.get(question.question_id))
+                    for _, answers in chunk
+                ])
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+
+def export_responses_columnar(survey, questions, export_format):
+    """Write the columnar export to a temporary file and return it rewound."""
+    fileobj = tempfile.TemporaryFile()
+    write_responses_columnar(survey, questions, export_format, fileobj)
+    fileobj.seek(0)
+    return fileobj
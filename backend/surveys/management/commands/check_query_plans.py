@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from project_insight.query_plans import explain, query_shapes, residual_filters, seq_scans
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot query shapes and report the ones that need a sequential scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shape',
+            action='append',
+            default=[],
+            help='Only check the named shape (can be repeated)'
+        )
+        parser.add_argument(
+            '--show-plans',
+            action='store_true',
+            help='Print the full plan of every shape'
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+        for name, queryset in query_shapes():
+            if options['shape'] and name not in options['shape']:
+                continue
+            plan = explain(queryset)
+            tables = seq_scans(plan)
+            if tables:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: sequential scan on {', '.join(tables)}"))
+            elif residual_filters(plan):
+                self.stdout.write(self.style.WARNING(
+                    f"{name}: index scan, filtering rows on {'; '.join(residual_filters(plan))}"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+            if options['show_plans']:
+                self.stdout.write(plan + '\n')
+
+        if failures:
+            raise CommandError(f"{len(failures)} query shapes need a sequential scan: {', '.join(failures)}")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from surveys.models import Survey, SurveyAnalytics
+
+class Command(BaseCommand):
+    help = 'Recount survey analytics to correct drift in the incremental counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reconcile every survey instead of only active ones'
+        )
+        parser.add_argument(
+            '--survey',
+            help='Reconcile a single survey by survey_id'
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all()
+        if options['survey']:
+            surveys = surveys.filter(survey_id=options['survey'])
+        elif not options['all']:
+            surveys = surveys.filter(status='active')
+
+        count = 0
+        drifted = 0
+        for survey in surveys.only('survey_id', 'title').iterator():
+            analytics, _ = SurveyAnalytics.objects.get_or_create(survey=survey)
+            if analytics.recalculate():
+                drifted += 1
+                self.stdout.write(
+                    self.style.WARNING(f'Corrected analytics drift: {survey.title}')
+                )
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Reconciled {count} surveys ({drifted} corrected)')
+        )
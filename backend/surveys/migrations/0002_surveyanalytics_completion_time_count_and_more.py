@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_completion_time_totals(apps, schema_editor):
+    SurveyAnalytics = apps.get_model('surveys', 'SurveyAnalytics')
+    Response = apps.get_model('surveys', 'Response')
+    completed = Response.objects.filter(
+        survey_id=OuterRef('survey_id'),
+        is_completed=True,
+        completion_time_seconds__isnull=False
+    ).order_by().values('survey_id')
+    SurveyAnalytics.objects.update(
+        completion_time_total=Coalesce(
+            Subquery(completed.annotate(total=Sum('completion_time_seconds')).values('total')), 0
+        ),
+        completion_time_count=Coalesce(
+            Subquery(completed.annotate(count=Count('response_id')).values('count')), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyanalytics',
+            name='completion_time_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='surveyanalytics',
+            name='completion_time_total',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_completion_time_totals, migrations.RunPython.noop),
+    ]
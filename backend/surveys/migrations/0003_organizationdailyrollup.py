@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    OrganizationDailyRollup = apps.get_model('surveys', 'OrganizationDailyRollup')
+    Response = apps.get_model('surveys', 'Response')
+    completed = Q(is_completed=True)
+    days = Response.objects.annotate(
+        date=TruncDate(Coalesce('submitted_at', 'started_at'))
+    ).order_by().values('survey__organization_id', 'date').annotate(
+        total=Count('response_id'),
+        completed=Count('response_id', filter=completed),
+        time_total=Sum('completion_time_seconds', filter=completed),
+        time_count=Count('completion_time_seconds', filter=completed)
+    )
+    OrganizationDailyRollup.objects.bulk_create([
+        OrganizationDailyRollup(
+            organization_id=day['survey__organization_id'],
+            date=day['date'],
+            total_responses=day['total'],
+            completed_responses=day['completed'],
+            completion_time_total=day['time_total'] or 0,
+            completion_time_count=day['time_count']
+        )
+        for day in days.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0002_surveyanalytics_completion_time_count_and_more'),
+        ('users', '0005_webhookdelivery_next_attempt_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_responses', models.IntegerField(default=0)),
+                ('completed_responses', models.IntegerField(default=0)),
+                ('completion_time_total', models.BigIntegerField(default=0)),
+                ('completion_time_count', models.IntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='users.organization')),
+            ],
+            options={
+                'verbose_name': 'Organization Daily Rollup',
+                'verbose_name_plural': 'Organization Daily Rollups',
+                'db_table': 'organization_daily_rollups',
+                'ordering': ['date'],
+                'unique_together': {('organization', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
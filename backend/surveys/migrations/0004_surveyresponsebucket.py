@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncHour
+from datetime import timezone
+
+
+def backfill_response_buckets(apps, schema_editor):
+    SurveyResponseBucket = apps.get_model('surveys', 'SurveyResponseBucket')
+    Response = apps.get_model('surveys', 'Response')
+    completed = Q(is_completed=True)
+    hours = Response.objects.annotate(
+        hour=TruncHour(Coalesce('submitted_at', 'started_at'), tzinfo=timezone.utc)
+    ).order_by().values('survey_id', 'hour').annotate(
+        total=Count('response_id'),
+        completed=Count('response_id', filter=completed),
+        time_total=Sum('completion_time_seconds', filter=completed),
+        time_count=Count('completion_time_seconds', filter=completed)
+    )
+    SurveyResponseBucket.objects.bulk_create([
+        SurveyResponseBucket(
+            survey_id=hour['survey_id'],
+            bucket_start=hour['hour'],
+            total_responses=hour['total'],
+            completed_responses=hour['completed'],
+            completion_time_total=hour['time_total'] or 0,
+            completion_time_count=hour['time_count']
+        )
+        for hour in hours.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0003_organizationdailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyResponseBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('total_responses', models.IntegerField(default=0)),
+                ('completed_responses', models.IntegerField(default=0)),
+                ('completion_time_total', models.BigIntegerField(default=0)),
+                ('completion_time_count', models.IntegerField(default=0)),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='response_buckets', to='surveys.survey')),
+            ],
+            options={
+                'verbose_name': 'Survey Response Bucket',
+                'verbose_name_plural': 'Survey Response Buckets',
+                'db_table': 'survey_response_buckets',
+                'ordering': ['bucket_start'],
+                'unique_together': {('survey', 'bucket_start')},
+            },
+        ),
+        migrations.RunPython(backfill_response_buckets, migrations.RunPython.noop),
+    ]
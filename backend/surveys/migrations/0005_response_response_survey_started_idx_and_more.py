@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0004_surveyresponsebucket'),
+        ('users', '0007_webhookdelivery_webhook_delivery_history_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['survey', '-started_at'], name='response_survey_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(fields=['organization', '-created_at'], name='survey_org_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0005_response_response_survey_started_idx_and_more'),
+        ('users', '0008_webhook_webhook_active_org_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['survey', 'is_completed', 'submitted_at'], name='response_survey_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(fields=['organization', 'status'], name='survey_org_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(condition=models.Q(('published_at__isnull', False), ('status', 'draft')), fields=['published_at'], name='survey_publish_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(condition=models.Q(('closes_at__isnull', False), ('status', 'active')), fields=['closes_at'], name='survey_close_due_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_survey_daily_rollups(apps, schema_editor):
+    SurveyDailyRollup = apps.get_model('surveys', 'SurveyDailyRollup')
+    Response = apps.get_model('surveys', 'Response')
+    completed = Q(is_completed=True)
+    days = Response.objects.annotate(
+        date=TruncDate(Coalesce('submitted_at', 'started_at'))
+    ).order_by().values('survey_id', 'date').annotate(
+        total=Count('response_id'),
+        completed=Count('response_id', filter=completed),
+        time_total=Sum('completion_time_seconds', filter=completed),
+        time_count=Count('completion_time_seconds', filter=completed)
+    )
+    SurveyDailyRollup.objects.bulk_create([
+        SurveyDailyRollup(
+            survey_id=day['survey_id'],
+            date=day['date'],
+            total_responses=day['total'],
+            completed_responses=day['completed'],
+            completion_time_total=day['time_total'] or 0,
+            completion_time_count=day['time_count']
+        )
+        for day in days.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0007_survey_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_responses', models.IntegerField(default=0)),
+                ('completed_responses', models.IntegerField(default=0)),
+                ('completion_time_total', models.BigIntegerField(default=0)),
+                ('completion_time_count', models.IntegerField(default=0)),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='surveys.survey')),
+            ],
+            options={
+                'verbose_name': 'Survey Daily Rollup',
+                'verbose_name_plural': 'Survey Daily Rollups',
+                'db_table': 'survey_daily_rollups',
+                'ordering': ['date'],
+                'unique_together': {('survey', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_survey_daily_rollups, migrations.RunPython.noop),
+    ]
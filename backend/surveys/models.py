@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from users.models import Organization
 import uuid
 import secrets
+from .search import survey_search_vector
 
 # Create your models here.
 
@@ -31,12 +34,24 @@ class Survey(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     share_token = models.CharField(max_length=64, unique=True, blank=True)
+    search_vector = models.GeneratedField(
+        expression=survey_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
 
     class Meta:
         db_table = 'surveys'
         verbose_name = 'Survey'
         verbose_name_plural = 'Surveys'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='survey_org_created_idx'),
+            models.Index(fields=['organization', 'status'], name='survey_org_status_idx'),
+            models.Index(fields=['published_at'], condition=models.Q(status='draft', published_at__isnull=False), name='survey_publish_due_idx'),
+            models.Index(fields=['closes_at'], condition=models.Q(status='active', closes_at__isnull=False), name='survey_close_due_idx'),
+            GinIndex(fields=['search_vector'], name='survey_search_vector_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.share_token:
@@ -141,6 +156,10 @@ class Response(models.Model):
         verbose_name = 'Response'
         verbose_name_plural = 'Responses'
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['survey', '-started_at'], name='response_survey_started_idx'),
+            models.Index(fields=['survey', 'is_completed', 'submitted_at'], name='response_survey_completed_idx'),
+        ]
     
     def __str__(self):
         email = self.respondent_email or 'Anonymous'
@@ -214,6 +233,8 @@ class SurveyAnalytics(models.Model):
     total_responses = models.IntegerField(default=0)
     completed_responses = models.IntegerField(default=0)
     average_completion_time = models.IntegerField(default=0)
+    completion_time_total = models.BigIntegerField(default=0)
+    completion_time_count = models.IntegerField(default=0)
     unique_visitors = models.IntegerField(default=0)
     bounce_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)
     last_calculated = models.DateTimeField(auto_now=True)
@@ -227,15 +248,164 @@ class SurveyAnalytics(models.Model):
         return f"Analytics for '{self.survey.title}'"
     
     def recalculate(self):
-        responses = self.survey.responses.all()
-        completed = responses.filter(is_completed=True)
-        self.total_responses = responses.count()
-        self.completed_responses = completed.count()
-        completion_times = completed.exclude(completion_time_seconds__isnull=True)
-        if completion_times.exists():
-            avg_time = completion_times.aggregate(
-                avg=models.Avg('completion_time_seconds')
-            )['avg']
-            self.average_completion_time = int(avg_time) if avg_time else 0
-        
-        self.save()
\ No newline at end of file
+        """
+        Recount the counters from the responses. The row stays locked from
+        the count to the save, so a submission recorded meanwhile waits and
+        is added on top instead of being overwritten. Returns whether any
+        counter changed.
+        """
+        completed = models.Q(is_completed=True)
+        with transaction.atomic():
+            current = SurveyAnalytics.objects.select_for_update().get(pk=self.pk)
+            stats = self.survey.responses.aggregate(
+                total=models.Count('response_id'),
+                completed=models.Count('response_id', filter=completed),
+                time_total=models.Sum('completion_time_seconds', filter=completed),
+                time_count=models.Count('completion_time_seconds', filter=completed)
+            )
+            counters = {
+                'total_responses': stats['total'],
+                'completed_responses': stats['completed'],
+                'completion_time_total': stats['time_total'] or 0,
+                'completion_time_count': stats['time_count'],
+            }
+            changed = any(getattr(current, field) != value for field, value in counters.items())
+            for field, value in counters.items():
+                setattr(self, field, value)
+            if self.completion_time_count:
+                self.average_completion_time = self.completion_time_total // self.completion_time_count
+            else:
+                self.average_completion_time = 0
+
+            self.save(update_fields=[
+                'total_responses', 'completed_responses', 'average_completion_time',
+                'completion_time_total', 'completion_time_count', 'last_calculated'
+            ])
+        return changed
+
+    @classmethod
+    def record_response(cls, response):
+        """
+        Fold a single submitted response into the survey counters with one
+        atomic UPDATE, so the cost does not grow with the survey size.
+        """
+        changes = {
+            'total_responses': models.F('total_responses') + 1,
+            'last_calculated': timezone.now()
+        }
+        if response.is_completed:
+            changes['completed_responses'] = models.F('completed_responses') + 1
+            if response.completion_time_seconds is not None:
+                seconds = response.completion_time_seconds
+                changes['completion_time_total'] = models.F('completion_time_total') + seconds
+                changes['completion_time_count'] = models.F('completion_time_count') + 1
+                changes['average_completion_time'] = (
+                    (models.F('completion_time_total') + seconds) /
+                    (models.F('completion_time_count') + 1)
+                )
+
+        updated = cls.objects.filter(survey_id=response.survey_id).update(**changes)
+        if not updated:
+            cls.objects.get_or_create(survey_id=response.survey_id)
+            cls.objects.filter(survey_id=response.survey_id).update(**changes)
+
+
+def response_recorded_at(response):
+    """
+    When a response counts in the rollups: its submission time, or its
+    start time if it was never submitted. The backfill migrations use the
+    same rule, so recomputed rollups match the incremental ones.
+    """
+    return response.submitted_at or response.started_at
+
+
+class ResponseCounters(models.Model):
+    """Response counters of one rollup row, updated by add_response."""
+    total_responses = models.IntegerField(default=0)
+    completed_responses = models.IntegerField(default=0)
+    completion_time_total = models.BigIntegerField(default=0)
+    completion_time_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def add_response(cls, response, **lookup):
+        """
+        Add a response to the row matching lookup with one atomic UPDATE,
+        creating the row on its first response.
+        """
+        changes = {'total_responses': models.F('total_responses') + 1}
+        if response.is_completed:
+            changes['completed_responses'] = models.F('completed_responses') + 1
+            if response.completion_time_seconds is not None:
+                changes['completion_time_total'] = models.F('completion_time_total') + response.completion_time_seconds
+                changes['completion_time_count'] = models.F('completion_time_count') + 1
+
+        rows = cls.objects.filter(**lookup)
+        if not rows.update(**changes):
+            cls.objects.get_or_create(**lookup)
+            rows.update(**changes)
+
+
+class OrganizationDailyRollup(ResponseCounters):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+
+    class Meta:
+        db_table = 'organization_daily_rollups'
+        verbose_name = 'Organization Daily Rollup'
+        verbose_name_plural = 'Organization Daily Rollups'
+        unique_together = ('organization', 'date')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"Rollup for {self.organization_id} on {self.date}"
+
+    @classmethod
+    def record_response(cls, response, organization_id):
+        """Add a submitted response to its organization's row for the day."""
+        date = timezone.localdate(response_recorded_at(response))
+        cls.add_response(response, organization_id=organization_id, date=date)
+
+
+class SurveyDailyRollup(ResponseCounters):
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+
+    class Meta:
+        db_table = 'survey_daily_rollups'
+        verbose_name = 'Survey Daily Rollup'
+        verbose_name_plural = 'Survey Daily Rollups'
+        unique_together = ('survey', 'date')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"Rollup for {self.survey_id} on {self.date}"
+
+    @classmethod
+    def record_response(cls, response):
+        """Add a submitted response to its survey's row for the day."""
+        date = timezone.localdate(response_recorded_at(response))
+        cls.add_response(response, survey_id=response.survey_id, date=date)
+
+
+class SurveyResponseBucket(ResponseCounters):
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='response_buckets')
+    bucket_start = models.DateTimeField()
+
+    class Meta:
+        db_table = 'survey_response_buckets'
+        verbose_name = 'Survey Response Bucket'
+        verbose_name_plural = 'Survey Response Buckets'
+        unique_together = ('survey', 'bucket_start')
+        ordering = ['bucket_start']
+
+    def __str__(self):
+        return f"Responses for {self.survey_id} at {self.bucket_start}"
+
+    @classmethod
+    def record_response(cls, response):
+        """Add a submitted response to its survey's bucket for the hour."""
+        bucket_start = response_recorded_at(response).replace(minute=0, second=0, microsecond=0)
+        cls.add_response(response, survey_id=response.survey_id, bucket_start=bucket_start)
@@ -0,0 +1,41 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F
+
+SURVEY_SEARCH_CONFIG = 'english'
+SEARCH_WORD_PATTERN = re.compile(r'\w+')
+
+def survey_search_vector():
+    """Weighted tsvector of title and description, stored as a generated column."""
+    return (
+        SearchVector('title', weight='A', config=SURVEY_SEARCH_CONFIG) +
+        SearchVector('description', weight='B', config=SURVEY_SEARCH_CONFIG)
+    )
+
+def search_query(term):
+    """
+    Every word of the term, stemmed and matched as a prefix, so a title is
+    found while the user is still typing. Returns None if the term has no
+    words.
+    """
+    words = SEARCH_WORD_PATTERN.findall(term)
+    if not words:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{word}:*' for word in words),
+        search_type='raw',
+        config=SURVEY_SEARCH_CONFIG
+    )
+
+def search_surveys(queryset, term):
+    """
+    Narrow a survey queryset to full-text matches on title and description,
+    using the GIN index on search_vector, and annotate search_rank. Title
+    matches rank above description matches.
+    """
+    query = search_query(term)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    )
@@ -1,3 +1,4 @@
+import uuid
 from rest_framework import serializers
 from django.utils import timezone
 from .models import (
@@ -81,8 +82,8 @@ class SurveyAnalyticsSerializer(serializers.ModelSerializer):
         return f"{minutes}m {seconds}s"
     
 class SurveyListSerializer(serializers.ModelSerializer):
-    response_count = serializers.ReadOnlyField()
-    completion_rate = serializers.ReadOnlyField()
+    response_count = serializers.SerializerMethodField()
+    completion_rate = serializers.SerializerMethodField()
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
 
     class Meta:
@@ -93,6 +94,20 @@ class SurveyListSerializer(serializers.ModelSerializer):
             'share_token'
         ]
 
+    def get_response_count(self, obj):
+        # The list view annotates the counts from SurveyAnalytics; fall back
+        # to the model properties for surveys loaded without them
+        if hasattr(obj, 'total_response_count'):
+            return obj.total_response_count
+        return obj.response_count
+
+    def get_completion_rate(self, obj):
+        if not hasattr(obj, 'completed_response_count'):
+            return obj.completion_rate
+        if obj.total_response_count == 0:
+            return 0
+        return round((obj.completed_response_count / obj.total_response_count) * 100, 2)
+
 class SurveyDetailSerializer(serializers.ModelSerializer):
     questions =  QuestionSerializer(many=True, required=False)
     theme = SurveyThemeSerializer(required=False)
@@ -123,7 +138,7 @@ class SurveyDetailSerializer(serializers.ModelSerializer):
         
         if theme_data:
             SurveyTheme.objects.create(survey=survey, **theme_data)
-        SurveyAnalytics.objects.create(survey=survey)
+        SurveyAnalytics.objects.get_or_create(survey=survey)
         return survey
     
     def update(self, instance, validated_data):
@@ -205,23 +220,51 @@ class ResponseSubmissionSerializer(serializers.Serializer):
     respondent_name = serializers.CharField(required=False, allow_blank=True)
     answers = serializers.ListField(child=serializers.DictField())
 
-    def validated_answers(self, value):
+    ANSWER_FIELDS = ['answer_text', 'answer_number', 'answer_date', 'answer_boolean']
+
+    def validate_answers(self, value):
+        """Parse question and option ids into UUIDs, so any spelling of an id matches."""
         for answer in value:
-            if 'question' not in answer:
+            if 'question_id' not in answer:
                 raise serializers.ValidationError("Each answer must have a question_id")
-            
-            answer_fields = [
-                'answer_text', 'answer_number', 'answer_date', 'answer_boolean', 'selected_option_ids'
-            ]
+
+            answer_fields = self.ANSWER_FIELDS + ['selected_option_ids']
             if not any(field in answer for field in answer_fields):
                 raise serializers.ValidationError("Each answer must have at least one answer field")
-        
+
+            answer['question_id'] = self.parse_id(answer['question_id'], 'question_id')
+            selected_option_ids = answer.get('selected_option_ids') or []
+            if not isinstance(selected_option_ids, list):
+                selected_option_ids = [selected_option_ids]
+            answer['selected_option_ids'] = [
+                self.parse_id(option_id, 'selected_option_ids') for option_id in selected_option_ids
+            ]
+
         return value
-    
+
+    def parse_id(self, value, field):
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            raise serializers.ValidationError(f"Invalid {field}: {value}")
+
     def create(self, validated_data):
+        """
+        Save a submission with a constant number of queries: one lookup of
+        the survey's questions and options, then one insert each for the
+        response, its answers and their selected options.
+        """
         survey = self.context['survey']
         request = self.context['request']
-        response = Response.objects.create(
+        question_options = {}
+        for question_id, option_id in Question.objects.filter(
+            survey=survey
+        ).values_list('question_id', 'options__option_id'):
+            options = question_options.setdefault(question_id, set())
+            if option_id:
+                options.add(option_id)
+
+        response = Response(
             survey=survey,
             respondent_email=validated_data.get('respondent_email'),
             respondent_name=validated_data.get('respondent_name'),
@@ -229,31 +272,36 @@ class ResponseSubmissionSerializer(serializers.Serializer):
             user_agent=request.META.get('HTTP_USER_AGENT', '')
         )
 
+        answers = []
+        selected_options = []
         for answer_data in validated_data['answers']:
-            question_id = answer_data.pop('question_id')
-            selected_option_ids = answer_data.pop('selected_option_ids', [])
-
-            try:
-                question = Question.objects.get(question_id=question_id, survey=survey)
-            except Question.DoesNotExist:
+            question_id = answer_data['question_id']
+            if question_id not in question_options:
                 continue
+            valid_options = question_options.pop(question_id)
 
-            answer = ResponseAnswer.objects.create(
+            answer = ResponseAnswer(
                 response=response,
-                question=question,
-                **answer_data
+                question_id=question_id,
+                **{field: answer_data[field] for field in self.ANSWER_FIELDS if field in answer_data}
             )
+            answers.append(answer)
+
+            for option_id in dict.fromkeys(answer_data['selected_option_ids']):
+                if option_id in valid_options:
+                    selected_options.append((answer, option_id))
 
-            if selected_option_ids:
-                valid_options = QuestionOption.objects.filter(
-                    option_id__in=selected_option_ids,
-                    question=question
-                )
-                answer.selected_options.set(valid_options)
-        
         response.is_completed = True
         response.submitted_at = timezone.now()
-        response.calculate_completion_time()
+        response.completion_time_seconds = int((response.submitted_at - response.started_at).total_seconds())
+        response.save(force_insert=True)
+        ResponseAnswer.objects.bulk_create(answers)
+
+        SelectedOption = ResponseAnswer.selected_options.through
+        SelectedOption.objects.bulk_create([
+            SelectedOption(responseanswer_id=answer.answer_id, questionoption_id=option_id)
+            for answer, option_id in selected_options
+        ])
 
         return response
     
@@ -323,6 +371,6 @@ class SurveyDuplicateSerializer(serializers.Serializer):
         except SurveyTheme.DoesNotExist:
             pass
 
-        SurveyAnalytics.objects.create(survey=new_survey)
+        SurveyAnalytics.objects.get_or_create(survey=new_survey)
 
         return new_survey
\ No newline at end of file
@@ -1,9 +1,59 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Survey, SurveyAnalytics
+from project_insight.cache import track_model
+from .models import Survey, SurveyAnalytics, Question, QuestionOption, SurveyTheme, Response
+from .snapshots import build_snapshot, invalidate_snapshot
 
 @receiver(post_save, sender=Survey)
 def create_survey_analytics(sender, instance, created, **kwargs):
     """Auto create analytics when survey is created"""
     if created:
-        SurveyAnalytics.objects.get_or_create(survey=instance)
\ No newline at end of file
+        SurveyAnalytics.objects.get_or_create(survey=instance)
+
+@receiver(post_save, sender=Survey)
+def refresh_public_snapshot(sender, instance, **kwargs):
+    """Rebuild the cached public payload once the survey change is committed"""
+    share_token = instance.share_token
+    transaction.on_commit(lambda: build_snapshot(share_token))
+
+@receiver(post_delete, sender=Survey)
+def drop_public_snapshot(sender, instance, **kwargs):
+    invalidate_snapshot(instance.share_token)
+
+def invalidate_on_commit(share_token):
+    if share_token:
+        transaction.on_commit(lambda: invalidate_snapshot(share_token))
+
+def survey_share_token(survey_id):
+    return Survey.objects.filter(survey_id=survey_id).values_list('share_token', flat=True).first()
+
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=SurveyTheme)
+def survey_content_changed(sender, instance, **kwargs):
+    """Invalidate the public payload when a question or the theme changes"""
+    if sender.survey.is_cached(instance):
+        invalidate_on_commit(instance.survey.share_token)
+    else:
+        invalidate_on_commit(survey_share_token(instance.survey_id))
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def question_option_changed(sender, instance, **kwargs):
+    """Invalidate the public payload when an option changes"""
+    if QuestionOption.question.is_cached(instance) and Question.survey.is_cached(instance.question):
+        invalidate_on_commit(instance.question.survey.share_token)
+    else:
+        invalidate_on_commit(Survey.objects.filter(
+            questions__question_id=instance.question_id
+        ).values_list('share_token', flat=True).first())
+
+
+def question_survey_id(option):
+    if QuestionOption.question.is_cached(option):
+        return option.question.survey_id
+    return Question.objects.filter(question_id=option.question_id).values_list('survey_id', flat=True).first()
+
+track_model(Survey, organization=lambda survey: survey.organization_id, survey=lambda survey: survey.survey_id)
+track_model(Question, survey=lambda question: question.survey_id)
+track_model(QuestionOption, survey=question_survey_id)
+track_model(Response, survey=lambda response: response.survey_id)
@@ -0,0 +1,63 @@
+import hashlib
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from project_insight.cache import shared_timeout
+from .models import Survey
+from .serializers import SurveyPublicSerializer
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+LOCAL_SNAPSHOT_TIMEOUT = 15
+
+def snapshot_key(share_token):
+    return f"surveys:public:{share_token}"
+
+def build_snapshot(share_token):
+    """
+    Render the public payload of a published survey once and cache the JSON
+    bytes with an ETag. Returns None (and drops any cached copy) when the
+    survey is not published. Edits invalidate the snapshot, which only
+    reaches other workers through a shared cache, so a process-local cache
+    keeps snapshots for a few seconds only.
+    """
+    survey = Survey.objects.select_related('organization').prefetch_related(
+        'questions__options', 'theme'
+    ).filter(
+        share_token=share_token,
+        status='active',
+        is_public=True
+    ).first()
+    if survey is None:
+        cache.delete(snapshot_key(share_token))
+        return None
+
+    body = JSONRenderer().render({
+        'success': True,
+        'data': SurveyPublicSerializer(survey).data
+    })
+    snapshot = {
+        'body': body,
+        'etag': f'"{hashlib.sha256(body).hexdigest()}"',
+        'published_at': survey.published_at,
+        'closes_at': survey.closes_at,
+    }
+    cache.set(snapshot_key(share_token), snapshot, shared_timeout(SNAPSHOT_TIMEOUT, LOCAL_SNAPSHOT_TIMEOUT))
+    return snapshot
+
+def get_snapshot(share_token):
+    snapshot = cache.get(snapshot_key(share_token))
+    if snapshot is None:
+        snapshot = build_snapshot(share_token)
+    return snapshot
+
+def invalidate_snapshot(share_token):
+    cache.delete(snapshot_key(share_token))
+
+def snapshot_is_open(snapshot):
+    """Same time window checks as Survey.is_active, on a cached snapshot."""
+    now = timezone.now()
+    if snapshot['published_at'] and snapshot['published_at'] > now:
+        return False
+    if snapshot['closes_at'] and snapshot['closes_at'] < now:
+        return False
+    return True
@@ -1,3 +1,360 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.tests import create_organization
+from .analytics import build_dashboard, build_question_analytics, parse_timeline_window, record_submission
+from .exports import iter_response_chunks, stream_responses_csv
+from .models import (
+    OrganizationDailyRollup, Question, QuestionOption, Response, ResponseAnswer, Survey, SurveyAnalytics,
+    SurveyDailyRollup, SurveyResponseBucket
+)
 
-# Create your tests here.
+class SurveyListSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.organization = create_organization()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_survey(self, title, description=''):
+        return Survey.objects.create(
+            title=title, description=description, organization=self.organization, created_by=self.user
+        )
+
+    def fetch_all(self, url):
+        titles = []
+        requests = 0
+        while url:
+            requests += 1
+            self.assertLess(requests, 20)
+            data = self.client.get(url).json()
+            titles += [survey['title'] for survey in data['results']]
+            url = data['next']
+        return titles
+
+    def test_search_ranks_title_matches_first(self):
+        self.create_survey('Staff survey', 'Asks about customer support')
+        self.create_survey('Customer feedback')
+        self.create_survey('Unrelated')
+
+        response = self.client.get('/api/v1/surveys/', {'search': 'custom'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s['title'] for s in response.json()['results']], ['Customer feedback', 'Staff survey'])
+
+    def test_search_pages_through_tied_ranks(self):
+        surveys = [self.create_survey('Customer feedback') for _ in range(7)]
+        Survey.objects.update(created_at=timezone.now())
+
+        first_page = self.client.get('/api/v1/surveys/', {'search': 'customer', 'page_size': 2}).json()
+        self.assertEqual((first_page['count'], len(first_page['results'])), (7, 2))
+        self.assertIn('offset=2', first_page['next'])
+
+        survey_ids = []
+        url = '/api/v1/surveys/?search=customer&page_size=2'
+        while url:
+            self.assertLess(len(survey_ids), 10)
+            data = self.client.get(url).json()
+            survey_ids += [survey['survey_id'] for survey in data['results']]
+            url = data['next']
+
+        self.assertEqual(survey_ids, sorted(str(survey.survey_id) for survey in surveys))
+
+    def test_search_combines_with_status_filter(self):
+        self.create_survey('Customer feedback draft')
+        active = self.create_survey('Customer feedback active')
+        active.status = 'active'
+        active.save()
+
+        response = self.client.get('/api/v1/surveys/', {'search': 'customer', 'status': 'active'})
+
+        self.assertEqual([s['title'] for s in response.json()['results']], ['Customer feedback active'])
+
+    def test_list_without_search_pages_by_cursor(self):
+        for i in range(5):
+            self.create_survey(f'Survey {i}')
+
+        titles = self.fetch_all('/api/v1/surveys/?page_size=2')
+
+        self.assertEqual(titles, [f'Survey {i}' for i in reversed(range(5))])
+
+class SurveyAnalyticsCounterTests(TestCase):
+    def setUp(self):
+        user, organization = create_organization()
+        self.survey = Survey.objects.create(title='Survey', organization=organization, created_by=user, status='active')
+
+    def record(self, is_completed=True, seconds=None):
+        response = Response.objects.create(survey=self.survey, is_completed=is_completed, completion_time_seconds=seconds)
+        SurveyAnalytics.record_response(response)
+
+    def counters(self):
+        return SurveyAnalytics.objects.filter(survey=self.survey).values(
+            'total_responses', 'completed_responses', 'completion_time_total',
+            'completion_time_count', 'average_completion_time'
+        ).get()
+
+    def test_record_response_folds_into_the_counters(self):
+        self.record(seconds=10)
+        self.record(seconds=21)
+        self.record(seconds=None)
+        self.record(is_completed=False, seconds=50)
+
+        self.assertEqual(self.counters(), {
+            'total_responses': 4, 'completed_responses': 3, 'completion_time_total': 31,
+            'completion_time_count': 2, 'average_completion_time': 15
+        })
+
+    def test_recalculate_matches_the_incremental_counters(self):
+        self.record(seconds=10)
+        self.record(is_completed=False)
+        before = self.counters()
+
+        self.assertFalse(self.survey.analytics.recalculate())
+        self.assertEqual(self.counters(), before)
+
+    def test_reconcile_corrects_completion_time_count_drift(self):
+        self.record(seconds=10)
+        SurveyAnalytics.objects.filter(survey=self.survey).update(completion_time_count=5)
+        out = StringIO()
+
+        call_command('reconcile_survey_analytics', survey=str(self.survey.survey_id), stdout=out)
+
+        self.assertIn('1 corrected', out.getvalue())
+        self.assertEqual(self.counters()['completion_time_count'], 1)
+
+    def test_unsubmitted_response_is_rolled_up_at_its_start_time(self):
+        started_at = timezone.now() - timedelta(days=3)
+        response = Response.objects.create(survey=self.survey, is_completed=False, started_at=started_at)
+
+        record_submission(response, self.survey.organization_id)
+
+        date = timezone.localdate(started_at)
+        self.assertEqual(OrganizationDailyRollup.objects.get().date, date)
+        self.assertEqual(SurveyDailyRollup.objects.get().date, date)
+        self.assertEqual(
+            SurveyResponseBucket.objects.get().bucket_start, started_at.replace(minute=0, second=0, microsecond=0)
+        )
+
+class SurveyAnalyticsRecalculateTests(TransactionTestCase):
+    def test_submission_recorded_during_recalculation_is_kept(self):
+        user, organization = create_organization()
+        survey = Survey.objects.create(title='Survey', organization=organization, created_by=user, status='active')
+        analytics, _ = SurveyAnalytics.objects.get_or_create(survey=survey)
+        recorded = threading.Event()
+        release = threading.Event()
+
+        def submit():
+            with transaction.atomic():
+                response = Response.objects.create(survey=survey, is_completed=True, completion_time_seconds=5)
+                SurveyAnalytics.record_response(response)
+                recorded.set()
+                release.wait(5)
+            connection.close()
+
+        def recalculate():
+            analytics.recalculate()
+            connection.close()
+
+        threads = [threading.Thread(target=submit), threading.Thread(target=recalculate)]
+        threads[0].start()
+        recorded.wait(5)
+        threads[1].start()
+        # Give the recalculation time to count before the submission commits
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        analytics.refresh_from_db()
+        self.assertEqual((analytics.total_responses, analytics.completion_time_count), (1, 1))
+
+class ResponseSubmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user, organization = create_organization()
+        self.survey = Survey.objects.create(title='Survey', organization=organization, created_by=user, status='active')
+        self.text = Question.objects.create(survey=self.survey, question_text='Name', question_type='text', order=0)
+        self.choice = Question.objects.create(survey=self.survey, question_text='Pick', question_type='checkbox', order=1)
+        self.options = [
+            QuestionOption.objects.create(question=self.choice, option_text=text, order=i)
+            for i, text in enumerate(['A', 'B'])
+        ]
+        self.url = f'/api/v1/surveys/submit/{self.survey.share_token}/'
+
+    def submit(self, answers):
+        return APIClient().post(self.url, {'answers': answers}, format='json')
+
+    def test_ids_match_whatever_their_spelling(self):
+        response = self.submit([
+            {'question_id': str(self.text.question_id).upper(), 'answer_text': 'Ann'},
+            {'question_id': self.choice.question_id.hex, 'selected_option_ids': [
+                self.options[0].option_id.hex, str(self.options[1].option_id).upper()
+            ]},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        answers = {answer.question_id: answer for answer in ResponseAnswer.objects.all()}
+        self.assertEqual(answers[self.text.question_id].answer_text, 'Ann')
+        self.assertEqual(set(answers[self.choice.question_id].selected_options.all()), set(self.options))
+
+    def test_unparseable_ids_are_rejected(self):
+        for answer in [
+            {'question_id': 'question-1', 'answer_text': 'Ann'},
+            {'question_id': str(self.choice.question_id), 'selected_option_ids': ['A']},
+        ]:
+            response = self.submit([answer])
+            self.assertEqual(response.status_code, 400, answer)
+        self.assertFalse(Response.objects.exists())
+
+    def test_options_of_other_questions_are_skipped(self):
+        other = Question.objects.create(survey=self.survey, question_text='Other', question_type='checkbox', order=2)
+        foreign = QuestionOption.objects.create(question=other, option_text='C')
+
+        response = self.submit([
+            {'question_id': str(self.choice.question_id), 'selected_option_ids': [str(foreign.option_id), str(self.options[0].option_id)]},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(ResponseAnswer.objects.get().selected_options.all()), [self.options[0]])
+
+class SurveyResponseListTests(TestCase):
+    def test_responses_page_by_start_time(self):
+        user, organization = create_organization()
+        survey = Survey.objects.create(title='Survey', organization=organization, created_by=user)
+        now = timezone.now()
+        for i in range(5):
+            Response.objects.create(survey=survey, respondent_email=f'{i}@example.com', started_at=now - timedelta(minutes=i))
+        client = APIClient()
+        client.force_authenticate(user)
+
+        emails = []
+        url = f'/api/v1/surveys/{survey.survey_id}/responses/?page_size=2'
+        while url:
+            self.assertLess(len(emails), 10)
+            data = client.get(url).json()
+            emails += [response['respondent_email'] for response in data['results']]
+            url = data['next']
+
+        self.assertEqual(emails, [f'{i}@example.com' for i in range(5)])
+
+class ParseTimelineWindowTests(SimpleTestCase):
+    def test_units(self):
+        self.assertEqual(parse_timeline_window('36h'), timedelta(hours=36))
+        self.assertEqual(parse_timeline_window('7d'), timedelta(days=7))
+        self.assertEqual(parse_timeline_window('2w'), timedelta(weeks=2))
+        self.assertEqual(parse_timeline_window('1y'), timedelta(days=365))
+
+    def test_invalid_windows(self):
+        for value in (None, '', '7', 'd', '7m', '-7d', '0d', ' 7d', '1.5d'):
+            self.assertIsNone(parse_timeline_window(value), value)
+
+    def test_overlong_windows_are_rejected(self):
+        self.assertEqual(parse_timeline_window('5y'), timedelta(days=365 * 5))
+        for value in ('6y', '99999y', '9999999y'):
+            self.assertIsNone(parse_timeline_window(value), value)
+
+class ResponseTimelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.organization = create_organization()
+        self.survey = Survey.objects.create(title='Survey', organization=self.organization, created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/v1/surveys/{self.survey.survey_id}/response-rate/'
+
+    def submit(self, submitted_at, seconds):
+        response = Response.objects.create(
+            survey=self.survey, is_completed=True, submitted_at=submitted_at, completion_time_seconds=seconds
+        )
+        record_submission(response, self.organization.org_id)
+
+    def test_overlong_window_is_rejected(self):
+        response = self.client.get(self.url, {'window': '9999999y'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_daily_and_weekly_points_come_from_daily_rollups(self):
+        now = timezone.now()
+        self.submit(now, 10)
+        self.submit(now, 20)
+        self.submit(now - timedelta(days=200), 30)
+
+        data = self.client.get(self.url, {'window': '1y', 'granularity': 'day'}).json()['data']
+        self.assertEqual([point['count'] for point in data['response_timeline']], [1, 2])
+        self.assertEqual(data['response_timeline'][-1]['date'], timezone.localdate(now).isoformat())
+        self.assertEqual(data['completion_timeline'][-1]['avg_time_seconds'], 15)
+
+        data = self.client.get(self.url, {'window': '30d', 'granularity': 'week'}).json()['data']
+        self.assertEqual([point['count'] for point in data['response_timeline']], [2])
+
+        data = self.client.get(self.url, {'window': '24h', 'granularity': 'hour'}).json()['data']
+        self.assertEqual(sum(point['count'] for point in data['response_timeline']), 2)
+
+class QuestionAnalyticsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.organization = create_organization()
+        self.surveys = [
+            Survey.objects.create(title=title, organization=self.organization, created_by=self.user)
+            for title in ('First', 'Second')
+        ]
+        for survey in self.surveys:
+            Question.objects.create(survey=survey, question_text='Rating', question_type='rating', order=0)
+            build_question_analytics(survey)
+
+    def test_cached_until_the_survey_changes(self):
+        with self.assertNumQueries(0):
+            build_question_analytics(self.surveys[0])
+
+    def test_response_only_invalidates_its_own_survey(self):
+        first, second = self.surveys
+        with self.captureOnCommitCallbacks(execute=True):
+            Response.objects.create(survey=first, is_completed=True, submitted_at=timezone.now())
+
+        with self.assertNumQueries(0):
+            build_question_analytics(second)
+        with CaptureQueriesContext(connection) as queries:
+            build_question_analytics(first)
+        self.assertTrue(queries.captured_queries)
+
+class DashboardTests(TestCase):
+    def test_top_surveys_count_completed_responses(self):
+        cache.clear()
+        user, organization = create_organization()
+        survey = Survey.objects.create(title='Survey', organization=organization, created_by=user, status='active')
+        for is_completed in (True, True, False):
+            response = Response.objects.create(
+                survey=survey, is_completed=is_completed, submitted_at=timezone.now() if is_completed else None
+            )
+            record_submission(response, organization.org_id)
+
+        top_survey, = build_dashboard(organization)['top_surveys']
+
+        self.assertEqual(
+            (top_survey['response_count'], top_survey['total_responses'], top_survey['completion_rate']), (2, 3, 66.67)
+        )
+
+class ResponseExportTests(TestCase):
+    def test_csv_keeps_completed_responses_without_submission_time(self):
+        user, organization = create_organization()
+        survey = Survey.objects.create(title='Survey', organization=organization, created_by=user)
+        now = timezone.now()
+        for email, submitted_at in [('old@example.com', now - timedelta(days=1)), ('new@example.com', now), ('none@example.com', None)]:
+            Response.objects.create(survey=survey, respondent_email=email, is_completed=True, submitted_at=submitted_at)
+        Response.objects.create(survey=survey, respondent_email='partial@example.com', is_completed=False)
+
+        lines = ''.join(stream_responses_csv(survey, [])).splitlines()
+
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ['new@example.com', 'old@example.com', 'none@example.com'])
+        self.assertEqual(lines[3].split(',')[3], '')
+        self.assertEqual(
+            [resp['respondent_email'] for chunk in iter_response_chunks(survey, chunk_size=1) for resp, _ in chunk],
+            ['new@example.com', 'old@example.com', 'none@example.com']
+        )
@@ -1,25 +1,36 @@
 from rest_framework import status, generics, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response as APIResponse
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count, Avg, Sum
 from django.db import transaction
-from django.http import HttpResponse
-import csv
-from datetime import timedelta
-from django.db.models.functions import TruncDate
+from django.http import Http404, StreamingHttpResponse, FileResponse, HttpResponse, HttpResponseNotModified
+from django.db.models.functions import Coalesce
 from users.webhook_sender import send_webhook
 
-from users.models import UserOrganization, Organization
-from .models import Survey, Question, QuestionOption, Response, ResponseAnswer, SurveyAnalytics
+from users.models import Organization
+from users.membership import admin_organization_id, get_role, is_member, organization_ids
+from .models import Survey, Question, QuestionOption, Response, SurveyAnalytics
 from .serializers import (
     SurveyListSerializer, SurveyDetailSerializer, SurveyPublicSerializer,
     QuestionSerializer, ResponseSerializer, ResponseSubmissionSerializer,
     SurveyDuplicateSerializer, SurveyAnalyticsSerializer
 )
+from .analytics import (
+    MAX_HOURLY_TIMELINE_WINDOW, TIMELINE_GRANULARITIES,
+    build_dashboard, build_question_analytics, build_response_timeline, parse_timeline_window,
+    record_submission
+)
+from .snapshots import get_snapshot, snapshot_is_open
+from project_insight.pagination import KeysetPagination, SearchRankPagination, StartedAtPagination
+from .search import search_surveys
+from .exports import (
+    CSVExportRenderer, ParquetExportRenderer, ArrowExportRenderer,
+    stream_responses_csv, export_responses_columnar
+)
 
 # Create your views here.
 
@@ -27,35 +38,26 @@ class SurveyPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated
     def has_object_permission(self, request, view, obj):
-        try:
-            user_org = UserOrganization.objects.get(
-                user=request.user,
-                organization=obj.organization
-            )
-
-            if request.method in permissions.SAFE_METHODS:
-                return True
-            if user_org.role == 'admin' or obj.organization.owner_user == request.user:
-                return True
-            if obj.created_by == request.user:
-                return True
-        except UserOrganization.DoesNotExist:
-            pass
-        return False
+        role = get_role(request.user, obj.organization_id)
+        if role is None:
+            return False
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        if role == 'admin' or obj.organization.owner_user_id == request.user.pk:
+            return True
+        return obj.created_by_id == request.user.pk
 
 class SurveyListCreateView(generics.ListCreateAPIView):
     serializer_class = SurveyListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
         org_id = self.request.query_params.get('organization')
         
-        # Get user's organizations
-        user_orgs = UserOrganization.objects.filter(user=user).values_list('organization_id', flat=True)
-        
         # Filter surveys by user's organizations
-        queryset = Survey.objects.filter(organization_id__in=user_orgs)
+        queryset = Survey.objects.filter(organization_id__in=organization_ids(user))
 
         # Optional: Filter by specific organization
         if org_id:
@@ -66,13 +68,27 @@ class SurveyListCreateView(generics.ListCreateAPIView):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
-        # Optional: Search by title
+        # Optional: Full-text search on title and description, ranked
         search = self.request.query_params.get('search')
+        ordering = ['-created_at']
         if search:
-            queryset = queryset.filter(title__icontains=search)
+            queryset = search_surveys(queryset, search)
+            ordering = ['-search_rank', '-created_at', 'survey_id']
         
         # Return optimized queryset
-        return queryset.select_related('created_by', 'organization').order_by('-created_at')
+        return queryset.select_related('created_by', 'organization').annotate(
+            total_response_count=Coalesce('analytics__total_responses', 0),
+            completed_response_count=Coalesce('analytics__completed_responses', 0)
+        ).order_by(*ordering)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('search'):
+                self._paginator = SearchRankPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -83,21 +99,15 @@ class SurveyListCreateView(generics.ListCreateAPIView):
         org_id = self.request.data.get('organization_id')
 
         if org_id:
-            organization = get_object_or_404(
-                Organization.objects.filter(
-                    org_id=org_id,
-                    userorganization__user=self.request.user
-                )
-            )
+            if not is_member(self.request.user, org_id):
+                raise Http404
+            organization = get_object_or_404(Organization, org_id=org_id)
         else:
-            user_org = UserOrganization.objects.filter(
-                user=self.request.user,
-                role='admin'
-            ).first()
+            admin_org_id = admin_organization_id(self.request.user)
 
-            if not user_org:
+            if admin_org_id is None:
                 raise ValidationError("User harus menjadi admin minimal satu organisasi")
-            organization = user_org.organization
+            organization = Organization.objects.get(org_id=admin_org_id)
         
         # CHECK SUBSCRIPTION LIMITS
         if not organization.can_create_survey():
@@ -123,12 +133,8 @@ class SurveyDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'survey_id'
 
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
-
         return Survey.objects.filter(
-            organization_id__in=user_orgs
+            organization_id__in=organization_ids(self.request.user)
         ).select_related('created_by', 'organization').prefetch_related('questions__options', 'theme')
     
 @api_view(['POST'])
@@ -137,18 +143,14 @@ def duplicate_survey(request, survey_id):
     original_survey = get_object_or_404(
         Survey.objects.filter(
             survey_id=survey_id,
-            organization__userorganization__user=request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
-    org_id = request.data.get('organization_id', original_survey.organization.org_id)
-    organization = get_object_or_404(
-        Organization.objects.filter(
-            org_id=org_id,
-            userorganization__user=request.user,
-            userorganization__role='admin'
-        )
-    )
+    org_id = request.data.get('organization_id', original_survey.organization_id)
+    if get_role(request.user, org_id) != 'admin':
+        raise Http404
+    organization = get_object_or_404(Organization, org_id=org_id)
 
     serializer = SurveyDuplicateSerializer(
         data=request.data,
@@ -182,7 +184,7 @@ def publish_survey(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id=survey_id,
-            organization__userorganization__user=request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
@@ -227,7 +229,7 @@ def close_survey(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id=survey_id,
-            organization__userorganization__user=request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
@@ -265,32 +267,27 @@ def close_survey(request, survey_id):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_public_survey(request, share_token):
-    try:
-        survey = Survey.objects.select_related('organization').prefetch_related(
-            'questions__options', 'theme'
-        ).get(
-            share_token=share_token,
-            status='active',
-            is_public=True
-        )
-
-        if not survey.is_active:
-            return APIResponse({
-                'success': False,
-                'message': 'Survey tidak tersedia saat ini'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        serializer = SurveyPublicSerializer(survey)
-        return APIResponse({
-            'success': True,
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
-    
-    except Survey.DoesNotExist:
+    snapshot = get_snapshot(share_token)
+    if snapshot is None:
         return APIResponse({
             'success': False,
             'message': 'Survey tidak ditemukan'
         }, status=status.HTTP_404_NOT_FOUND)
+
+    if not snapshot_is_open(snapshot):
+        return APIResponse({
+            'success': False,
+            'message': 'Survey tidak tersedia saat ini'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if snapshot['etag'] in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(snapshot['body'], content_type='application/json')
+    response['ETag'] = snapshot['etag']
+    response['Cache-Control'] = 'no-cache'
+    return response
     
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -316,8 +313,7 @@ def submit_survey_response(request, share_token):
         if serializer.is_valid():
             with transaction.atomic():
                 response = serializer.save()
-                analytics, created = SurveyAnalytics.objects.get_or_create(survey=survey)
-                analytics.recalculate()
+                record_submission(response, survey.organization_id)
 
                 webhook_payload = {
                 'response_id': str(response.response_id),
@@ -354,13 +350,14 @@ def submit_survey_response(request, share_token):
 class SurveyResponseListView(generics.ListAPIView):
     serializer_class = ResponseSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StartedAtPagination
 
     def get_queryset(self):
         survey_id = self.kwargs['survey_id']
         survey = get_object_or_404(
             Survey.objects.filter(
                 survey_id=survey_id,
-                organization__userorganization__user=self.request.user
+                organization_id__in=organization_ids(self.request.user)
             )
         )
 
@@ -382,7 +379,7 @@ class SurveyResponseListView(generics.ListAPIView):
         if end_date:
             queryset = queryset.filter(submitted_at__lte=end_date)
         
-        return queryset.order_by('-submitted_at')
+        return queryset.order_by('-started_at')
     
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -390,68 +387,18 @@ def survey_analytics(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id=survey_id,
-            organization__userorganization__user=request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
     analytics, created = SurveyAnalytics.objects.get_or_create(survey=survey)
-    if created or (timezone.now() - analytics.last_calculated).seconds > 300:
+    if created:
         analytics.recalculate()
 
     basic_analytics = SurveyAnalyticsSerializer(analytics).data
 
-    question_analytics = []
-    for question in survey.questions.all().order_by('order'):
-        answers_count = ResponseAnswer.objects.filter(question=question).count()
-        question_data = {
-            'question_id' : str(question.question_id),
-            'question_text' : question.question_text,
-            'question_type' : question.question_type,
-            'question_count': answers_count
-        }
-
-        if question.question_type in ['multiple_choice', 'dropdown', 'checkbox']:
-            options_data = []
-            for option in question.options.all().order_by('order'):
-                count = ResponseAnswer.objects.filter(
-                    question=question,
-                    selected_options=option
-                ).count()
-
-                percentage = round((count / answers_count * 100), 2) if answers_count > 0 else 0
-                options_data.append({
-                    'option_text': option.option_text,
-                    'count': count,
-                    'percentage': percentage
-                })
-            question_data['options_distribution'] = options_data
-        
-        elif question.question_type == 'rating':
-            ratings = ResponseAnswer.objects.filter(
-                question=question,
-                answer_number__isnull=False
-            )
-
-            if ratings.exists():
-                rating_values = [float(r.answer_number) for r in ratings]
-                question_data['average_rating'] = round(sum(rating_values) / len(rating_values), 2)
-                rating_dist = {}
-                for rating in rating_values:
-                    rating_int = int(rating)
-                    rating_dist[rating_int] = rating_dist.get(rating_int, 0) + 1
-                
-                question_data['rating_distribution'] = rating_dist
-        
-        elif question.question_type in ['text', 'textarea']:
-            text_responses = ResponseAnswer.objects.filter(
-                question=question,
-                answer_text__isnull=False
-            ).exclude(answer_text='').values_list('answer_text', flat=True)[:5]
+    question_analytics = build_question_analytics(survey)
 
-            question_data['sample_responses'] = list(text_responses)
-        
-        question_analytics.append(question_data)
-    
     return APIResponse({
         'success': True,
         'data': {
@@ -463,50 +410,40 @@ def survey_analytics(request, survey_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, CSVExportRenderer, ParquetExportRenderer, ArrowExportRenderer])
 def export_survey_responses(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id=survey_id,
-            organization__userorganization__user=request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
     export_format = request.query_params.get('format', 'json').lower()
-    responses = Response.objects.filter(
-        survey=survey,
-        is_completed=True
-    ).prefetch_related('answers__question', 'answers__selected_options').order_by('-submitted_at')
+    filename = f"{survey.title.replace(' ', '_')}_responses_{timezone.now().strftime('%Y%m%d')}"
 
     if export_format == 'csv':
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        filename = f"{survey.title.replace(' ', '_')}_responses_{timezone.now().strftime('%Y%m%d')}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        headers = ['Response ID', 'Email', 'Name', 'Submitted At', 'Completion Time (seconds)']
-        questions = survey.questions.all().order_by('order')
-
-        for question in questions:
-            headers.append(f"Q{question.order}: {question.question_text}")
-        
-        writer.writerow(headers)
-
-        for resp in responses:
-            row = [
-                str(resp.response_id),
-                resp.respondent_email or '',
-                resp.respondent_name or '',
-                resp.submitted_at.strftime('%Y-%m-%d %H:%M:%S') if resp.submitted_at else '',
-                resp.completion_time_seconds or ''
-            ]
-
-            for question in questions:
-                try:
-                    answer = resp.answers.get(question=question)
-                    row.append(answer.display_value)
-                except ResponseAnswer.DoesNotExist:
-                    row.append('')
+        questions = list(survey.questions.all().order_by('order'))
+        response = StreamingHttpResponse(
+            stream_responses_csv(survey, questions),
+            content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
         return response
+    elif export_format in ['parquet', 'arrow']:
+        questions = list(survey.questions.all().order_by('order'))
+        renderer = ParquetExportRenderer if export_format == 'parquet' else ArrowExportRenderer
+        return FileResponse(
+            export_responses_columnar(survey, questions, export_format),
+            as_attachment=True,
+            filename=f"{filename}.{export_format}",
+            content_type=renderer.media_type
+        )
     else:
+        responses = Response.objects.filter(
+            survey=survey,
+            is_completed=True
+        ).prefetch_related('answers__question', 'answers__selected_options').order_by('-submitted_at')
         serializer = ResponseSerializer(responses, many=True)
         return APIResponse({
             'success': True,
@@ -524,7 +461,7 @@ def schedule_survey(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id = survey_id,
-            organization__userorganization__user = request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
@@ -578,7 +515,7 @@ def cancel_schedule(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id = survey_id,
-            organization__userorganization__user = request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
@@ -610,135 +547,26 @@ def cancel_schedule(request, survey_id):
 def dashboard_overview(request):
     org_id = request.query_params.get('organization')
     if org_id:
-        try:
-            user_org = UserOrganization.objects.get(
-                user = request.user,
-                organization__org_id = org_id
-            )
-            organization = user_org.organization
-        except UserOrganization.DoesNotExist:
+        if not is_member(request.user, org_id):
             return APIResponse({
                 'success': False,
                 'message': 'Tidak memiliki akses ke organisasi ini'
             }, status = status.HTTP_403_FORBIDDEN)
     else:
-        user_org = UserOrganization.objects.filter(
-            user = request.user,
-            role = 'admin'
-        ).first()
+        org_id = admin_organization_id(request.user)
 
-        if not user_org:
+        if org_id is None:
             return APIResponse({
                 'success': False,
                 'message': 'User harus menjadi admin minimal satu organisasi'
-            }, statis=status.HTTP_403_FORBIDDEN)
-        
-        organization = user_org.organization
-        total_surveys = Survey.objects.filter(organization = organization).count()
-        active_surveys = Survey.objects.filter(
-            organization = organization,
-            status = 'active'
-        ).count()
-        draft_surveys = Survey.objects.filter(
-            organization = organization,
-            status = 'draft'
-        ).count()
-        closed_surveys = Survey.objects.filter(
-            organization = organization,
-            status = 'closed'
-        ).count()
-        thirty_days_ago = timezone.now() - timedelta(days = 30)
-        total_responses = Response.objects.filter(
-            survey__organization = organization,
-            submitted_at__gte = thirty_days_ago,
-            is_completed = True
-        ).count()
-        avg_completion = Response.objects.filter(
-            survey__organization = organization,
-            is_complted = True,
-            completion_time_seconds__isnull = False
-        ).aggregate(
-            avg_time = Avg('completion_time_seconds')
-        )['avg_time']
-        avg_completuon_formattted = None
-        if avg_completion:
-            minutes = int(avg_completion) // 60
-            seconds = int(avg_completion) % 60
-            avg_completion_formatted = f"{minutes}m {seconds}s"
-        
-        response_trend = []
-        for i in range(6, -1, -1):
-            date = timezone.now() - timedelta(days = i)
-            count = Response.objects.filter(
-                survey__organization = organization,
-                submitted_at__date = date.date(),
-                is_completed = True
-            ).count()
-            response_trend.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'count': count
-            })
-        
-        top_surveys = Survey.objects.filter(
-            organization = organization,
-            status__in = ['active', 'closed']
-        ).annotate(
-            response_count = Count('responses', filter = Q(responses__is_completed = True))
-        ).order_by('-response_count')[:5]
-
-        top_surveys_data = []
-        for survey in top_surveys:
-            completion_rate = 0
-            total = survey.responses.count()
-            completed = survey.responses.filter(is_completed = True).count()
-            if total > 0:
-                completion_rate = round((completed / total) * 100, 2)
-            top_surveys_data.append({
-                'survey_id': str(survey.survey_id),
-                'title': survey.title,
-                'response_count': survey.response_count,
-                'completion_rate': completion_rate,
-                'status': survey.status
-            })
-        
-        recent_responses = Response.objects.filter(
-            survey__organization = organization,
-            is_completed = True
-        ).select_related('survey').order_by('-submitted_at')[:10]
-        recent_responses_data = []
-        for resp in recent_responses:
-            recent_responses_data.append({
-                'response_id': str(resp.response_id),
-                'survey_title': resp.survey.title,
-                'respondent_email': resp.respondent_email or 'Amonymous',
-                'submitted_at': resp.submitted_at.isoformat(),
-                'completion_time': f"{resp.completion_time_seconds}s" if resp.completion_time_seconds else None
-            })
-        
-        status_distribution = {
-            'draft': draft_surveys,
-            'active': active_surveys,
-            'closed': closed_surveys
-        }
+            }, status=status.HTTP_403_FORBIDDEN)
 
-        return APIResponse({
-            'success': True,
-            'data': {
-                'summary': {
-                    'total_surveys': total_surveys,
-                    'active_surveys': active_surveys,
-                    'draft_surveys': draft_surveys,
-                    'closed_surveys': closed_surveys,
-                    'total_responses_lat_30d': total_responses,
-                    'avg_completion_time': avg_completion_formatted
-                },
-                'response_trend': response_trend,
-                'top_surveys': top_surveys_data,
-                'recent_responses': recent_responses_data,
-                'statis_distribution': status_distribution,
-                'last_updated': timezone.now().isoformat()
-            }
-        }, status = status.HTTP_200_OK)
+    organization = Organization.objects.get(org_id=org_id)
+
+    return APIResponse({
+        'success': True,
+        'data': build_dashboard(organization)
+    }, status = status.HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -746,48 +574,39 @@ def survey_response_rate(request, survey_id):
     survey = get_object_or_404(
         Survey.objects.filter(
             survey_id = survey_id,
-            organization__userorganization__user = request.user
+            organization_id__in=organization_ids(request.user)
         )
     )
 
-    total_responses = survey.responses.count()
-    completed_responses = survey.responses.filter(is_completed = True).count()
+    window_param = request.query_params.get('window', '30d')
+    window = parse_timeline_window(window_param)
+    granularity = request.query_params.get('granularity', 'day')
+    if window is None:
+        return APIResponse({
+            'success': False,
+            'message': 'Parameter window tidak valid (contoh: 24h, 7d, 90d, 1y)'
+        }, status = status.HTTP_400_BAD_REQUEST)
+    if granularity not in TIMELINE_GRANULARITIES:
+        return APIResponse({
+            'success': False,
+            'message': 'Parameter granularity harus hour, day, atau week'
+        }, status = status.HTTP_400_BAD_REQUEST)
+    if granularity == 'hour' and window > MAX_HOURLY_TIMELINE_WINDOW:
+        return APIResponse({
+            'success': False,
+            'message': 'Granularity hour hanya tersedia untuk window maksimal 90 hari'
+        }, status = status.HTTP_400_BAD_REQUEST)
+
+    analytics = SurveyAnalytics.objects.filter(survey = survey).values(
+        'total_responses', 'completed_responses'
+    ).first() or {'total_responses': 0, 'completed_responses': 0}
+    total_responses = analytics['total_responses']
+    completed_responses = analytics['completed_responses']
     completion_rate = 0
     if total_responses > 0:
         completion_rate = round((completed_responses / total_responses) * 100, 2)
-    
-    thirty_days_ago = timezone.now() - timedelta(days = 30)
-    responses_by_date = survey.responses.filter(
-        submitted_at__gte = thirty_days_ago
-    ).annotate(
-        date = TruncDate('submitted_at')
-    ).values('date').annotate(
-        count = Count('response_id')
-    ).order_by('date')
-    response_timeline = [
-        {
-            'date': item['date'].isoformat(),
-            'count': item['count']
-        }
-        for item in responses_by_date
-    ]
-
-    completion_times = survey.responses.filter(
-        is_completed = True,
-        completion_time_seconds__isnull = False,
-        submitted_at__gte = thirty_days_ago
-    ).annotate(
-        date = TruncDate('submitted_at')
-    ).values('date').annotate(
-        avg_time = Avg('completion_time_seconds')
-    ).order_by('date')
-    completion_timeline = [
-        {
-            'date': item['date'].isoformat(),
-            'avg_time_seconds': round(item['avg_time'], 2)
-        }
-        for item in completion_times
-    ]
+
+    response_timeline, completion_timeline = build_response_timeline(survey, window, granularity)
 
     return APIResponse({
         'success': True,
@@ -797,6 +616,8 @@ def survey_response_rate(request, survey_id):
             'total_responses': total_responses,
             'completed_responses': completed_responses,
             'completion_rate': completion_rate,
+            'window': window_param,
+            'granularity': granularity,
             'response_timeline': response_timeline,
             'completion_timeline': completion_timeline
         }
@@ -1,8 +1,42 @@
+import hashlib
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
+from django.core.cache import cache
 from django.utils import timezone
 from .models import APIKey
 
+API_KEY_CACHE_TIMEOUT = 60
+LAST_USED_FLUSH_INTERVAL = 60
+
+def api_key_cache_key(key_hash):
+    return f"users:apikey:{key_hash}"
+
+def invalidate_api_key(key_hash):
+    cache.delete(api_key_cache_key(key_hash))
+
+def get_api_key(key_hash):
+    """
+    Active API key with its organization and owner, looked up by the
+    SHA-256 hash of the raw key and cached for API_KEY_CACHE_TIMEOUT
+    seconds. Returns None for unknown or inactive keys.
+    """
+    cache_key = api_key_cache_key(key_hash)
+    api_key = cache.get(cache_key)
+    if api_key is None:
+        api_key = APIKey.objects.select_related('organization__owner_user').filter(
+            key_hash=key_hash,
+            is_active=True
+        ).first()
+        if api_key is None:
+            return None
+        cache.set(cache_key, api_key, API_KEY_CACHE_TIMEOUT)
+    return api_key
+
+def touch_api_key(api_key, now):
+    """Write last_used_at at most once per LAST_USED_FLUSH_INTERVAL per key."""
+    if cache.add(f"users:apikey:last_used:{api_key.key_id}", 1, LAST_USED_FLUSH_INTERVAL):
+        APIKey.objects.filter(key_id=api_key.key_id).update(last_used_at=now)
+
 class APIKeyAuthentication(BaseAuthentication):
     """Custom authentication using API Keys"""
     
@@ -17,26 +51,20 @@ class APIKeyAuthentication(BaseAuthentication):
         if not raw_key:
             return None
         
-        key_prefix = raw_key[:8]
-        
-        try:
-            api_key = APIKey.objects.get(key_prefix=key_prefix, is_active=True)
-            
-            if not api_key.verify_key(raw_key):
-                raise AuthenticationFailed('Invalid API key')
-            
-            if api_key.expires_at and api_key.expires_at < timezone.now():
-                raise AuthenticationFailed('API key expired')
-            
-            api_key.last_used_at = timezone.now()
-            api_key.save(update_fields=['last_used_at'])
-            
-            request.api_key = api_key
-            
-            return (api_key.organization.owner_user, None)
-            
-        except APIKey.DoesNotExist:
+        api_key = get_api_key(hashlib.sha256(raw_key.encode()).hexdigest())
+        if api_key is None:
             raise AuthenticationFailed('Invalid API key')
+        
+        now = timezone.now()
+        if api_key.expires_at and api_key.expires_at < now:
+            raise AuthenticationFailed('API key expired')
+        
+        touch_api_key(api_key, now)
+        
+        request.api_key = api_key
+        request._request.api_key = api_key
+        
+        return (api_key.organization.owner_user, None)
     
     def authenticate_header(self, request):
-        return 'ApiKey'
\ No newline at end of file
+        return 'ApiKey'
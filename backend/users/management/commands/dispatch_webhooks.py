@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from users.webhook_sender import (
+    DISPATCH_BATCH_SIZE, DISPATCH_WORKERS, build_session, dispatch_webhooks
+)
+
+class Command(BaseCommand):
+    help = 'Deliver queued webhook events, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for due deliveries instead of exiting when none are left'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Seconds to wait between polls when running with --loop'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DISPATCH_BATCH_SIZE,
+            help='Number of deliveries to claim per batch'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DISPATCH_WORKERS,
+            help='Number of concurrent HTTP requests'
+        )
+
+    def handle(self, *args, **options):
+        session = build_session(options['workers'])
+        delivered = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                count = dispatch_webhooks(session, executor, options['batch_size'])
+                delivered += count
+                if count == 0:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Attempted {delivered} webhook deliveries')
+        )
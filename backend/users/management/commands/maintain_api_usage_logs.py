@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from users.usage import (
+    USAGE_LOG_PARTITIONS_AHEAD, USAGE_LOG_RETENTION_DAYS, drop_expired_partitions, ensure_partitions
+)
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly API usage log partitions and drop the expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=USAGE_LOG_RETENTION_DAYS,
+            help='Keep usage logs for this many days'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=USAGE_LOG_PARTITIONS_AHEAD,
+            help='Number of future monthly partitions to keep ready'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        created = ensure_partitions(now, options['months_ahead'])
+        dropped = drop_expired_partitions(now, options['retention_days'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Created {len(created)} and dropped {len(dropped)} usage log partitions')
+        )
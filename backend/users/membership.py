@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.db import transaction
+from .models import UserOrganization
+
+MEMBERSHIP_CACHE_TIMEOUT = 60
+
+def membership_key(user_id):
+    return f"users:memberships:{user_id}"
+
+def get_memberships(user):
+    """
+    The {org_id: role} map of a user. It is loaded once per request (kept on
+    the user instance) and shared between requests through the cache for
+    MEMBERSHIP_CACHE_TIMEOUT seconds.
+    """
+    memberships = getattr(user, '_memberships', None)
+    if memberships is None:
+        key = membership_key(user.pk)
+        memberships = cache.get(key)
+        if memberships is None:
+            memberships = dict(
+                UserOrganization.objects.filter(user_id=user.pk).order_by('joined_at', 'id').values_list(
+                    'organization_id', 'role'
+                )
+            )
+            cache.set(key, memberships, MEMBERSHIP_CACHE_TIMEOUT)
+        user._memberships = memberships
+    return memberships
+
+def normalize_org_id(org_id):
+    try:
+        return int(org_id)
+    except (TypeError, ValueError):
+        return None
+
+def organization_ids(user):
+    return list(get_memberships(user))
+
+def get_role(user, org_id):
+    """Role of the user in the organization, None when not a member."""
+    return get_memberships(user).get(normalize_org_id(org_id))
+
+def is_member(user, org_id):
+    return get_role(user, org_id) is not None
+
+def admin_organization_ids(user):
+    return [org_id for org_id, role in get_memberships(user).items() if role == 'admin']
+
+def admin_organization_id(user):
+    """First organization the user administers, None when there is none."""
+    for org_id, role in get_memberships(user).items():
+        if role == 'admin':
+            return org_id
+    return None
+
+def invalidate_memberships(user_id):
+    transaction.on_commit(lambda: cache.delete(membership_key(user_id)))
@@ -0,0 +1,54 @@
+import ipaddress
+import time
+from .models import APIUsageLog
+from .usage import usage_log_writer
+
+def client_ip(request):
+    """
+    The first X-Forwarded-For address, or REMOTE_ADDR when that header is
+    missing or does not hold a valid IP address.
+    """
+    for value in (request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0], request.META.get('REMOTE_ADDR')):
+        try:
+            return str(ipaddress.ip_address((value or '').strip()))
+        except ValueError:
+            continue
+    return '0.0.0.0'
+
+class APIUsageLogMiddleware:
+    """
+    Time API key requests and hand an APIUsageLog row to the background
+    writer, so the request itself never waits on the INSERT.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.monotonic()
+        response = self.get_response(request)
+        api_key = getattr(request, 'api_key', None)
+        if api_key is not None:
+            usage_log_writer.push(APIUsageLog(
+                api_key_id=api_key.key_id,
+                endpoint=request.path[:255],
+                method=request.method,
+                status_code=response.status_code,
+                response_time_ms=int((time.monotonic() - started) * 1000),
+                ip_address=client_ip(request),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            ))
+        return response
+
+class RateLimitHeadersMiddleware:
+    """Expose the API key rate limit state of a request as X-RateLimit-* headers."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            response['X-RateLimit-Limit'] = str(rate_limit['limit'])
+            response['X-RateLimit-Remaining'] = str(rate_limit['remaining'])
+            response['X-RateLimit-Reset'] = str(rate_limit['reset'])
+        return response
@@ -0,0 +1,73 @@
+from django.db import migrations, models
+
+
+PARTITION_API_USAGE_LOGS = """
+ALTER TABLE "api_usage_logs" RENAME TO "api_usage_logs_old";
+CREATE TABLE "api_usage_logs" (
+    "log_id" bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+    "endpoint" varchar(255) NOT NULL,
+    "method" varchar(10) NOT NULL,
+    "status_code" integer NOT NULL,
+    "response_time_ms" integer NOT NULL,
+    "timestamp" timestamp with time zone NOT NULL,
+    "ip_address" inet NOT NULL,
+    "user_agent" text NOT NULL,
+    "api_key_id" varchar(32) NOT NULL,
+    PRIMARY KEY ("log_id", "timestamp")
+) PARTITION BY RANGE ("timestamp");
+CREATE TABLE "api_usage_logs_default" PARTITION OF "api_usage_logs" DEFAULT;
+INSERT INTO "api_usage_logs" SELECT
+    "log_id", "endpoint", "method", "status_code", "response_time_ms",
+    "timestamp", "ip_address", "user_agent", "api_key_id"
+FROM "api_usage_logs_old";
+SELECT setval(pg_get_serial_sequence('"api_usage_logs"', 'log_id'), COALESCE(MAX("log_id"), 0) + 1, false)
+FROM "api_usage_logs";
+DROP TABLE "api_usage_logs_old";
+ALTER TABLE "api_usage_logs" ADD CONSTRAINT "api_usage_logs_api_key_id_5f9df05d_fk_api_keys_key_id"
+    FOREIGN KEY ("api_key_id") REFERENCES "api_keys" ("key_id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "api_usage_logs_timestamp_f04ad580" ON "api_usage_logs" ("timestamp");
+CREATE INDEX "api_usage_logs_api_key_id_5f9df05d" ON "api_usage_logs" ("api_key_id");
+CREATE INDEX "api_usage_logs_api_key_id_5f9df05d_like" ON "api_usage_logs" ("api_key_id" varchar_pattern_ops);
+"""
+
+UNPARTITION_API_USAGE_LOGS = """
+ALTER TABLE "api_usage_logs" RENAME TO "api_usage_logs_partitioned";
+CREATE TABLE "api_usage_logs" (
+    "log_id" bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+    "endpoint" varchar(255) NOT NULL,
+    "method" varchar(10) NOT NULL,
+    "status_code" integer NOT NULL,
+    "response_time_ms" integer NOT NULL,
+    "timestamp" timestamp with time zone NOT NULL,
+    "ip_address" inet NOT NULL,
+    "user_agent" text NOT NULL,
+    "api_key_id" varchar(32) NOT NULL
+);
+INSERT INTO "api_usage_logs" SELECT
+    "log_id", "endpoint", "method", "status_code", "response_time_ms",
+    "timestamp", "ip_address", "user_agent", "api_key_id"
+FROM "api_usage_logs_partitioned";
+SELECT setval(pg_get_serial_sequence('"api_usage_logs"', 'log_id'), COALESCE(MAX("log_id"), 0) + 1, false)
+FROM "api_usage_logs";
+DROP TABLE "api_usage_logs_partitioned" CASCADE;
+ALTER TABLE "api_usage_logs" ADD CONSTRAINT "api_usage_logs_api_key_id_5f9df05d_fk_api_keys_key_id"
+    FOREIGN KEY ("api_key_id") REFERENCES "api_keys" ("key_id") DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX "api_usage_logs_timestamp_f04ad580" ON "api_usage_logs" ("timestamp");
+CREATE INDEX "api_usage_logs_api_key_id_5f9df05d" ON "api_usage_logs" ("api_key_id");
+CREATE INDEX "api_usage_logs_api_key_id_5f9df05d_like" ON "api_usage_logs" ("api_key_id" varchar_pattern_ops);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_webhookdelivery_next_attempt_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_API_USAGE_LOGS, UNPARTITION_API_USAGE_LOGS),
+        migrations.AddIndex(
+            model_name='apiusagelog',
+            index=models.Index(fields=['api_key', '-timestamp'], name='api_usage_key_time_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_partition_api_usage_logs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='webhookdelivery',
+            index=models.Index(fields=['webhook', '-created_at'], name='webhook_delivery_history_idx'),
+        ),
+    ]
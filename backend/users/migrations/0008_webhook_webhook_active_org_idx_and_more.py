@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:06
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_webhookdelivery_webhook_delivery_history_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='webhook',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['organization'], name='webhook_active_org_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhook',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['events'], name='webhook_events_gin_idx'),
+        ),
+    ]
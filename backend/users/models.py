@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 import secrets
@@ -266,6 +267,9 @@ class APIUsageLog(models.Model):
     class Meta:
         db_table = 'api_usage_logs'
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['api_key', '-timestamp'], name='api_usage_key_time_idx'),
+        ]
 
 class Webhook(models.Model):
     EVENT_CHOICES = [
@@ -291,6 +295,10 @@ class Webhook(models.Model):
     class Meta:
         db_table = 'webhooks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization'], condition=models.Q(is_active=True), name='webhook_active_org_idx'),
+            GinIndex(fields=['events'], name='webhook_events_gin_idx'),
+        ]
     
     def __str__(self):
         return f"Webhook to {self.url}"
@@ -320,7 +328,12 @@ class WebhookDelivery(models.Model):
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
     retry_count = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         db_table = 'webhook_deliveries'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='webhook_delivery_due_idx'),
+            models.Index(fields=['webhook', '-created_at'], name='webhook_delivery_history_idx'),
+        ]
\ No newline at end of file
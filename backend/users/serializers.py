@@ -195,7 +195,8 @@ class WebhookDeliverySerializer(serializers.ModelSerializer):
     class Meta:
         model = WebhookDelivery
         fields = ['delivery_id', 'event_type', 'status', 'status_code', 
-                 'created_at', 'delivered_at', 'retry_count', 'error_message']
+                 'created_at', 'delivered_at', 'retry_count', 'next_attempt_at',
+                 'error_message']
         
 class SubscriptionPlanSerializer(serializers.Serializer):
     plan_name = serializers.CharField()
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_api_key
+from .membership import invalidate_memberships
+from .models import APIKey, UserOrganization
+
+@receiver([post_save, post_delete], sender=UserOrganization)
+def membership_changed(sender, instance, **kwargs):
+    """Drop the cached membership map of the user when a membership changes"""
+    invalidate_memberships(instance.user_id)
+
+@receiver([post_save, post_delete], sender=APIKey)
+def api_key_changed(sender, instance, **kwargs):
+    """Drop the cached key when it is updated, deactivated or revoked"""
+    key_hash = instance.key_hash
+    transaction.on_commit(lambda: invalidate_api_key(key_hash))
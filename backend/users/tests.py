@@ -1,3 +1,113 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from .authentication import APIKeyAuthentication
+from .middleware import client_ip
+from .models import APIKey, APIUsageLog, Organization, User, UserOrganization
+from .usage import UsageLogWriter
 
-# Create your tests here.
+def create_organization(name='org'):
+    user = User.objects.create_user(
+        email=f'{name}@example.com', username=name, password='password', first_name='Test', last_name='User'
+    )
+    organization = Organization.objects.create(name=name, owner_user=user)
+    UserOrganization.objects.create(user=user, organization=organization, role='admin')
+    return user, organization
+
+def create_api_key(organization, **kwargs):
+    raw_key, key_hash, key_prefix, key_id = APIKey.generate_key()
+    api_key = APIKey.objects.create(
+        key_id=key_id, key_hash=key_hash, key_prefix=key_prefix, name='key',
+        organization=organization, created_by=organization.owner_user, **kwargs
+    )
+    return raw_key, api_key
+
+class APIKeyAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, organization = create_organization()
+        self.raw_key, self.api_key = create_api_key(organization)
+
+    def authenticate(self, raw_key=None):
+        request = Request(RequestFactory().get('/', HTTP_AUTHORIZATION=f'ApiKey {raw_key or self.raw_key}'))
+        return APIKeyAuthentication().authenticate(request)
+
+    def test_cached_key_authenticates_without_queries(self):
+        self.assertEqual(self.authenticate(), (self.user, None))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(), (self.user, None))
+
+    def test_last_used_at_is_written_once_per_interval(self):
+        self.authenticate()
+        first_use = APIKey.objects.get(pk=self.api_key.pk).last_used_at
+        self.authenticate()
+
+        self.assertIsNotNone(first_use)
+        self.assertEqual(APIKey.objects.get(pk=self.api_key.pk).last_used_at, first_use)
+
+    def test_deactivated_key_is_rejected_once_committed(self):
+        self.authenticate()
+        self.api_key.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key.save()
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid API key'):
+            self.authenticate()
+
+    def test_deleted_key_is_rejected_once_committed(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key.delete()
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid API key'):
+            self.authenticate()
+
+    def test_expiry_set_on_a_cached_key_applies(self):
+        self.authenticate()
+        self.api_key.expires_at = timezone.now() - timedelta(seconds=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key.save()
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'API key expired'):
+            self.authenticate()
+
+    def test_unknown_key_is_rejected(self):
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid API key'):
+            self.authenticate('unknown')
+
+class ClientIPTests(TestCase):
+    def test_forwarded_address_is_used_when_valid(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='203.0.113.7, 10.0.0.1', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+
+    def test_invalid_forwarded_address_falls_back_to_remote_addr(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='foo', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '10.0.0.1')
+
+    def test_no_valid_address(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='')
+        self.assertEqual(client_ip(request), '0.0.0.0')
+
+class UsageLogWriterTests(TransactionTestCase):
+    def test_bad_row_does_not_drop_the_batch(self):
+        cache.clear()
+        _, organization = create_organization()
+        _, api_key = create_api_key(organization)
+        rows = [
+            APIUsageLog(
+                api_key_id=api_key.key_id, endpoint=f'/api/v1/surveys/{i}/', method='GET', status_code=200,
+                response_time_ms=1, timestamp=timezone.now(), ip_address=ip, user_agent=''
+            )
+            for i, ip in enumerate(['10.0.0.1', 'foo', '10.0.0.2'])
+        ]
+
+        with self.assertLogs('users.usage', level='WARNING'):
+            UsageLogWriter().flush(rows)
+
+        self.assertEqual(
+            sorted(APIUsageLog.objects.values_list('ip_address', flat=True)), ['10.0.0.1', '10.0.0.2']
+        )
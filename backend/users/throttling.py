@@ -0,0 +1,116 @@
+import logging
+import math
+import threading
+import time
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PERIOD = 60 * 60
+
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+if new_tat - period > now then
+    return {0, tat}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, new_tat}
+"""
+
+class LocalRateLimitStore:
+    """In-process GCRA state, for single node deployments and development."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tats = {}
+
+    def update(self, key, interval, period, now):
+        with self.lock:
+            tat = max(self.tats.get(key, now), now)
+            new_tat = tat + interval
+            if new_tat - period > now:
+                return False, tat
+            self.tats[key] = new_tat
+            return True, new_tat
+
+class RedisRateLimitStore:
+    """
+    GCRA state in Redis, updated atomically by a Lua script. While Redis
+    cannot be reached each process limits requests on its own with a
+    LocalRateLimitStore, so an outage does not fail every API request.
+    """
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(GCRA_SCRIPT)
+        self.redis_error = redis.RedisError
+        self.fallback = LocalRateLimitStore()
+        self.available = True
+
+    def update(self, key, interval, period, now):
+        try:
+            allowed, tat = self.script(keys=[key], args=[now, interval, period])
+        except self.redis_error as e:
+            if self.available:
+                logger.warning(f"Redis rate limit store unavailable, limiting per process: {e}")
+                self.available = False
+            return self.fallback.update(key, interval, period, now)
+        if not self.available:
+            logger.warning("Redis rate limit store available again")
+            self.available = True
+        return bool(allowed), int(tat)
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        redis_url = getattr(settings, 'REDIS_URL', None)
+        _store = RedisRateLimitStore(redis_url) if redis_url else LocalRateLimitStore()
+    return _store
+
+def check_rate_limit(key, limit, period=RATE_LIMIT_PERIOD):
+    """
+    Generic cell rate algorithm: requests are spaced period / limit apart,
+    with bursts of up to limit requests. Times are kept in integer
+    milliseconds. Returns a dict with allowed, limit, remaining, reset
+    (seconds until fully replenished) and retry_after (seconds until the
+    next request is allowed).
+    """
+    limit = max(limit, 1)
+    period_ms = period * 1000
+    interval = max(period_ms // limit, 1)
+    now = time.time_ns() // 1_000_000
+    allowed, tat = get_store().update(f"ratelimit:{key}", interval, period_ms, now)
+    ahead = max(tat - now, 0)
+    return {
+        'allowed': allowed,
+        'limit': limit,
+        'remaining': (period_ms - ahead) // interval if allowed else 0,
+        'reset': math.ceil(ahead / 1000),
+        'retry_after': 0 if allowed else math.ceil((ahead + interval - period_ms) / 1000),
+    }
+
+class APIKeyRateThrottle(BaseThrottle):
+    """
+    Enforce APIKey.rate_limit (requests per hour) on requests authenticated
+    with an API key. The result is kept on the request for
+    RateLimitHeadersMiddleware. Other requests are not throttled.
+    """
+    def allow_request(self, request, view):
+        api_key = getattr(request, 'api_key', None)
+        if api_key is None:
+            return True
+        self.result = check_rate_limit(f"apikey:{api_key.key_id}", api_key.rate_limit)
+        request._request.rate_limit = self.result
+        return self.result['allowed']
+
+    def wait(self):
+        return self.result['retry_after']
@@ -0,0 +1,181 @@
+import atexit
+import logging
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import close_old_connections, connection, transaction
+from .models import APIUsageLog
+
+logger = logging.getLogger(__name__)
+
+USAGE_LOG_BATCH_SIZE = 500
+USAGE_LOG_FLUSH_INTERVAL = 1.0
+USAGE_LOG_QUEUE_SIZE = 10000
+USAGE_LOG_RETENTION_DAYS = 90
+USAGE_LOG_PARTITIONS_AHEAD = 2
+USAGE_LOG_TABLE = APIUsageLog._meta.db_table
+USAGE_LOG_DEFAULT_PARTITION = f"{USAGE_LOG_TABLE}_default"
+PARTITION_NAME_PATTERN = re.compile(rf'^{USAGE_LOG_TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+class UsageLogWriter:
+    """
+    Buffers APIUsageLog rows in memory and writes them from a background
+    thread with bulk_create, every batch_size rows or flush_interval
+    seconds, whichever comes first. Requests never wait on the INSERT.
+    When the queue is full, new rows are dropped instead of blocking.
+    """
+    def __init__(self, batch_size=USAGE_LOG_BATCH_SIZE, flush_interval=USAGE_LOG_FLUSH_INTERVAL,
+                 max_queue=USAGE_LOG_QUEUE_SIZE):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.dropped = 0
+
+    def push(self, record):
+        self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='usage-log-writer', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            if batch:
+                self.flush(batch)
+
+    def collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def drain(self):
+        """Write whatever is still queued, from the calling thread."""
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(batch), self.batch_size):
+            self.flush(batch[start:start + self.batch_size])
+
+    def flush(self, batch):
+        """
+        Write a batch with one INSERT. If that fails, write the rows one by
+        one so a single bad row only loses itself.
+        """
+        close_old_connections()
+        try:
+            APIUsageLog.objects.bulk_create(batch)
+            return
+        except Exception:
+            logger.warning(f"Failed to write {len(batch)} API usage logs at once, retrying one by one")
+        for record in batch:
+            try:
+                APIUsageLog.objects.bulk_create([record])
+            except Exception:
+                logger.exception(f"Failed to write API usage log for {record.endpoint}")
+
+usage_log_writer = UsageLogWriter()
+atexit.register(usage_log_writer.drain)
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+def next_month(value):
+    return month_start(value + timedelta(days=32))
+
+def partition_name(start):
+    return f"{USAGE_LOG_TABLE}_p{start:%Y_%m}"
+
+def list_partitions():
+    """Monthly partitions of the usage log table as {name: month start}."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [USAGE_LOG_TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME_PATTERN.match(name)
+        if match:
+            partitions[name] = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+    return partitions
+
+def create_partition(start):
+    """
+    Create the partition of one month. Rows of that month that already
+    landed in the default partition are moved into it first.
+    """
+    name = partition_name(start)
+    end = next_month(start)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{USAGE_LOG_TABLE}" INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{USAGE_LOG_DEFAULT_PARTITION}" '
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end]
+        )
+        cursor.execute(
+            f'ALTER TABLE "{USAGE_LOG_TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+    return name
+
+def ensure_partitions(now, months_ahead=USAGE_LOG_PARTITIONS_AHEAD):
+    existing = list_partitions()
+    created = []
+    start = month_start(now)
+    for _ in range(months_ahead + 1):
+        if partition_name(start) not in existing:
+            created.append(create_partition(start))
+        start = next_month(start)
+    return created
+
+def drop_expired_partitions(now, retention_days=USAGE_LOG_RETENTION_DAYS):
+    """
+    Drop the monthly partitions that end before the retention cutoff and
+    delete expired rows from the default partition. Returns the names of
+    the dropped partitions.
+    """
+    cutoff = now - timedelta(days=retention_days)
+    dropped = []
+    for name, start in sorted(list_partitions().items(), key=lambda item: item[1]):
+        if next_month(start) > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{USAGE_LOG_TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+        dropped.append(name)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM "{USAGE_LOG_DEFAULT_PARTITION}" WHERE "timestamp" < %s',
+            [cutoff]
+        )
+    return dropped
@@ -12,7 +12,9 @@ from datetime import timedelta
 from django.db import transaction
 from django.db.models import Q
 from surveys.models import Survey
+from project_insight.pagination import paginated_response_data
 from .models import User, Organization, UserOrganization, OrganizationInvitation, APIKey, Webhook, WebhookDelivery
+from .membership import admin_organization_id, admin_organization_ids, get_role, organization_ids
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     PasswordChangeSerializer, PasswordResetRequestSerializer, PasswordResetSerializer,
@@ -261,9 +263,7 @@ class OrganizationListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user_org_ids = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
+        user_org_ids = organization_ids(self.request.user)
 
         return Organization.objects.filter(org_id__in=user_org_ids)
     
@@ -281,20 +281,15 @@ class OrganizationDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'org_id'
 
     def get_queryset(self):
-        user_org_ids = UserOrganization.objects.filter(
-            user=self.request.user
-        ).values_list('organization_id', flat=True)
+        user_org_ids = organization_ids(self.request.user)
         
         return Organization.objects.filter(org_id__in=user_org_ids)
     
     def perform_update(self, serializer):
         organization = self.get_object()
-        user_org = UserOrganization.objects.get(
-            user=self.request.user,
-            organization=organization
-        )
+        role = get_role(self.request.user, organization.org_id)
 
-        if user_org.role not in ['admin'] and organization.owner_user != self.request.user:
+        if role not in ['admin'] and organization.owner_user_id != self.request.user.pk:
             raise permissions.PermissionDenied("Hanya admin organisasi yang dapat memperbarui organisasi.")
         serializer.save()
 
@@ -575,10 +570,7 @@ class APIKeyListView(generics.ListCreateAPIView):
         return APIKeySerializer
     
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user,
-            role='admin'
-        ).values_list('organization_id', flat=True)
+        user_orgs = admin_organization_ids(self.request.user)
         
         return APIKey.objects.filter(organization_id__in=user_orgs)
     
@@ -586,12 +578,9 @@ class APIKeyListView(generics.ListCreateAPIView):
         serializer = APIKeyCreateSerializer(data=request.data)
         
         if serializer.is_valid():
-            user_org = UserOrganization.objects.filter(
-                user=request.user,
-                role='admin'
-            ).first()
+            org_id = admin_organization_id(request.user)
             
-            if not user_org:
+            if org_id is None:
                 return APIResponse({
                     'success': False,
                     'message': 'Harus menjadi admin organisasi'
@@ -601,7 +590,7 @@ class APIKeyListView(generics.ListCreateAPIView):
             
             api_key = APIKey.objects.create(
                 key_id=key_id,
-                organization=user_org.organization,
+                organization_id=org_id,
                 name=serializer.validated_data['name'],
                 key_hash=key_hash,
                 key_prefix=key_prefix,
@@ -632,10 +621,7 @@ class APIKeyListView(generics.ListCreateAPIView):
 @permission_classes([IsAuthenticated])
 def revoke_api_key(request, key_id):
     """Revoke API key"""
-    user_orgs = UserOrganization.objects.filter(
-        user=request.user,
-        role='admin'
-    ).values_list('organization_id', flat=True)
+    user_orgs = admin_organization_ids(request.user)
     
     api_key = get_object_or_404(
         APIKey,
@@ -656,21 +642,13 @@ class WebhookListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user,
-            role='admin'
-        ).values_list('organization_id', flat=True)
+        user_orgs = admin_organization_ids(self.request.user)
         
         return Webhook.objects.filter(organization_id__in=user_orgs)
     
     def perform_create(self, serializer):
-        user_org = UserOrganization.objects.filter(
-            user=self.request.user,
-            role='admin'
-        ).first()
-        
         serializer.save(
-            organization=user_org.organization,
+            organization_id=admin_organization_id(self.request.user),
             created_by=self.request.user
         )
 
@@ -681,10 +659,7 @@ class WebhookDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'webhook_id'
     
     def get_queryset(self):
-        user_orgs = UserOrganization.objects.filter(
-            user=self.request.user,
-            role='admin'
-        ).values_list('organization_id', flat=True)
+        user_orgs = admin_organization_ids(self.request.user)
         
         return Webhook.objects.filter(organization_id__in=user_orgs)
 
@@ -694,16 +669,12 @@ def webhook_deliveries(request, webhook_id):
     """Get webhook delivery history"""
     webhook = get_object_or_404(Webhook, webhook_id=webhook_id)
     
-    deliveries = WebhookDelivery.objects.filter(
-        webhook=webhook
-    ).order_by('-created_at')[:50]
+    deliveries = WebhookDelivery.objects.filter(webhook=webhook)
     
-    serializer = WebhookDeliverySerializer(deliveries, many=True)
-    
-    return APIResponse({
-        'success': True,
-        'data': serializer.data
-    }, status=status.HTTP_200_OK)
+    return APIResponse(
+        paginated_response_data(request, deliveries, WebhookDeliverySerializer),
+        status=status.HTTP_200_OK
+    )
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
@@ -2,134 +2,172 @@ import requests
 import hmac
 import hashlib
 import json
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
 from .models import Webhook, WebhookDelivery
 import logging
 
 logger = logging.getLogger(__name__)
 
+DISPATCH_BATCH_SIZE = 100
+DISPATCH_WORKERS = 10
+DELIVERY_TIMEOUT = 10
+DELIVERY_LEASE = timedelta(minutes=5)
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 30
+MAX_CONSECUTIVE_FAILURES = 10
+
 def send_webhook(organization, event_type, payload):
     """
-    Send webhook to all active webhooks that listen to this event
+    Queue a delivery for every active webhook that listens to this event.
+    The request only pays for a single bulk insert into the outbox; the
+    dispatch_webhooks worker does the HTTP calls.
     """
-    webhooks = Webhook.objects.filter(
+    webhook_ids = Webhook.objects.filter(
         organization=organization,
         is_active=True,
         events__contains=[event_type]
-    )
-    
-    for webhook in webhooks:
-        # Send synchronously for now (can be made async with Celery later)
-        try:
-            send_single_webhook(webhook.webhook_id, event_type, payload)
-        except Exception as e:
-            logger.error(f"Failed to send webhook {webhook.webhook_id}: {e}")
-
-def send_single_webhook(webhook_id, event_type, payload):
+    ).values_list('webhook_id', flat=True)
+
+    return WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(
+            webhook_id=webhook_id,
+            event_type=event_type,
+            payload=payload,
+            status='pending'
+        )
+        for webhook_id in webhook_ids
+    ])
+
+def claim_due_deliveries(limit=DISPATCH_BATCH_SIZE):
     """
-    Send single webhook delivery
+    Lease a batch of due pending deliveries. Leased rows get their
+    next_attempt_at pushed forward, so other workers skip them, and a
+    worker that dies mid-batch only delays them until the lease expires.
     """
+    now = timezone.now()
+    with transaction.atomic():
+        deliveries = list(
+            WebhookDelivery.objects.select_for_update(
+                skip_locked=True, of=('self',)
+            ).filter(
+                status='pending',
+                next_attempt_at__lte=now
+            ).select_related('webhook').order_by('next_attempt_at')[:limit]
+        )
+        WebhookDelivery.objects.filter(
+            delivery_id__in=[delivery.delivery_id for delivery in deliveries]
+        ).update(next_attempt_at=now + DELIVERY_LEASE)
+    return deliveries
+
+def build_session(pool_size=DISPATCH_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'ProjectInsight-Webhook/1.0'
+    return session
+
+def post_delivery(session, delivery):
+    """
+    Perform the HTTP call for one delivery. Runs in a worker thread, so it
+    only returns the outcome and leaves all database writes to the caller.
+    """
+    webhook = delivery.webhook
+    webhook_payload = {
+        'event': delivery.event_type,
+        'timestamp': delivery.created_at.isoformat(),
+        'data': delivery.payload
+    }
+    body = json.dumps(webhook_payload)
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Insight-Signature': generate_signature(webhook.secret, body),
+        'X-Insight-Event': delivery.event_type,
+    }
+
     try:
-        webhook = Webhook.objects.get(webhook_id=webhook_id)
-    except Webhook.DoesNotExist:
-        logger.error(f"Webhook {webhook_id} not found")
-        return
-    
-    # Create delivery record
-    delivery = WebhookDelivery.objects.create(
-        webhook=webhook,
-        event_type=event_type,
-        payload=payload,
-        status='pending'
-    )
-    
-    try:
-        # Prepare payload
-        webhook_payload = {
-            'event': event_type,
-            'timestamp': timezone.now().isoformat(),
-            'data': payload
+        response = session.post(webhook.url, data=body, headers=headers, timeout=DELIVERY_TIMEOUT)
+        return {
+            'success': response.status_code < 400,
+            'status_code': response.status_code,
+            'response_body': response.text[:1000],
+            'error': f"HTTP {response.status_code}: {response.text[:200]}"
         }
-        
-        # Generate signature
-        signature = generate_signature(webhook.secret, json.dumps(webhook_payload))
-        
-        # Send request
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Insight-Signature': signature,
-            'X-Insight-Event': event_type,
-            'User-Agent': 'ProjectInsight-Webhook/1.0'
-        }
-        
-        response = requests.post(
-            webhook.url,
-            json=webhook_payload,
-            headers=headers,
-            timeout=10
-        )
-        
-        # Update delivery record
-        delivery.status = 'success' if response.status_code < 400 else 'failed'
-        delivery.status_code = response.status_code
-        delivery.response_body = response.text[:1000]  # Limit to 1000 chars
-        delivery.delivered_at = timezone.now()
-        delivery.save()
-        
-        # Update webhook
-        webhook.last_triggered_at = timezone.now()
-        
-        if delivery.status == 'failed':
-            webhook.failure_count += 1
-            webhook.last_failure_at = timezone.now()
-            webhook.last_failure_reason = f"HTTP {response.status_code}: {response.text[:200]}"
-        else:
-            # Reset failure count on success
-            webhook.failure_count = 0
-            webhook.last_failure_reason = ''
-        
-        webhook.save()
-        
-        logger.info(f"Webhook {webhook_id} delivered: {delivery.status}")
-        
-        # Auto-disable webhook after 10 consecutive failures
-        if webhook.failure_count >= 10:
-            webhook.is_active = False
-            webhook.save()
-            logger.warning(f"Webhook {webhook_id} auto-disabled after 10 failures")
-        
-        return delivery
-        
     except requests.exceptions.Timeout:
-        delivery.status = 'failed'
-        delivery.error_message = 'Request timeout'
-        delivery.save()
-        
-        webhook.failure_count += 1
-        webhook.last_failure_at = timezone.now()
-        webhook.last_failure_reason = 'Request timeout'
-        webhook.save()
-        
-        logger.error(f"Webhook {webhook_id} timeout")
-        
+        return {'success': False, 'error': 'Request timeout'}
     except requests.exceptions.RequestException as e:
-        delivery.status = 'failed'
-        delivery.error_message = str(e)
-        delivery.save()
-        
-        webhook.failure_count += 1
-        webhook.last_failure_at = timezone.now()
-        webhook.last_failure_reason = str(e)[:200]
-        webhook.save()
-        
-        logger.error(f"Webhook {webhook_id} error: {e}")
-    
+        return {'success': False, 'error': str(e)}
     except Exception as e:
-        delivery.status = 'failed'
-        delivery.error_message = f"Unexpected error: {str(e)}"
-        delivery.save()
-        
-        logger.error(f"Webhook {webhook_id} unexpected error: {e}")
+        return {'success': False, 'error': f"Unexpected error: {str(e)}"}
+
+def record_delivery_result(delivery, result):
+    now = timezone.now()
+    webhook_id = delivery.webhook_id
+
+    if result['success']:
+        delivery.status = 'success'
+        delivery.delivered_at = now
+        delivery.error_message = ''
+        Webhook.objects.filter(webhook_id=webhook_id).update(
+            last_triggered_at=now,
+            failure_count=0,
+            last_failure_reason=''
+        )
+    else:
+        delivery.retry_count += 1
+        delivery.error_message = result['error']
+        if delivery.retry_count >= MAX_RETRIES:
+            delivery.status = 'failed'
+        else:
+            delay = RETRY_BASE_DELAY * (2 ** (delivery.retry_count - 1))
+            delivery.next_attempt_at = now + timedelta(seconds=delay)
+
+        Webhook.objects.filter(webhook_id=webhook_id).update(
+            last_triggered_at=now,
+            failure_count=F('failure_count') + 1,
+            last_failure_at=now,
+            last_failure_reason=result['error'][:200]
+        )
+        disabled = Webhook.objects.filter(
+            webhook_id=webhook_id,
+            is_active=True,
+            failure_count__gte=MAX_CONSECUTIVE_FAILURES
+        ).update(is_active=False)
+        if disabled:
+            logger.warning(f"Webhook {webhook_id} auto-disabled after {MAX_CONSECUTIVE_FAILURES} failures")
+
+    if 'status_code' in result:
+        delivery.status_code = result['status_code']
+        delivery.response_body = result['response_body']
+    delivery.save(update_fields=[
+        'status', 'status_code', 'response_body', 'error_message',
+        'delivered_at', 'retry_count', 'next_attempt_at'
+    ])
+    logger.info(f"Webhook {webhook_id} delivery {delivery.delivery_id}: {delivery.status}")
+
+def dispatch_webhooks(session, executor, limit=DISPATCH_BATCH_SIZE):
+    """
+    Deliver one batch of due webhooks concurrently and record the results.
+    Returns the number of deliveries attempted.
+    """
+    deliveries = claim_due_deliveries(limit)
+    active = []
+    for delivery in deliveries:
+        if delivery.webhook.is_active:
+            active.append(delivery)
+        else:
+            delivery.status = 'failed'
+            delivery.error_message = 'Webhook is inactive'
+            delivery.save(update_fields=['status', 'error_message'])
+
+    results = executor.map(lambda delivery: post_delivery(session, delivery), active)
+    for delivery, result in zip(active, results):
+        record_delivery_result(delivery, result)
+    return len(deliveries)
 
 def generate_signature(secret, payload):
     """
@@ -140,7 +178,7 @@ def generate_signature(secret, payload):
         payload.encode('utf-8'),
         hashlib.sha256
     ).hexdigest()
-    
+
     return f"sha256={signature}"
 
 def verify_signature(secret, payload, signature):
@@ -148,4 +186,4 @@ def verify_signature(secret, payload, signature):
     Verify webhook signature
     """
     expected = generate_signature(secret, payload)
-    return hmac.compare_digest(expected, signature)
\ No newline at end of file
+    return hmac.compare_digest(expected, signature)
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import toast, { Toaster } from "react-hot-toast";
 
@@ -400,6 +400,10 @@ export default function SurveyListPage() {
   const [filterStatus, setFilterStatus] = useState<string>("all");
   const [filterOrg, setFilterOrg] = useState<string>("all");
   const [searchQuery, setSearchQuery] = useState<string>("");
+  const [debouncedSearch, setDebouncedSearch] = useState<string>("");
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const latestRequest = useRef(0);
   const [isCreateModalOpen, setIsCreateModalOpen] = useState(false);
   const navigate = useNavigate();
 
@@ -431,8 +435,10 @@ export default function SurveyListPage() {
       const params = new URLSearchParams();
       if (filterStatus !== "all") params.append("status", filterStatus);
       if (filterOrg !== "all") params.append("organization", filterOrg);
-      if (searchQuery.trim()) params.append("search", searchQuery);
+      if (debouncedSearch) params.append("search", debouncedSearch);
 
+      // Only the first page is loaded here; further pages load on demand
+      const requestId = ++latestRequest.current;
       const response = await fetch(`${API_BASE_URL}/surveys/?${params.toString()}`, {
         headers: {
           Authorization: `Bearer ${getAuthToken()}`,
@@ -445,7 +451,15 @@ export default function SurveyListPage() {
       }
 
       const data = await response.json();
-      setSurveys(Array.isArray(data) ? data : data.data || []);
+      // Ignore responses to filters the user has already changed
+      if (requestId !== latestRequest.current) return;
+      if (Array.isArray(data)) {
+        setSurveys(data);
+        setNextUrl(null);
+      } else {
+        setSurveys(data.results || data.data || []);
+        setNextUrl(data.next || null);
+      }
     } catch (err) {
       const errorMessage = err instanceof Error ? err.message : "An error occurred";
       setError(errorMessage);
@@ -455,6 +469,30 @@ export default function SurveyListPage() {
     }
   };
 
+  const loadMoreSurveys = async () => {
+    if (!nextUrl) return;
+    const requestId = latestRequest.current;
+    try {
+      setIsLoadingMore(true);
+      const response = await fetch(nextUrl, {
+        headers: {
+          Authorization: `Bearer ${getAuthToken()}`,
+          "Content-Type": "application/json",
+        },
+      });
+      if (!response.ok) throw new Error("Failed to load more surveys");
+      const data = await response.json();
+      if (requestId !== latestRequest.current) return;
+      setSurveys((prev) => [...prev, ...(data.results || [])]);
+      setNextUrl(data.next || null);
+    } catch (err) {
+      const errorMessage = err instanceof Error ? err.message : "Failed to load more surveys";
+      toast.error(errorMessage);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (surveyId: string) => {
     if (!window.confirm("Are you sure you want to delete this survey? This action cannot be undone.")) return;
 
@@ -598,9 +636,14 @@ export default function SurveyListPage() {
     fetchOrganizations();
   }, []);
 
+  useEffect(() => {
+    const timeout = setTimeout(() => setDebouncedSearch(searchQuery.trim()), 300);
+    return () => clearTimeout(timeout);
+  }, [searchQuery]);
+
   useEffect(() => {
     fetchSurveys();
-  }, [filterStatus, filterOrg, searchQuery]);
+  }, [filterStatus, filterOrg, debouncedSearch]);
 
   if (isLoading && surveys.length === 0) {
     return (
@@ -633,7 +676,7 @@ export default function SurveyListPage() {
                   type="text"
                   value={searchQuery}
                   onChange={(e) => setSearchQuery(e.target.value)}
-                  placeholder="Search by title..."
+                  placeholder="Search by title or description..."
                   className="w-full px-4 py-2 border border-gray-300 rounded-lg dark:border-gray-700 dark:bg-gray-800 dark:text-white text-sm focus:outline-none focus:ring-2 focus:ring-blue-500"
                 />
               </div>
@@ -855,6 +898,18 @@ export default function SurveyListPage() {
           </div>
         )}
 
+        {nextUrl && (
+          <div className="flex justify-center">
+            <button
+              onClick={loadMoreSurveys}
+              disabled={isLoadingMore}
+              className="px-4 py-2 text-sm font-medium text-blue-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 dark:bg-gray-900 dark:border-gray-800 dark:text-blue-400 dark:hover:bg-gray-800"
+            >
+              {isLoadingMore ? "Loading..." : "Load more surveys"}
+            </button>
+          </div>
+        )}
+
         <CreateSurveyModal
           isOpen={isCreateModalOpen}
           onClose={() => setIsCreateModalOpen(false)}
@@ -34,6 +34,8 @@ export default function SurveyResponses() {
   const [survey, setSurvey] = useState<Survey | null>(null);
   const [responses, setResponses] = useState<Response[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [selectedResponse, setSelectedResponse] = useState<Response | null>(null);
 
   useEffect(() => {
@@ -70,7 +72,8 @@ export default function SurveyResponses() {
 
       if (responsesRes.ok) {
         const data = await responsesRes.json();
-        setResponses(Array.isArray(data) ? data : []);
+        setResponses(data.results || []);
+        setNextUrl(data.next || null);
       }
     } catch (err) {
       toast.error("Failed to load responses");
@@ -80,6 +83,29 @@ export default function SurveyResponses() {
     }
   };
 
+  // Responses are cursor-paginated; each click loads the page behind `next`
+  const loadMoreResponses = async () => {
+    if (!nextUrl) return;
+    try {
+      setIsLoadingMore(true);
+      const res = await fetch(nextUrl, {
+        headers: {
+          Authorization: `Bearer ${getAuthToken()}`,
+          "Content-Type": "application/json",
+        },
+      });
+      if (!res.ok) throw new Error("Failed to load more responses");
+      const data = await res.json();
+      setResponses((prev) => [...prev, ...(data.results || [])]);
+      setNextUrl(data.next || null);
+    } catch (err) {
+      toast.error("Failed to load more responses");
+      console.error(err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const formatDate = (dateString: string | null) => {
     if (!dateString) return "N/A";
     const date = new Date(dateString);
@@ -135,7 +161,8 @@ export default function SurveyResponses() {
               {survey?.title || "Survey"} - Responses
             </h1>
             <p className="text-sm text-gray-500 dark:text-gray-400 mt-1">
-              {responses.length} total responses
+              {responses.length}
+              {nextUrl ? "+" : ""} responses
             </p>
           </div>
         </div>
@@ -212,6 +239,15 @@ export default function SurveyResponses() {
                 </div>
               </div>
             ))}
+            {nextUrl && (
+              <button
+                onClick={loadMoreResponses}
+                disabled={isLoadingMore}
+                className="px-4 py-2 text-sm font-medium text-blue-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 dark:bg-gray-900 dark:border-gray-800 dark:text-blue-400 dark:hover:bg-gray-800"
+              >
+                {isLoadingMore ? "Loading..." : "Load more responses"}
+              </button>
+            )}
           </div>
         )}
 
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, type Dispatch, type SetStateAction } from "react";
 import { Search, Plus, Upload, Mail, Edit, Trash2, Users, X, CheckCircle, FileText } from "lucide-react";
 import axios from "axios";
 
@@ -73,6 +73,10 @@ const RespondentsPage = () => {
   const [editingList, setEditingList] = useState<ContactList | null>(null);
   const [selectedListDetails, setSelectedListDetails] = useState<ContactList | null>(null);
   const [listContacts, setListContacts] = useState<Contact[]>([]);
+  const [contactsNext, setContactsNext] = useState<string | null>(null);
+  const [invitationsNext, setInvitationsNext] = useState<string | null>(null);
+  const [listContactsNext, setListContactsNext] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [selectedContactsForList, setSelectedContactsForList] = useState<string[]>([]);
   const [targetListId, setTargetListId] = useState("");
   
@@ -138,9 +142,11 @@ const RespondentsPage = () => {
       });
       const data = response.data.results || response.data.data || response.data;
       setContacts(Array.isArray(data) ? data : []);
+      setContactsNext(response.data.next || null);
     } catch (error) {
       console.error("Error:", error);
       setContacts([]);
+      setContactsNext(null);
     } finally {
       setContactsLoading(false);
     }
@@ -174,9 +180,11 @@ const RespondentsPage = () => {
       });
       const data = response.data.results || response.data.data || response.data;
       setInvitations(Array.isArray(data) ? data : []);
+      setInvitationsNext(response.data.next || null);
     } catch (error) {
       console.error("Error:", error);
       setInvitations([]);
+      setInvitationsNext(null);
     } finally {
       setInvitationsLoading(false);
     }
@@ -382,9 +390,32 @@ const RespondentsPage = () => {
     setShowEditContactModal(true);
   };
 
+  // Contacts and invitations are cursor-paginated; each click loads the page behind `next`
+  const loadMore = async <T,>(
+    url: string,
+    setItems: Dispatch<SetStateAction<T[]>>,
+    setNext: (next: string | null) => void
+  ) => {
+    setIsLoadingMore(true);
+    try {
+      const token = localStorage.getItem("token");
+      const response = await axios.get(url, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setItems((prev) => [...prev, ...(response.data.results || [])]);
+      setNext(response.data.next || null);
+    } catch (error) {
+      console.error("Error:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const openListDetails = async (list: ContactList) => {
     setSelectedListDetails(list);
     setShowListDetailsModal(true);
+    setListContacts([]);
+    setListContactsNext(null);
     try {
       const token = localStorage.getItem("token");
       const response = await axios.get(`${API_BASE_URL}/respondents/contacts/`, {
@@ -393,6 +424,7 @@ const RespondentsPage = () => {
       });
       const data = response.data.results || response.data;
       setListContacts(Array.isArray(data) ? data : []);
+      setListContactsNext(response.data.next || null);
     } catch (error) {
       console.error("Error:", error);
     }
@@ -679,6 +711,17 @@ const RespondentsPage = () => {
                   </tbody>
                 </table>
               </div>
+              {contactsNext && (
+                <div className="flex justify-center p-4 border-t border-gray-200 dark:border-gray-800">
+                  <button
+                    onClick={() => loadMore(contactsNext, setContacts, setContactsNext)}
+                    disabled={isLoadingMore}
+                    className="px-4 py-2 text-sm font-medium text-blue-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 dark:bg-gray-900 dark:border-gray-800 dark:text-blue-400 dark:hover:bg-gray-800"
+                  >
+                    {isLoadingMore ? "Loading..." : "Load more contacts"}
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         )}
@@ -786,6 +829,17 @@ const RespondentsPage = () => {
                   )}
                 </tbody>
               </table>
+              {invitationsNext && (
+                <div className="flex justify-center p-4 border-t border-gray-200 dark:border-gray-800">
+                  <button
+                    onClick={() => loadMore(invitationsNext, setInvitations, setInvitationsNext)}
+                    disabled={isLoadingMore}
+                    className="px-4 py-2 text-sm font-medium text-blue-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 dark:bg-gray-900 dark:border-gray-800 dark:text-blue-400 dark:hover:bg-gray-800"
+                  >
+                    {isLoadingMore ? "Loading..." : "Load more invitations"}
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         )}
@@ -1081,7 +1135,7 @@ const RespondentsPage = () => {
                 </button>
               </div>
               <div className="p-6">
-                <h3 className="text-sm font-medium text-gray-700 dark:text-gray-400 mb-4">Contacts ({listContacts.length})</h3>
+                <h3 className="text-sm font-medium text-gray-700 dark:text-gray-400 mb-4">Contacts ({listContacts.length}{listContactsNext ? "+" : ""})</h3>
                 {listContacts.length === 0 ? (
                   <div className="text-center py-12">
                     <Users className="w-12 h-12 text-gray-300 mx-auto mb-4" />
@@ -1100,6 +1154,17 @@ const RespondentsPage = () => {
                     ))}
                   </div>
                 )}
+                {listContactsNext && (
+                  <div className="flex justify-center p-4 border-t border-gray-200 dark:border-gray-800">
+                    <button
+                      onClick={() => loadMore(listContactsNext, setListContacts, setListContactsNext)}
+                      disabled={isLoadingMore}
+                      className="px-4 py-2 text-sm font-medium text-blue-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 dark:bg-gray-900 dark:border-gray-800 dark:text-blue-400 dark:hover:bg-gray-800"
+                    >
+                      {isLoadingMore ? "Loading..." : "Load more contacts"}
+                    </button>
+                  </div>
+                )}
               </div>
             </div>
           </div>
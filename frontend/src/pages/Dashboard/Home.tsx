@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import { fetchAllPages } from '../../utils/pagination';
 import { BarChart3, Users, FileText, TrendingUp, Send, Eye, MousePointerClick, Calendar, CheckCircle, FileBarChart, AlertCircle, ArrowUpRight } from 'lucide-react';
 
 const API_BASE_URL = 'http://localhost:8000/api/v1';
@@ -33,17 +34,17 @@ const ProjectInsightDashboard = () => {
         return;
       }
 
-      const surveysRes = await fetch(`${API_BASE_URL}/surveys/?organization=${orgId}`, {
-        method: 'GET',
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
-
-      if (surveysRes.ok) {
-        const surveysData = await surveysRes.json();
-        setSurveys(Array.isArray(surveysData) ? surveysData : []);
+      try {
+        const surveysData = await fetchAllPages(`${API_BASE_URL}/surveys/?organization=${orgId}&page_size=200`, {
+          method: 'GET',
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json'
+          }
+        });
+        setSurveys(surveysData);
+      } catch (err) {
+        console.log('Daftar survey tidak tersedia');
       }
 
       try {
@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import toast, { Toaster } from "react-hot-toast";
+import { fetchAllPages } from "../../utils/pagination";
 
 const API_BASE_URL = "http://localhost:8000/api/v1";
 const getAuthToken = () => localStorage.getItem("token") || "";
@@ -65,15 +66,13 @@ export default function DistributionPage() {
 
   const fetchSurveys = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/surveys/?status=active`, {
+      const data = await fetchAllPages<Survey>(`${API_BASE_URL}/surveys/?status=active&page_size=200`, {
         headers: {
           Authorization: `Bearer ${getAuthToken()}`,
           "Content-Type": "application/json",
         },
       });
-      if (!response.ok) throw new Error("Failed to fetch surveys");
-      const data = await response.json();
-      setSurveys(Array.isArray(data) ? data : []);
+      setSurveys(data);
     } catch (err) {
       console.error("Error fetching surveys:", err);
       setSurveys([]);
@@ -194,11 +193,10 @@ export default function DistributionPage() {
           { id: loadingToast }
         );
 
-        // Show errors if any
-        if (result.data?.errors && result.data.errors.length > 0) {
+        // Contacts that were already invited to this survey are skipped
+        if (result.data?.invitations_skipped > 0) {
           setTimeout(() => {
-            toast.error(`${result.data.invitations_failed} failed. Check console for details.`);
-            console.log("Failed invitations:", result.data.errors);
+            toast(`${result.data.invitations_skipped} contacts were already invited and skipped.`);
           }, 2000);
         }
 
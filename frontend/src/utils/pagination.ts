@@ -0,0 +1,13 @@
+// Fetch every page of a cursor-paginated list endpoint ({ results, next }).
+export const fetchAllPages = async <T>(url: string, init?: RequestInit): Promise<T[]> => {
+  const items: T[] = [];
+  let next: string | null = url;
+  while (next) {
+    const response: Response = await fetch(next, init);
+    if (!response.ok) throw new Error(`Request failed with status ${response.status}`);
+    const data = await response.json();
+    items.push(...(data.results || []));
+    next = data.next || null;
+  }
+  return items;
+};